@@ -15,6 +15,7 @@ lswifi.lswifi
 a CLI Wi-Fi scanning utility for Windows that leverages Microsofts Native Wifi wlanapi.h
 """
 
+import json
 import logging
 import os
 import platform
@@ -35,7 +36,7 @@ if sys.version_info < (3, 9):  # noqa: UP036
     sys.exit(-1)
 
 # app imports
-from lswifi import app, appsetup
+from lswifi import appsetup, history, ndjson, oui, service
 from lswifi.__version__ import __title__
 from lswifi.constants import APNAMEACKFILE, APNAMEJSONFILE
 
@@ -73,9 +74,33 @@ def main():
             sys.exit(1)
         return
 
+    if hasattr(args, "command") and args.command == "history":
+        history.run_query(args)
+        return
+
     if args.data_location:
         app_path()
         sys.exit()
+    if args.oui_import:
+        oui_path = oui.default_oui_path()
+        count = oui.compile_registry(args.oui_import, oui_path)
+        print(f"{count} OUI assignments written to {oui_path}")
+        sys.exit()
+    if args.ndjson_to_json:
+        print(
+            json.dumps(ndjson.to_nested(args.ndjson_to_json), indent=args.json_indent)
+        )
+        sys.exit()
+    if args.daemon_request:
+        if not service.run_request(args):
+            print(
+                f"no lswifi service is running at {args.daemon_address or service.default_address()}",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        sys.exit()
+    if args.get_current_ap and not args.daemon and service.run_request(args):
+        sys.exit()
     if args.apnames:
         is_apname_ack_stored = user_ack_apnames_disclaimer()
         log.debug(
@@ -83,6 +108,9 @@ def main():
             "Yes" if is_apname_ack_stored else "No",
         )
 
+    # imported here so requests a running service answers skip loading the decoder
+    from lswifi import app
+
     app.run(args, storedack=is_apname_ack_stored)
 
 
@@ -0,0 +1,136 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.apnames
+~~~~~~~~~~~~~~
+
+keep the cached AP names in memory and write changes behind
+"""
+
+import json
+import logging
+import os
+from threading import Lock, Timer
+
+from lswifi.__version__ import __title__
+from lswifi.constants import APNAMEJSONFILE
+
+# changes are written this many seconds after the last one
+WRITE_DELAY = 2.0
+
+
+def default_apnames_path():
+    """apnames.json in the lswifi appdata folder"""
+    return os.path.join(os.getenv("LOCALAPPDATA"), __title__, APNAMEJSONFILE)  # type: ignore
+
+
+class APNameStore:
+    """The BSSID to AP name map behind --ap-names, kept for the session.
+
+    The file is read once and only read again when its modification time or
+    size changes, so each scan costs a stat rather than a JSON parse. Changes
+    are written behind: the first change starts a timer, and once it fires the
+    whole map is written to a temporary file and moved into place, so a crash
+    never leaves a half written apnames.json. Names changed here but not yet
+    written survive a reload of a file changed by someone else.
+    """
+
+    def __init__(self, path, write_delay=WRITE_DELAY):
+        self.log = logging.getLogger(__name__)
+        self.path = path
+        self.write_delay = write_delay
+        self._lock = Lock()
+        self._names = None
+        self._stat = None
+        self._pending = {}
+        self._timer = None
+        self.loads = 0
+        self.writes = 0
+
+    def __repr__(self):
+        return (
+            f"APNameStore(path={self.path!r}, loads={self.loads}, writes={self.writes})"
+        )
+
+    def _file_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self) -> None:
+        stat = self._file_stat()
+        if self._names is not None and stat == self._stat:
+            return
+        names = {}
+        if stat is not None:
+            try:
+                with open(self.path, encoding="utf-8") as fp:
+                    names = json.load(fp)
+            except json.decoder.JSONDecodeError:
+                self.log.debug(f"ignoring unreadable AP names in {self.path}")
+        names.update(self._pending)
+        self._names = names
+        self._stat = stat
+        self.loads += 1
+        self.log.debug(f"loaded {len(names)} AP names from {self.path}")
+
+    def names(self) -> dict:
+        """BSSID to AP name; the returned dict must not be modified"""
+        with self._lock:
+            self._load()
+            return self._names
+
+    def update(self, scan_names) -> int:
+        """Merge the non-empty names from a scan; returns how many changed."""
+        changed = 0
+        with self._lock:
+            self._load()
+            for bssid, name in scan_names.items():
+                if name != "" and self._names.get(bssid) != name:
+                    self._names[bssid] = name
+                    self._pending[bssid] = name
+                    changed += 1
+            if changed and self._timer is None:
+                self._timer = Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if changed:
+            self.log.debug(
+                f"{changed} AP names changed, writing in {self.write_delay}s"
+            )
+        return changed
+
+    def flush(self) -> None:
+        """Write pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp = f"{self.path}.tmp"
+                with open(temp, "w", encoding="utf-8") as file:
+                    json.dump(self._names, file)
+                os.replace(temp, self.path)
+            except OSError as error:
+                self.log.error(f"could not write AP names to {self.path}: {error}")
+                return
+            self.log.debug(f"{len(self._pending)} AP names written to {self.path}")
+            self._pending = {}
+            self._stat = self._file_stat()
+            self.writes += 1
+
+    def close(self) -> None:
+        self.flush()
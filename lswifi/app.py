@@ -17,10 +17,8 @@ code to manage clients (interfaces), their data, and writing out results.
 
 # python imports
 import asyncio
-import concurrent.futures
-import contextlib
-import csv
 import datetime
+import heapq
 import json
 import logging
 import os
@@ -29,15 +27,27 @@ import sys
 import time
 import traceback
 from ctypes import POINTER, cast, create_string_buffer
-from operator import itemgetter
+from operator import attrgetter, itemgetter
 from time import sleep
 
 # app imports
+from lswifi import metrics, slog
 from lswifi import wlanapi as WLAN_API
 from lswifi.__version__ import __title__, __version__
-from lswifi.client import Client, get_interface_info
-from lswifi.constants import APNAMEJSONFILE, DECORS, DECORS_END, DECORS_START
+from lswifi.apnames import APNameStore, default_apnames_path
+from lswifi.client import BUS_INFO_CACHE, Client, get_interface_info
+from lswifi.constants import DECORS, DECORS_END, DECORS_START
+from lswifi.csvwriter import CSVWriter
+from lswifi.delta import (
+    DISAPPEARED,
+    DeltaEngine,
+    bss_key,
+    describe,
+    state_from_bss,
+)
 from lswifi.elements import WirelessNetworkBss
+from lswifi.ethers import EthersStore, default_ethers_path
+from lswifi.eventlog import EventLog
 from lswifi.helpers import (
     Base64Encoder,
     format_bytes_as_hex,
@@ -50,11 +60,40 @@ from lswifi.helpers import (
     remove_control_chars,
     strip_mac_address_format,
 )
+from lswifi.history import ScanHistory
+from lswifi.journal import JournalWriter
+from lswifi.merge import MergedClient, MergedScan
+from lswifi.mld import group_mlds
+from lswifi.mld import to_json as mld_json
+from lswifi.ndjson import NDJSONWriter
+from lswifi.occupancy import aggregate
+from lswifi.occupancy import to_json as occupancy_json
+from lswifi.oui import OUIDatabase, default_oui_path
 from lswifi.pcap import PCAP, parse_radiotap_header
-from lswifi.schemas.out import OUT_TUPLE, SubHeader
+from lswifi.replay import backend_from_file
+from lswifi.replay import install as install_replay
+from lswifi.rssistats import RssiTracker
+from lswifi.runtime import ScanRuntime
+from lswifi.schemas.out import OUT_TUPLE, OutObject, SubHeader
+from lswifi.service import LswifiService
 
 
 class lswifi:
+    delta = None
+    merge = None
+    journal = None
+    ndjson = None
+    csv_writer = None
+    events = None
+    metrics_server = None
+    rssi = None
+    history = None
+    apnames = None
+    ethers = None
+    vendors = None
+    replay = None
+    service = None
+
     def run(self, args, **kwargs):
         log = logging.getLogger(__name__)
         loops_completed = 0
@@ -69,11 +108,59 @@ class lswifi:
                     if value:
                         is_caching_acknowledged = value
 
+        if args.changes is not None:
+            self.delta = DeltaEngine(rssi_threshold=args.changes)
+
+        if args.merge:
+            self.merge = MergedScan()
+
+        if args.rssi_stats:
+            self.rssi = RssiTracker(
+                window=args.rssi_window, evict_after=args.rssi_evict
+            )
+
+        if args.replay:
+            # scans come from a journal or capture instead of the driver
+            self.replay = backend_from_file(args.replay, scan_latency=0, loop=False)
+            install_replay(self.replay)
+            log.info(f"replaying {self.replay.scan_count} scans from {args.replay}")
+
+        if args.record:
+            self.journal = JournalWriter(args.record)
+            log.info(f"recording raw BSS lists to {args.record}")
+
+        if args.sqlite:
+            self.history = ScanHistory(args.sqlite)
+            log.info(f"storing scans in {args.sqlite}")
+
+        if args.ndjson:
+            self.ndjson = NDJSONWriter(args.ndjson, per=args.ndjson_per)
+            log.info(f"streaming scans as JSON Lines to {args.ndjson}")
+
+        if args.metrics:
+            self.start_metrics(*args.metrics)
+
         watching_events = True
         try:
             clients = {}
             try:
                 if args.event_watcher:
+                    if args.syslog:
+                        # notifications only queue messages; a thread sends them
+                        slog.start(
+                            args.syslog,
+                            port=args.syslog_port,
+                            protocol=args.syslog_protocol,
+                        )
+                    if args.event_log:
+                        self.events = EventLog(
+                            args.event_log,
+                            max_bytes=args.event_log_max_bytes,
+                            rotate_interval=args.event_log_rotate,
+                            backups=args.event_log_backups,
+                            compress=args.event_log_gzip,
+                        )
+                        log.info(f"writing events to {args.event_log}")
                     while watching_events:
                         for (
                             _index,
@@ -81,6 +168,7 @@ class lswifi:
                         ) in WLAN_API.WLAN.get_wireless_interfaces().items():
                             if "disabled" not in iface.mac and iface.mac not in clients:
                                 client = Client(args, iface)
+                                client.events = self.events
                                 clients[iface.mac] = client
                         sleep(2)
 
@@ -93,6 +181,14 @@ class lswifi:
                 log.error("no wireless interfaces found")
                 sys.exit(-1)
 
+            for _index, client in clients.items():
+                client.merge = self.merge
+                client.journal = self.journal
+
+            if args.daemon:
+                self.serve(clients, args, is_caching_acknowledged)
+                sys.exit(0)
+
             if args.list_interfaces:
                 if args.json:
                     interfaces = []
@@ -127,6 +223,10 @@ class lswifi:
                 self.appendEthers(args.append)
                 sys.exit(0)
 
+            if args.import_ethers:
+                self.importEthers(args.import_ethers)
+                sys.exit(0)
+
             if args.display_ethers:
                 self.displayEthers()
                 sys.exit(0)
@@ -137,6 +237,10 @@ class lswifi:
 
             if args.decode:
                 self.decode_pcap_file(args)
+                if self.csv_writer is not None:
+                    self.csv_writer.close()
+                if self.apnames is not None:
+                    self.apnames.close()
                 sys.exit(0)
 
             scanning = True
@@ -150,6 +254,17 @@ class lswifi:
             #     ):
             #         scanning = False
             #         print(get_interface_info(args, interface))
+            if (
+                args.get_interface_info
+                or args.get_current_ap
+                or args.get_current_channel
+                or args.supported
+            ):
+                # probe bus info for every adapter in parallel before printing
+                BUS_INFO_CACHE.prefetch(
+                    client.iface.guid_string.strip("{}").lower()
+                    for client in clients.values()
+                )
             for _index, client in clients.items():
                 if (
                     args.get_interface_info
@@ -172,6 +287,11 @@ class lswifi:
                 if args.scans:
                     scans = int(args.scans)
                     log.debug(f"number of scans requested is {scans}")
+                elif self.replay is not None and not args.time:
+                    # play the whole recording back at full speed
+                    scans = self.replay.scan_count
+                    if not args.interval:
+                        interval = 0
                 if args.time:
                     timeout = int(args.time)
                     log.debug(
@@ -184,47 +304,44 @@ class lswifi:
                     csv_file_name = args.csv
                     json_file_name = args.json
 
-                if timeout > 0:  # we're scanning during a given time period
-                    timeout_start = time.time()
-
-                    while time.time() < timeout_start + timeout:
-                        asyncio.run(
-                            self.scan(
-                                clients,
-                                is_caching_acknowledged,
-                                csv_file_name,
-                                json_file_name,
-                                args,
-                            )
-                        )
-                        loops_completed += 1
-                        time.sleep(interval)
-                else:  # we're scanning a given number of times
-                    _first = True
-                    for _index in range(scans):
-                        if _first:
-                            _first = False
-                        else:
-                            time.sleep(interval)
-                        asyncio.run(
-                            self.scan(
-                                clients,
-                                is_caching_acknowledged,
-                                csv_file_name,
-                                json_file_name,
-                                args,
-                            )
-                        )
-                        loops_completed += 1
+                # one event loop for the whole session instead of asyncio.run
+                # and a thread pool per scan cycle
+                runtime = ScanRuntime(
+                    clients,
+                    lambda scanned: self.process_scan_results(
+                        scanned,
+                        is_caching_acknowledged,
+                        csv_file_name,
+                        json_file_name,
+                        args,
+                    ),
+                )
+                try:
+                    runtime.run(scans=scans, interval=interval, duration=timeout)
+                finally:
+                    loops_completed = runtime.cycles
+                    runtime.close()
+                    self.close_sinks()
 
                 if loops_completed > 1:
                     log.info(f"total number of completed scans is {loops_completed}")
+                for _index, client in clients.items():
+                    for completed_by, stats in client.scan_latency_stats.items():
+                        if stats.count:
+                            log.debug(
+                                f"scan completion latency for {client.mac} via {completed_by}: {stats}"
+                            )
         except KeyboardInterrupt:
             if not args.event_watcher and loops_completed > 1:
                 log.info(
                     f"total number of completed scans during this session is {loops_completed}"
                 )
             log.warning("keyboard interruption detected... stopping...")
+            slog.stop()
+            if self.events is not None:
+                self.events.close()
+            if self.metrics_server is not None:
+                self.metrics_server.close()
             sys.exit(-1)
         except asyncio.CancelledError:
             raise
@@ -236,246 +353,233 @@ class lswifi:
 
         sys.exit(0)
 
-    async def scan(
-        self, clients, is_caching_acknowledged, csv_file_name, json_file_name, args
+    def process_scan_results(
+        self,
+        clients,
+        is_caching_acknowledged,
+        csv_file_name,
+        json_file_name,
+        args,
+        display=True,
     ):
         """
-        async func to perform a scan
+        decode and output the results of a completed scan cycle; with display
+        False the exports are written but no table is printed
         """
         log = logging.getLogger(__name__)
-        try:
-            background_tasks = set()
-            iface_count = len(clients)
-            if iface_count > 1:
-                log.info(f"starting scans on {iface_count} interfaces")
-
-            async def scanfunc(index, client):
-                log.debug(
-                    f"initializing scan on {client.iface.description} {client.iface.guid_string}"
-                )
-                await client.scan()
-                log.debug(
-                    f"initialized scan on {client.iface.description} {client.iface.guid_string}"
-                )
-                try:
-                    while not client.scan_finished:
-                        time.sleep(0.1)
-                except Exception:
-                    raise
-                clients[index] = client
-
-            for _index, client in clients.items():
-                task = scanfunc(_index, client)
-                background_tasks.add(task)
-                log.debug(f"added background task for {client}")
-
-            if len(clients.items()) > 0:
-                with concurrent.futures.ThreadPoolExecutor(
-                    max_workers=len(clients.items())
-                ) as executor:
-                    futures = []
-                    for task in background_tasks:
-                        futures.append(executor.submit(asyncio.run, task))
-                    for _future in concurrent.futures.as_completed(futures):
-                        pass
-            clients = {
-                k: clients[k] for k in sorted(clients)
-            }  # sort by key (index) numerically
+        if self.metrics_server is not None:
+            for _idx, client in clients.items():
+                if client.data is not None:
+                    self.count_bands(client)
+        if self.history is not None:
+            # every BSS heard, before any display filtering
+            for _idx, client in clients.items():
+                if client.data is not None:
+                    with metrics.EXPORT_SECONDS.time(format="sqlite"):
+                        self.history.record_scan(
+                            client.mac,
+                            client.iface.description,
+                            client.last_scan_time_epoch,
+                            client.data,
+                        )
+        if self.merge is not None:
+            # one table for all interfaces, decoded once per distinct BSS
+            scanned = []
             for _idx, client in clients.items():
                 if client.data is None:
                     log.warning(f"no scan data for {client.mac}")
                 else:
-                    (
+                    scanned.append(client)
+            log.debug(f"{self.merge}")
+            clients = {}
+            if scanned:
+                clients[0] = MergedClient(scanned, self.merge.results())
+            self.merge.reset()
+        for _idx, client in clients.items():
+            if client.data is None:
+                log.warning(f"no scan data for {client.mac}")
+            else:
+                (
+                    out_results,
+                    rnr_results,
+                    bss_len,
+                    bssid_list,
+                    json_names,
+                    json_out,
+                    newapnames,
+                ) = self.parse_bss_list(
+                    client,
+                    is_caching_acknowledged,
+                    csv_file_name,
+                    json_file_name,
+                    args,
+                )
+
+                if args.ies or args.bytes or args.export:
+                    return
+                if not display:
+                    continue
+                if args.rnr:
+                    self.print_rnr_list(rnr_results, client.mac, args)
+                elif args.occupancy:
+                    self.print_channel_list(client, args)
+                elif args.mld:
+                    self.print_mld_list(client, args)
+                else:
+                    self.print_bss_list(
                         out_results,
-                        rnr_results,
                         bss_len,
+                        client.mac,
                         bssid_list,
+                        is_caching_acknowledged,
                         json_names,
                         json_out,
                         newapnames,
-                    ) = self.parse_bss_list(
-                        client,
-                        is_caching_acknowledged,
-                        csv_file_name,
-                        json_file_name,
                         args,
                     )
-
-                    if args.ies or args.bytes or args.export:
-                        return
-                    if args.rnr:
-                        self.print_rnr_list(rnr_results, client.mac, args)
-                    else:
-                        self.print_bss_list(
-                            out_results,
-                            bss_len,
-                            client.mac,
-                            bssid_list,
-                            is_caching_acknowledged,
-                            json_names,
-                            json_out,
-                            newapnames,
-                            args,
-                        )
-                    log.debug(f"finish parsing information elements for {client.mac}")
-
-            ############################
-            # old sync example working #
-            ############################
-            #
-            # for _index, interface in interfaces.items():
-            #     client = Client(args, interface)
-            #     clients[_index] = client
-            #     log.debug(
-            #         f"initializing scan on {client.iface.description} {client.iface.guid_string}"
-            #     )
-            #     await client.scan()
-            #     log.debug(
-            #         f"initialized scan on {client.iface.description} {client.iface.guid_string}"
-            #     )
-            #     while not client.scan_finished:
-            #         pass
-            #     if client.data is None:
-            #         log.debug(f"no scan data for {client.mac}")
-            #     else:
-            #         log.debug(f"start parsing bss ies for {client.mac}")
-            #         parse_bss_list_and_print(client.data, client, args, **kwargs)
-            #         log.debug(f"finish parsing bss ies for {client.mac}")
-
-        except KeyboardInterrupt:
-            raise
+                log.debug(f"finish parsing information elements for {client.mac}")
+
+    def serve(self, clients, args, is_caching_acknowledged=False) -> None:
+        """Answer requests from other lswifi processes until interrupted"""
+        self.service = LswifiService(
+            self,
+            clients,
+            args,
+            address=args.daemon_address,
+            is_caching_acknowledged=is_caching_acknowledged,
+        )
+        try:
+            self.service.serve_forever()
+        finally:
+            self.service.close()
+            self.close_sinks()
+
+    def close_sinks(self) -> None:
+        """Flush and close every export and store opened for the session"""
+        if self.journal is not None:
+            self.journal.close()
+        if self.ndjson is not None:
+            self.ndjson.close()
+        if self.csv_writer is not None:
+            self.csv_writer.close()
+        if self.history is not None:
+            self.history.close()
+        if self.apnames is not None:
+            self.apnames.close()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+
+    def start_metrics(self, host, port) -> None:
+        """Serve metrics and report the caches this session uses"""
+        self.metrics_server = metrics.MetricsServer(host, port)
+        metrics.REGISTRY.add_collector(
+            "native", metrics.native_call_metrics(WLAN_API.api_stats)
+        )
+        metrics.REGISTRY.track_cache("decode", self.decode_cache_stats)
+        metrics.REGISTRY.track_cache("vendor", self.vendor_cache_stats)
+        metrics.REGISTRY.track_cache("handle_pool", self.handle_pool_stats)
+
+    def decode_cache_stats(self) -> tuple:
+        """BSS reported by more than one interface are only decoded once with --merge"""
+        if self.merge is None:
+            return 0, 0
+        return self.merge.observations - self.merge.decodes, self.merge.decodes
+
+    def vendor_cache_stats(self) -> tuple:
+        if self.vendors is None:
+            return 0, 0
+        return self.vendors.hits, self.vendors.misses
+
+    @staticmethod
+    def handle_pool_stats() -> tuple:
+        pool = WLAN_API.HANDLE_POOL
+        if pool is None:
+            return 0, 0
+        return pool.reused, pool.opened
+
+    @staticmethod
+    def count_bands(client) -> None:
+        bands = {"2.4GHz": 0, "5GHz": 0, "6GHz": 0}
+        for bss in client.data:
+            frequency = bss.channel_frequency.value
+            try:
+                if is_two_four_band(frequency):
+                    bands["2.4GHz"] += 1
+                elif is_five_band(frequency):
+                    bands["5GHz"] += 1
+                elif is_six_band(frequency):
+                    bands["6GHz"] += 1
+            except ValueError:
+                continue
+        for band, count in bands.items():
+            metrics.BSS_COUNT.set(count, interface=client.mac, band=band)
+
+    def ethers_store(self) -> EthersStore:
+        """The ethers file, loaded on first use and kept for the session"""
+        if self.ethers is None:
+            self.ethers = EthersStore(default_ethers_path())
+        return self.ethers
 
     def displayEthers(self):
         log = logging.getLogger(__name__)
-        appdata_path = os.path.join(os.getenv("LOCALAPPDATA"), __title__)
-        is_path = os.path.isdir(appdata_path)
-        if not is_path:
+        entries = self.ethers_store().entries()
+        if not entries:
             log.info("nothing here")
-
-        file = os.path.join(appdata_path, "ethers")
-
-        try:
-            if os.path.isfile(file):
-                content = ""
-                with open(file) as file_reader:
-                    content = file_reader.readlines()
-                content = [x.strip() for x in content]
-                print("\n".join(content))
-        except Exception:
-            pass
+        for mac, name in entries.items():
+            print(f"{mac} {name}")
 
     def appendEthers(self, data):
         log = logging.getLogger(__name__)
-        appdata_path = os.path.join(os.getenv("LOCALAPPDATA"), __title__)
-        is_path = os.path.isdir(appdata_path)
-        if not is_path:
-            os.makedirs(appdata_path)
-
-        file = os.path.join(appdata_path, "ethers")
-
-        ethers = {}
         newethers = {}
-
         try:
             bssid, apname = data.split(",", 1)
-
-            if not os.path.isfile(file):
-                with open(file, "w") as outfile:
-                    outfile.write(f"{bssid} {apname.strip().replace(' ', '')}\n")
-                newethers[bssid] = apname
-                return newethers
-
-            if os.path.isfile(file):
-                ethers = self.loadEthers()
-                log.debug(f"<storedEthers>: {ethers}")
-                if ethers.items():
-                    for key, value in ethers.items():
-                        if bssid in key:
-                            newethers[key] = apname
-                        else:
-                            newethers[bssid] = apname
-                            newethers[key] = value
-                else:
-                    newethers[bssid] = apname
-                with open(file, "w") as outfile:
-                    for key, value in newethers.items():
-                        outfile.write(f"{key} {value.strip().replace(' ', '')}\n")
-
-                log.debug(f"<newEthers>: {newethers}")
-                return newethers
+            key = self.ethers_store().add(bssid, apname)
+            newethers[key] = apname
+            log.debug(f"<newEthers>: {newethers}")
         except ValueError:
             log.error("could not process data (%s) to append to ethers", data)
-            return newethers
-
-    def loadEthers(self) -> dict:
-        appdata_path = os.path.join(os.getenv("LOCALAPPDATA"), __title__)  # type: ignore
-        is_path = os.path.isdir(appdata_path)
-        if not is_path:
-            os.makedirs(appdata_path)
-
-        file = os.path.join(appdata_path, "ethers")
-        ethers = {}
-        if os.path.isfile(file):
-            with open(file) as infile:
-                for line in infile:
-                    mac, name = line.split(" ", 1)
-                    ethers[mac] = name.strip()
+        return newethers
 
-        return ethers
-
-    def loadAPNames(self) -> dict:
+    def importEthers(self, path):
         log = logging.getLogger(__name__)
-        appdata_path = os.path.join(os.getenv("LOCALAPPDATA"), __title__)  # type: ignore
-        is_path = os.path.isdir(appdata_path)
-        if not is_path:
-            os.makedirs(appdata_path)
+        try:
+            count = self.ethers_store().import_file(path)
+        except OSError as error:
+            log.error(f"could not import ethers from {path}: {error}")
+            return 0
+        if not count:
+            log.warning(f"no BSSID and AP name pairs found in {path}")
+        return count
+
+    def vendor_db(self) -> OUIDatabase:
+        """The compiled OUI registry, mapped on first use"""
+        if self.vendors is None:
+            self.vendors = OUIDatabase(default_oui_path())
+            if not self.vendors.available:
+                logging.getLogger(__name__).warning(
+                    f"no OUI database at {self.vendors.path}, import the IEEE registry files with --oui-import"
+                )
+        return self.vendors
 
-        file = os.path.join(appdata_path, APNAMEJSONFILE)
-        apnames = {}
-        if os.path.isfile(file):
-            with open(file) as fp, contextlib.suppress(json.decoder.JSONDecodeError):
-                apnames = json.load(fp)
+    def apname_store(self) -> APNameStore:
+        """The AP name cache, opened on first use and kept for the session"""
+        if self.apnames is None:
+            self.apnames = APNameStore(default_apnames_path())
+        return self.apnames
 
+    def loadAPNames(self) -> dict:
         log = logging.getLogger(__name__)
+        apnames = self.apname_store().names()
         log.debug(f"<loadAPNames>: len(json_names) {len(apnames)}")
         return apnames
 
     def updateAPNames(self, json_names, scan_names) -> None:
         log = logging.getLogger(__name__)
-        appdata_path = os.path.join(os.getenv("LOCALAPPDATA"), __title__)  # type: ignore
-        is_path = os.path.isdir(appdata_path)
-        if not is_path:
-            os.makedirs(appdata_path)
-
-        file = os.path.join(appdata_path, "apnames.json")
-
-        # if mac from updated is in current, check if ap name is different or the same.
-        # if different, update it.
-        # if the same. pass.
-
-        newcount = 0
-        for scan_bss, scan_name in scan_names.items():
-            if scan_name != "":  # if not ""
-                if scan_bss in json_names:  # if name from scan is in the json file
-                    if (
-                        json_names[scan_bss] != scan_name
-                    ):  # if scan name is different from json name
-                        old = json_names[scan_bss]
-                        json_names[scan_bss] = scan_name  # update loadednames
-                        log.debug(f"<updateAPNames> {old} updated to {scan_name}")
-                        newcount += 1
-                else:
-                    json_names[scan_bss] = scan_name
-                    log.debug(f"<updateAPNames> new value {scan_name} added")
-                    newcount += 1
+        newcount = self.apname_store().update(scan_names)
         log.debug(
             f"<updateAPNames> len(json_names) {len(json_names)} len(new_names) {len(scan_names)}"
         )
-        if newcount > 0:
-            with open(file, "w") as fp:
-                json.dump(json_names, fp)
-                log.debug(f"{len(scan_names.items())} new names written to {file}")
-        else:
+        if newcount == 0:
             log.debug("<updateAPNames> nothing to update")
 
     def parse_bss_list(
@@ -491,8 +595,30 @@ class lswifi:
 
         log = logging.getLogger(__name__)
 
+        # JSON records are built for --json and for the JSON Lines stream
+        export_json = args.json or self.ndjson is not None
+
+        delta_present = ()
+        if self.delta is not None:
+            # every BSS heard, so one hidden by --top or a display filter is not gone
+            delta_present = [bss_key(bss) for bss in wireless_network_bss_list]
+
+        if self.rssi is not None:
+            # every BSS heard is a sample, whether or not it is displayed
+            self.rssi.observe_scan(
+                client.mac,
+                client.last_scan_time_epoch,
+                [
+                    (bss.bssid.value, bss.rssi.value)
+                    for bss in wireless_network_bss_list
+                ],
+            )
+
         if args.ethers:
-            ethers = self.loadEthers()
+            ethers = self.ethers_store()
+
+        if args.vendor:
+            vendors = self.vendor_db()
 
         json_names = {}
 
@@ -583,8 +709,13 @@ class lswifi:
                 ).replace('"', "")
                 print(f"ies base64:\n{iesb64}\n")
         else:
+            # the full list is kept for --export, which is not limited by --top
+            displayed_bss_list = wireless_network_bss_list
+            if args.top and not (args.ies or args.exportraw):
+                # rows and records below are only built for the selected BSS
+                displayed_bss_list = self.select_top(wireless_network_bss_list, args)
             # WirelessNetworkBss object
-            for index, bss in enumerate(wireless_network_bss_list):
+            for index, bss in enumerate(displayed_bss_list):
                 if args.ies or args.exportraw:
                     wlanapi_bss = str(bss.bssid).lower()
                     if args.ies:
@@ -752,15 +883,32 @@ class lswifi:
                         rnr_out = []
                         for obj in rnr:
                             rnr_out.append(obj.out())
+                        if args.vendor:
+                            rnr_out.append(
+                                OutObject(
+                                    value=vendors.lookup(rnr.RNR_BSSID.value) or "",
+                                    header="NEIGHBOR VENDOR",
+                                    subheader="[OUI]",
+                                ).out()
+                            )
                         rnr_results.append(rnr_out)
                     continue
 
+                # --changes only outputs rows which appeared or changed since the last scan
+                change = None
+                if self.delta is not None:
+                    state = state_from_bss(bss)
+                    change = self.delta.observe(client.mac, state)
+                    if change is None:
+                        continue
+
                 # this is a list to check for dup bssids (may be expected for some APs which share same BSSID on 2.4 and 5 GHz radios - Cisco for example)
                 bssid_list.append(str(bss.bssid))
 
                 if args.ethers:
-                    if bss.bssid.value in ethers:
-                        bss.apname.value = ethers[bss.bssid.value]
+                    ether_name = ethers.lookup(bss.bssid.value)
+                    if ether_name is not None:
+                        bss.apname.value = ether_name
                 elif args.apnames and is_caching_acknowledged:
                     scan_bssid = bss.bssid.value
                     scan_apname = remove_control_chars(bss.apname.value)
@@ -788,18 +936,19 @@ class lswifi:
                 # bss.element.out() contains a tuple with the following values
                 #   1. value, 2. header and alignment (left, center, right), 3. subheader
 
-                if bss.bssid.connected and not args.json and not args.csv:
+                if bss.bssid.connected and not args.csv:
                     # if "(*)" not in bss.bssid.value:
                     bss.bssid.value += "(*)"
 
-                if args.json:
+                if export_json:
                     json_out.append(
                         {
                             "timestamp": client.last_scan_time_iso,
                             "interface_mac": client.mac,
                             "amendments": sorted(bss.amendments.elements),
                             "apname": str(bss.apname).strip(),
-                            "bssid": str(bss.bssid).strip(),
+                            # the table marks the connected BSS, records have "connected"
+                            "bssid": str(bss.bssid).strip().replace("(*)", ""),
                             "bss_type": str(bss.bss_type).strip(),
                             "channel_frequency": str(bss.channel_frequency).strip(),
                             "channel_number": str(bss.channel_number).strip(),
@@ -889,6 +1038,123 @@ class lswifi:
                 if (args.apnames or args.ethers) and is_caching_acknowledged:
                     out_results[-1].append(bss.apname.out())
 
+                if args.vendor:
+                    vendor = vendors.lookup(bss.bssid.value) or ""
+                    out_results[-1].append(
+                        OutObject(
+                            value=vendor, header="VENDOR", subheader="[OUI]"
+                        ).out()
+                    )
+                    if export_json:
+                        json_out[-1]["vendor"] = vendor
+                    if args.csv:
+                        csv_out[-1]["vendor"] = vendor
+
+                if self.rssi is not None:
+                    # samples are kept under the BSSID without the (*) marker
+                    stats = self.rssi.stats(
+                        client.mac, bss.bssid.value.replace("(*)", "")
+                    )
+                    out_results[-1].append(
+                        OutObject(
+                            value=stats.avg, header="AVG", subheader="[dBm]"
+                        ).out()
+                    )
+                    out_results[-1].append(
+                        OutObject(
+                            value=stats.stddev, header="STDDEV", subheader="[dB]"
+                        ).out()
+                    )
+                    out_results[-1].append(
+                        OutObject(
+                            value=f"{stats.p10}/{stats.p90}",
+                            header="P10/P90",
+                            subheader="[dBm]",
+                        ).out()
+                    )
+                    for field, value in stats._asdict().items():
+                        if export_json:
+                            json_out[-1][f"rssi_{field}"] = value
+                        if args.csv:
+                            csv_out[-1][f"rssi_{field}"] = value
+
+                if self.merge is not None:
+                    merged = bss.merged
+                    out_results[-1].append(
+                        OutObject(
+                            value=merged.mean_rssi, header="MEAN", subheader="dBm"
+                        ).out()
+                    )
+                    out_results[-1].append(
+                        OutObject(
+                            value=", ".join(
+                                f"{interface} {rssi}"
+                                for interface, rssi in merged.rssi_by_interface().items()
+                            ),
+                            header="HEARD BY",
+                            subheader="[Interface RSSI]",
+                        ).out()
+                    )
+                    if export_json:
+                        json_out[-1]["rssi_mean"] = merged.mean_rssi
+                        json_out[-1]["rssi_by_interface"] = merged.rssi_by_interface()
+                        json_out[-1]["interfaces"] = merged.interfaces
+                    if args.csv:
+                        csv_out[-1]["rssi_mean"] = merged.mean_rssi
+                        csv_out[-1]["rssi_by_interface"] = "/".join(
+                            f"{interface}={rssi}"
+                            for interface, rssi in merged.rssi_by_interface().items()
+                        )
+                        csv_out[-1]["interfaces"] = "/".join(merged.interfaces)
+
+                if change is not None:
+                    out_results[-1].append(
+                        OutObject(value=describe(change), header="CHANGE").out()
+                    )
+                    if export_json:
+                        json_out[-1]["change"] = change.kind
+                        json_out[-1]["changes"] = change.reasons
+                    if args.csv:
+                        csv_out[-1]["change"] = change.kind
+                        csv_out[-1]["changes"] = "/".join(change.reasons)
+                    self.delta.remember(
+                        client.mac,
+                        state,
+                        table=out_results[-1],
+                        json=json_out[-1] if export_json else None,
+                        csv=csv_out[-1] if args.csv else None,
+                    )
+
+        # repeat the last rows of BSSIDs which disappeared, marked as gone;
+        # added before sorting so they take their place among the other rows
+        if self.delta is not None and not (
+            args.ies or args.bytes or args.exportraw or args.rnr
+        ):
+            for _state, outputs in self.delta.finish(client.mac, delta_present):
+                if outputs.get("table"):
+                    out_results.append(
+                        outputs["table"][:-1]
+                        + [OutObject(value="gone", header="CHANGE").out()]
+                    )
+                if export_json and outputs.get("json"):
+                    json_out.append(
+                        dict(
+                            outputs["json"],
+                            timestamp=client.last_scan_time_iso,
+                            change=DISAPPEARED,
+                            changes=[],
+                        )
+                    )
+                if args.csv and outputs.get("csv"):
+                    csv_out.append(
+                        dict(
+                            outputs["csv"],
+                            timestamp=client.last_scan_time_iso,
+                            change=DISAPPEARED,
+                            changes="",
+                        )
+                    )
+
         rnr_results = sorted(
             rnr_results,
             key=lambda x: x[get_index("RSSI", rnr_results)].value,
@@ -921,7 +1187,8 @@ class lswifi:
                 log.info(f"nothing found to export as JSON to {json_file_name}")
             else:
                 log.info(f"exporting scans as JSON to {json_file_name}")
-                with open(json_file_name, mode) as file:
+                export_timer = metrics.EXPORT_SECONDS.time(format="json")
+                with export_timer, open(json_file_name, mode) as file:
                     if json_file_exists:
                         file_data = json.load(file)
                         file_data["scan_data"].append(json_out)
@@ -937,32 +1204,23 @@ class lswifi:
                         )
                         file.write(file_data)
 
-        if args.csv:
-            has_headings = False
-            csv_file_exists = os.path.exists(csv_file_name)
-            mode = "w"
-            if csv_file_exists:
-                mode = "a"
-                with open(csv_file_name) as f:
-                    try:
-                        has_headings = csv.Sniffer().has_header(f.read(4096))
-                    except csv.Error:
-                        # The file seems to be empty
-                        has_headings = False
+        if self.ndjson is not None:
+            if not json_out:
+                log.info(f"nothing found to stream as JSON Lines to {args.ndjson}")
+            else:
+                with metrics.EXPORT_SECONDS.time(format="ndjson"):
+                    self.ndjson.write_scan(json_out)
 
+        if args.csv:
             if not csv_out:
                 log.info(f"nothing found to export as CSV to {csv_file_name}")
             else:
-                log.info(f"exporting scans as CSV to {csv_file_name}")
-                with open(csv_file_name, mode, newline="") as csvfile:
-                    fieldnames = csv_out[-1].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    # log.debug("does csv file likely already have headings written? %s" % ('Yes' if has_headings else 'No'))
-                    if not has_headings:
-                        writer.writeheader()
-                        has_headings = True
-                    for result in csv_out:
-                        writer.writerow(result)
+                if self.csv_writer is None:
+                    # opened once and kept for the rest of the session
+                    self.csv_writer = CSVWriter(csv_file_name)
+                    log.info(f"exporting scans as CSV to {csv_file_name}")
+                with metrics.EXPORT_SECONDS.time(format="csv"):
+                    self.csv_writer.write_rows(csv_out)
 
         if args.export and len(wireless_network_bss_list) > 0:
             # First, collect matching BSS entries without creating the file
@@ -1077,6 +1335,39 @@ class lswifi:
             newapnames,
         )
 
+    def _bss_is_displayed(self, bss, args):
+        """Check if a BSS passes the display filters applied to the scan table"""
+        if not args.all and bss.rssi.value < args.sensitivity:
+            return False
+        if (args.a or args.g or args.six) and not self._bss_matches_band_filter(
+            bss, args
+        ):
+            return False
+        if args.width is not None and int(args.width) != int(bss.channel_width.value):
+            return False
+        if args.include is not None and args.include not in str(bss.ssid):
+            return False
+        if args.exclude and args.exclude in str(bss.ssid):
+            return False
+        if args.bssid is not None:
+            input_mac = strip_mac_address_format(args.bssid)
+            if input_mac not in strip_mac_address_format(str(bss.bssid)):
+                return False
+        return True
+
+    def select_top(self, bss_list, args):
+        """The --top strongest BSS passing the display filters, or the longest up with --uptime.
+
+        A heap keeps only N candidates while walking the list, so selecting
+        from a large scan costs O(n log N) and nothing else is sorted.
+        """
+        key = attrgetter("timestamp") if args.uptime else attrgetter("rssi.value")
+        return heapq.nlargest(
+            args.top,
+            (bss for bss in bss_list if self._bss_is_displayed(bss, args)),
+            key=key,
+        )
+
     def _bss_matches_band_filter(self, bss, args):
         """Check if a BSS matches the band filtering criteria"""
         if args.a and args.g and not args.six:
@@ -1338,6 +1629,10 @@ class lswifi:
 
                 if args.rnr:
                     self.print_rnr_list(rnr_results, client.mac, args)
+                elif args.occupancy:
+                    self.print_channel_list(client, args)
+                elif args.mld:
+                    self.print_mld_list(client, args)
                 else:
                     if not args.ies:
                         self.print_bss_list(
@@ -1384,48 +1679,167 @@ class lswifi:
                 print(json.dumps(json_rnr, indent=args.json_indent))
                 return
 
-            headers = []
-            subheaders = []
+            self.print_table(rnr_results)
 
-            for tup in rnr_results[0]:
-                headers.append(tup.header)
-                subheaders.append(tup.subheader)
+    def print_channel_list(self, client, args):
+        """Occupancy of each 20 MHz channel, from every BSS passing the display filters"""
+        log = logging.getLogger(__name__)
+        bss_list = [
+            bss
+            for bss in client.data
+            if (args.all or bss.rssi.value >= args.sensitivity)
+            and (
+                not (args.a or args.g or args.six)
+                or self._bss_matches_band_filter(bss, args)
+            )
+        ]
+        rows = aggregate(bss_list)
+        log.info(
+            f"channel occupancy of {len(bss_list)} BSSIDs on {len(rows)} channels for {client.mac}."
+        )
+        if not rows:
+            return
+        if args.json:
+            print(json.dumps(occupancy_json(rows), indent=args.json_indent))
+            return
+        self.print_table(
+            [
+                [
+                    OutObject(value=row.band, header="BAND").out(),
+                    OutObject(value=str(row.channel), header="CH.").out(),
+                    OutObject(
+                        value=str(row.bss), header="BSS", subheader="PRIMARY"
+                    ).out(),
+                    OutObject(
+                        value=str(row.overlapping), header="OVERLAP", subheader="BONDED"
+                    ).out(),
+                    OutObject(
+                        value="" if row.rssi_max is None else str(row.rssi_max),
+                        header="RSSI MAX",
+                        subheader="[dBm]",
+                    ).out(),
+                    OutObject(
+                        value="" if row.rssi_total is None else str(row.rssi_total),
+                        header="RSSI SUM",
+                        subheader="[dBm]",
+                    ).out(),
+                    OutObject(
+                        value="" if row.stations is None else str(row.stations),
+                        header="QBSS",
+                        subheader="STA",
+                    ).out(),
+                    OutObject(
+                        value="" if row.utilization is None else f"{row.utilization}%",
+                        header="QBSS",
+                        subheader="CU",
+                    ).out(),
+                ]
+                for row in rows
+            ]
+        )
 
-            result = ""
+    def print_mld_list(self, client, args):
+        """One row per AP MLD with its links, from every BSS passing the display filters"""
+        log = logging.getLogger(__name__)
+        bss_list = [
+            bss
+            for bss in client.data
+            if (args.all or bss.rssi.value >= args.sensitivity)
+            and (
+                not (args.a or args.g or args.six)
+                or self._bss_matches_band_filter(bss, args)
+            )
+        ]
+        mlds = group_mlds(bss_list)
+        log.info(
+            f"{len(mlds)} AP MLDs with {sum(len(mld.links) for mld in mlds)} links among {len(bss_list)} BSSIDs for {client.mac}."
+        )
+        if not mlds:
+            return
+        if args.json:
+            print(json.dumps(mld_json(mlds), indent=args.json_indent))
+            return
+        rows = []
+        for mld in mlds:
+            heard = [link.rssi for link in mld.links if link.rssi is not None]
+            rows.append(
+                [
+                    OutObject(
+                        value=mld.ssid,
+                        header="SSID",
+                        subheader="[Network Name]",
+                    ).out(),
+                    OutObject(
+                        value=mld.mld_mac or "--",
+                        header="MLD",
+                        subheader="[MAC Address]",
+                    ).out(),
+                    OutObject(
+                        value=f"{len(heard)}/{len(mld.links)}",
+                        header="LINKS",
+                        subheader="HEARD",
+                    ).out(),
+                    OutObject(
+                        value=str(max(heard)) if heard else "",
+                        header="RSSI",
+                        subheader="[dBm]",
+                    ).out(),
+                    OutObject(
+                        value="  ".join(
+                            f"{'?' if link.link_id is None else link.link_id}:"
+                            f"{link.band or '?'}/{link.channel or '?'} {link.bssid}"
+                            f"{'' if link.rssi is None else f' ({link.rssi})'}"
+                            for link in mld.links
+                        ),
+                        header="LINK:BAND/CHANNEL BSSID (RSSI)",
+                        subheader="[affiliated APs]",
+                    ).out(),
+                ]
+            )
+        self.print_table(rows)
+
+    def print_table(self, rows: list):
+        """Print rows of OUT_TUPLE as a table under their headers and subheaders"""
+        headers = []
+        subheaders = []
+
+        for tup in rows[0]:
+            headers.append(tup.header)
+            subheaders.append(tup.subheader)
+
+        result = ""
+
+        rows.insert(0, headers)
+        rows.insert(1, subheaders)
+
+        border = ()
+        rows_len = len(rows[0]) - 1
+        for index, _item in enumerate(rows[0]):
+            if index == rows_len:
+                max_len = len(_item)
+            max_len = max(len(x) for x in [y[index] for y in rows])
+            border = border + (
+                generate_pretty_separator(max_len, DECORS, DECORS_START, DECORS_END),
+            )
 
-            rnr_results.insert(0, headers)
-            rnr_results.insert(1, subheaders)
+            align = [y[index] for y in rows][0].alignment.value
 
-            border = ()
-            rnr_results_len = len(rnr_results[0]) - 1
-            for index, _item in enumerate(rnr_results[0]):
-                if index == rnr_results_len:
-                    max_len = len(_item)
-                max_len = max(len(x) for x in [y[index] for y in rnr_results])
-                border = border + (
-                    generate_pretty_separator(
-                        max_len, DECORS, DECORS_START, DECORS_END
-                    ),
-                )
+            if index == rows_len:
+                result += f"{{{index}}}"
+            else:
+                result += f"{{{index}:{align}{max_len}}}  "
 
-                align = [y[index] for y in rnr_results][0].alignment.value
+        rows.insert(0, border)
+        rows.insert(3, border)
 
-                if index == rnr_results_len:
-                    result += f"{{{index}}}"
+        for row in rows:
+            values = []
+            for data in row:
+                if isinstance(data, OUT_TUPLE):
+                    values.append(f"{data.value}")
                 else:
-                    result += f"{{{index}:{align}{max_len}}}  "
-
-            rnr_results.insert(0, border)
-            rnr_results.insert(3, border)
-
-            for row in rnr_results:
-                rnr_results = []
-                for data in row:
-                    if isinstance(data, OUT_TUPLE):
-                        rnr_results.append(f"{data.value}")
-                    else:
-                        rnr_results.append(f"{data}")
-                print(result.format(*tuple(rnr_results)))
+                    values.append(f"{data}")
+            print(result.format(*tuple(values)))
 
     def print_bss_list(
         self,
@@ -21,6 +21,7 @@ import ipaddress
 import logging
 import logging.config
 import os
+import re
 import sys
 import textwrap
 import time
@@ -156,7 +157,7 @@ class WriteToCSVAction(argparse.Action):
         """If no values, return something arbitrary so the arg is not None."""
         if not values:
             values = f"lswifi_{BOOT_TIME}.csv"
-        VerifyPath(values, ".csv")
+        VerifyPath(values, ".csv.gz" if values.lower().endswith(".gz") else ".csv")
         setattr(namespace, self.dest, values)
 
 
@@ -174,6 +175,34 @@ class WriteToJSONAction(argparse.Action):
         setattr(namespace, self.dest, values)
 
 
+class WriteToEventLogAction(argparse.Action):
+    """Enable write to file arguments
+
+    Intended for the --watchevents event log option
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        """If no values, return something arbitrary so the arg is not None."""
+        if not values:
+            values = f"lswifi_events_{BOOT_TIME}.ndjson"
+        VerifyPath(values, ".ndjson")
+        setattr(namespace, self.dest, values)
+
+
+class WriteToNDJSONAction(argparse.Action):
+    """Enable write to file arguments
+
+    Intended for the JSON Lines option
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        """If no values, return something arbitrary so the arg is not None."""
+        if not values:
+            values = f"lswifi_{BOOT_TIME}.ndjson"
+        VerifyPath(values, ".ndjson")
+        setattr(namespace, self.dest, values)
+
+
 def setup_logger(args) -> logging.Logger:
     """Set up the logger"""
     default_logging = {
@@ -209,6 +238,41 @@ def sensitivity(value):
     return display_sensitivity
 
 
+def rssi_hysteresis(value):
+    """Validate user provided RSSI change threshold is between 1 and 30 dB"""
+    try:
+        threshold = int(value)
+        if threshold not in range(1, 31):
+            raise argparse.ArgumentTypeError(
+                "rssi change threshold must be a value from 1 to 30 dB"
+            )
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(
+            f"{value} not a valid rssi change threshold"
+        ) from err
+    return threshold
+
+
+def positive_count(value):
+    """Validate user provided count is a whole number from 1 to 65535"""
+    try:
+        count = int(value)
+        if count not in range(1, 65536):
+            raise argparse.ArgumentTypeError("count must be a value from 1 to 65535")
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"{value} not a valid count") from err
+    return count
+
+
+def directed_ssid(value):
+    """Validate user provided SSID fits in the 32 octets allowed by 802.11"""
+    if not value or len(value.encode("utf-8")) > 32:
+        raise argparse.ArgumentTypeError(
+            f"{value!r} not a valid SSID. must be between 1 and 32 octets"
+        )
+    return value
+
+
 def json_indent(value):
     """Validate user provided pretty print json value is sane and between 0 and 4"""
     try:
@@ -253,6 +317,42 @@ def syslog_ip(value):
         raise argparse.ArgumentTypeError(f"IP address {value} is not valid") from err
 
 
+def duration(value):
+    """Seconds for a duration like 3600, 30m, 6h or 7d"""
+    match = re.match(r"^(\d+)([smhd]?)$", str(value).strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise argparse.ArgumentTypeError(
+            f"{value} is not a duration like 3600, 30m, 6h or 7d"
+        )
+    return (
+        int(match.group(1))
+        * {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+    )
+
+
+def size_mb(value):
+    """Bytes for a positive size in megabytes"""
+    try:
+        size = float(value)
+    except ValueError:
+        size = 0
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"{value} is not a size in MB")
+    return int(size * 1024 * 1024)
+
+
+def metrics_address(value):
+    """(host, port) from PORT or HOST:PORT; the host defaults to 127.0.0.1"""
+    host, _, port = str(value).rpartition(":")
+    try:
+        port = int(port)
+    except ValueError:
+        port = -1
+    if not 0 <= port <= 65535:
+        raise argparse.ArgumentTypeError(f"{value} is not a PORT or HOST:PORT")
+    return host.strip("[]") or "127.0.0.1", port
+
+
 def setup_parser() -> argparse.ArgumentParser:
     """Sets up the parser for arguments passed into the module from the CLI.
 
@@ -375,6 +475,23 @@ def setup_parser() -> argparse.ArgumentParser:
         metavar="#",
         help="seconds between scans",
     )
+    parser.add_argument(
+        "--changes",
+        dest="changes",
+        metavar="dB",
+        nargs="?",
+        const=5,
+        default=None,
+        type=rssi_hysteresis,
+        help="only output BSSIDs which appeared, disappeared, or changed since the previous scan. RSSI changes smaller than dB are ignored (5 is default)",
+    )
+    parser.add_argument(
+        "--merge",
+        dest="merge",
+        action="store_true",
+        default=False,
+        help="merge the scan results of all interfaces into one table, with the best, mean, and per-interface RSSI of each BSSID",
+    )
     parser.add_argument(
         "-ies",
         type=str,
@@ -433,6 +550,14 @@ def setup_parser() -> argparse.ArgumentParser:
         metavar="SSID",
         help="display filter to exclude results by specified SSIDs (partial matching supported)",
     )
+    parser.add_argument(
+        "--directed",
+        dest="directed",
+        metavar="SSID",
+        action="append",
+        type=directed_ssid,
+        help="directed scan which probes for the specified SSID and only decodes results for it. repeat to rotate between several SSIDs, one per scan",
+    )
     parser.add_argument(
         "-bssid",
         "-bss",
@@ -464,6 +589,13 @@ def setup_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="adds beacon period column to output using information from AP beacon",
     )
+    parser.add_argument(
+        "--top",
+        dest="top",
+        metavar="N",
+        type=positive_count,
+        help="only output the N strongest BSSIDs passing the display filters, or the N longest up with --uptime",
+    )
     parser.add_argument(
         "--uptime",
         "-uptime",
@@ -478,6 +610,40 @@ def setup_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="adds country code column to output using information from AP beacon country IE",
     )
+    parser.add_argument(
+        "--rssi-stats",
+        dest="rssi_stats",
+        action="store_true",
+        help="add the average, standard deviation and 10th/90th percentile of each BSSID's recent RSSI, and in exports also its min, max, median and EWMA",
+    )
+    parser.add_argument(
+        "--rssi-window",
+        dest="rssi_window",
+        metavar="SAMPLES",
+        type=positive_count,
+        default=120,
+        help="number of recent RSSI samples per BSSID the --rssi-stats statistics cover (default: 120)",
+    )
+    parser.add_argument(
+        "--rssi-evict",
+        dest="rssi_evict",
+        metavar="SCANS",
+        type=positive_count,
+        default=10,
+        help="forget the RSSI history of a BSSID not heard for this many scans (default: 10)",
+    )
+    parser.add_argument(
+        "--occupancy",
+        dest="occupancy",
+        action="store_true",
+        help="special mode to create an alternate table of BSS count, RSSI, bonded channel overlap and QBSS load per 20 MHz channel",
+    )
+    parser.add_argument(
+        "--mld",
+        dest="mld",
+        action="store_true",
+        help="special mode to create an alternate table of Wi-Fi 7 AP MLDs and their affiliated links from Multi-Link elements and RNR MLD parameters",
+    )
     parser.add_argument(
         "-rnr",
         "--rnr",
@@ -503,7 +669,13 @@ def setup_parser() -> argparse.ArgumentParser:
         "--append-ethers",
         metavar="BSSID,APNAME",
         dest="append",
-        help="append BSSID and AP name to ethers file for AP names",
+        help="append BSSID and AP name to ethers file for AP names. a BSSID ending in * such as aa:bb:cc:dd:ee:f* names every BSSID with that prefix",
+    )
+    parser.add_argument(
+        "--import-ethers",
+        metavar="CSV_FILE",
+        dest="import_ethers",
+        help="bulk import BSSID and AP name pairs to the ethers file from a CSV or inventory export with BSSID/MAC and AP name columns",
     )
     parser.add_argument(
         "--display-ethers",
@@ -511,6 +683,19 @@ def setup_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="display the list of saved ethers; (BSSID,APNAME) mapping",
     )
+    parser.add_argument(
+        "--vendor",
+        dest="vendor",
+        action="store_true",
+        help="adds a vendor column from the OUI database to output, and to -rnr output for neighbor BSSIDs",
+    )
+    parser.add_argument(
+        "--oui-import",
+        nargs="+",
+        metavar="REGISTRY_FILE",
+        dest="oui_import",
+        help="build the OUI database for --vendor from IEEE MA-L, MA-M and MA-S registry files (oui.csv, mam.csv, oui36.csv or the .txt versions) or a Wireshark manuf file",
+    )
     parser.add_argument(
         "--data-location",
         dest="data_location",
@@ -566,13 +751,67 @@ def setup_parser() -> argparse.ArgumentParser:
         type=json_indent,
         help="JSON output will be formatted with pretty print with provided indent level",
     )
+    parser.add_argument(
+        "--ndjson",
+        nargs="?",
+        type=str,
+        dest="ndjson",
+        action=WriteToNDJSONAction,
+        help="append scans to a JSON Lines file, one record per line, without rewriting the file each scan",
+    )
+    parser.add_argument(
+        "--ndjson-per",
+        dest="ndjson_per",
+        choices=["bss", "scan"],
+        default="bss",
+        help="write one JSON Lines record per BSS observation (default) or one per scan",
+    )
+    parser.add_argument(
+        "--ndjson-to-json",
+        dest="ndjson_to_json",
+        metavar="NDJSON_FILE",
+        help="convert a JSON Lines file written with --ndjson to the nested --json format and print it",
+    )
+    parser.add_argument(
+        "--metrics",
+        nargs="?",
+        dest="metrics",
+        metavar="[HOST:]PORT",
+        type=metrics_address,
+        const=("127.0.0.1", 9101),
+        help="serve scan, decode and export metrics in the Prometheus text format at http://HOST:PORT/metrics (default: 127.0.0.1:9101)",
+    )
+    parser.add_argument(
+        "--daemon",
+        dest="daemon",
+        action="store_true",
+        help="keep running as a service which keeps interfaces, handles and caches open and answers scan, current AP and event requests on a local pipe; scans every --interval seconds when given",
+    )
+    parser.add_argument(
+        "--daemon-address",
+        dest="daemon_address",
+        metavar="ADDRESS",
+        help="named pipe or Unix socket of the service (default: \\\\.\\pipe\\lswifi on Windows)",
+    )
+    parser.add_argument(
+        "--daemon-request",
+        dest="daemon_request",
+        choices=["ping", "interfaces", "latest", "scan", "current-ap", "events"],
+        help="print the JSON answer of a running service, or every WLAN event it sees for events",
+    )
+    parser.add_argument(
+        "--sqlite",
+        dest="sqlite",
+        metavar="DB_FILE",
+        help="store every scan in an indexed SQLite database which can be queried with the history command",
+    )
     parser.add_argument(
         "--csv",
         nargs="?",
         type=str,
         dest="csv",
         action=WriteToCSVAction,
-        help="output will be formatted as csv",
+        help="output will be formatted as csv. a file name ending in .csv.gz is written gzip compressed",
     )
     parser.add_argument(
         "-exportraw",
@@ -600,6 +839,18 @@ def setup_parser() -> argparse.ArgumentParser:
         dest="export_path",
         help="specify output path for pcapng export (defaults to app data directory)",
     )
+    parser.add_argument(
+        "--record",
+        dest="record",
+        metavar="JOURNAL_FILE",
+        help="append every raw BSS list returned by the driver to a journal file which can be replayed later",
+    )
+    parser.add_argument(
+        "--replay",
+        dest="replay",
+        metavar="FILE",
+        help="scan from a journal recorded with --record, or from a pcap/pcapng file, instead of the wireless interfaces. without --scans or --time every recorded scan is played back",
+    )
     parser.add_argument(
         "-decoderaw",
         dest="decoderaw",
@@ -631,6 +882,59 @@ def setup_parser() -> argparse.ArgumentParser:
         dest="syslog",
         help="syslogs events from --watchevents to a remote syslog server",
     )
+    parser.add_argument(
+        "--event-log",
+        nargs="?",
+        type=str,
+        dest="event_log",
+        action=WriteToEventLogAction,
+        help="append events from --watchevents to a rotating JSON Lines file",
+    )
+    parser.add_argument(
+        "--event-log-max-size",
+        dest="event_log_max_bytes",
+        metavar="MB",
+        type=size_mb,
+        default=50 * 1024 * 1024,
+        help="rotate the event log when it reaches this size in MB (default: 50)",
+    )
+    parser.add_argument(
+        "--event-log-rotate",
+        dest="event_log_rotate",
+        metavar="DURATION",
+        type=duration,
+        default=None,
+        help="also rotate the event log after a duration such as 6h or 1d",
+    )
+    parser.add_argument(
+        "--event-log-backups",
+        dest="event_log_backups",
+        metavar="N",
+        type=int,
+        default=10,
+        help="number of rotated event logs to keep (default: 10)",
+    )
+    parser.add_argument(
+        "--event-log-gzip",
+        dest="event_log_gzip",
+        action="store_true",
+        help="gzip compress rotated event logs",
+    )
+    parser.add_argument(
+        "--syslog-protocol",
+        dest="syslog_protocol",
+        choices=["udp", "tcp"],
+        default="udp",
+        help="send syslog over UDP datagrams or a TCP connection with octet counting framing (default: udp)",
+    )
+    parser.add_argument(
+        "--syslog-port",
+        dest="syslog_port",
+        metavar="PORT",
+        type=int,
+        default=slog.SYSLOG_PORT,
+        help=f"port of the syslog servers (default: {slog.SYSLOG_PORT})",
+    )
     parser.add_argument(
         "--debug",
         action="store_const",
@@ -645,4 +949,28 @@ def setup_parser() -> argparse.ArgumentParser:
     completion_parser.add_argument(
         "shell", choices=["powershell"], help="Shell to generate completion for"
     )
+    history_parser = subparsers.add_parser(
+        "history", help="Query scans stored with --sqlite"
+    )
+    history_parser.add_argument(
+        "database", metavar="DB_FILE", help="database written with --sqlite"
+    )
+    history_parser.add_argument(
+        "query",
+        choices=["rssi", "channel"],
+        help="rssi: RSSI timeline of a BSSID. channel: BSSIDs seen on a channel",
+    )
+    history_parser.add_argument(
+        "value", metavar="BSSID|CHANNEL", help="the BSSID or channel number to query"
+    )
+    history_parser.add_argument(
+        "--since",
+        metavar="TIME",
+        help="only scans at or after TIME, either ISO 8601 or relative like 30m, 6h or 7d",
+    )
+    history_parser.add_argument(
+        "--until",
+        metavar="TIME",
+        help="only scans at or before TIME, either ISO 8601 or relative like 30m, 6h or 7d",
+    )
     return parser
@@ -0,0 +1,158 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.bindings
+~~~~~~~~~~~~~~~
+
+bind ctypes prototypes to a native library once, time every call, and pool client handles
+"""
+
+import contextlib
+import logging
+import threading
+import time
+from collections import namedtuple
+
+Prototype = namedtuple("Prototype", ["argtypes", "restype"])
+
+
+class APICallStats:
+    """Call count and latency figures for one native API function"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, elapsed_ns: int) -> None:
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    @property
+    def mean_ns(self):
+        return self.total_ns / self.count if self.count else 0
+
+    def __repr__(self):
+        return f"APICallStats(count={self.count}, total_ns={self.total_ns}, max_ns={self.max_ns})"
+
+    def __str__(self):
+        return f"{self.count} calls, mean {self.mean_ns / 1e6:.3f} ms, max {self.max_ns / 1e6:.3f} ms"
+
+
+class BoundLibrary:
+    """A native library with its prototypes declared once up front.
+
+    library can be a loaded DLL or any object exposing callables with the same
+    names (a fake for testing). Prototypes are only applied to ctypes function
+    pointers; Python fakes receive the arguments exactly as passed.
+
+    Functions are called as attributes, e.g. lib.WlanOpenHandle(...), and every
+    call is counted and timed in lib.stats.
+    """
+
+    def __init__(self, library, prototypes: dict):
+        self.library = library
+        self.prototypes = prototypes
+        self.stats = {name: APICallStats() for name in prototypes}
+        self._calls = {}
+        for name, prototype in prototypes.items():
+            func = getattr(library, name, None)
+            if func is None:
+                continue
+            with contextlib.suppress(AttributeError, TypeError):
+                func.argtypes = prototype.argtypes
+                func.restype = prototype.restype
+            self._calls[name] = self._timed(func, self.stats[name])
+
+    def __repr__(self):
+        return f"BoundLibrary({self.library!r}, {len(self._calls)} functions)"
+
+    @staticmethod
+    def _timed(func, stats):
+        def call(*args):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args)
+            finally:
+                stats.add(time.perf_counter_ns() - start)
+
+        return call
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["_calls"][name]
+        except KeyError:
+            raise AttributeError(
+                f"{name} is not bound on {self.__dict__.get('library')!r}"
+            ) from None
+
+    def reset_stats(self) -> None:
+        for stats in self.stats.values():
+            stats.__init__()
+
+
+class HandlePool:
+    """Session scoped pool of client handles.
+
+    Handles are opened on demand, handed out one caller at a time, and kept
+    open for reuse instead of being opened and closed around every call.
+    """
+
+    def __init__(self, open_handle, close_handle, max_idle=4):
+        self.log = logging.getLogger(__name__)
+        self._open_handle = open_handle
+        self._close_handle = close_handle
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    def __repr__(self):
+        return f"HandlePool(idle={len(self._idle)}, opened={self.opened}, reused={self.reused})"
+
+    @contextlib.contextmanager
+    def handle(self):
+        """Borrow a handle for the duration of the with block."""
+        with self._lock:
+            handle = self._idle.pop() if self._idle else None
+            if handle is not None:
+                self.reused += 1
+        if handle is None:
+            handle = self._open_handle()
+            with self._lock:
+                self.opened += 1
+        try:
+            yield handle
+        except BaseException:
+            # the handle may be what failed, so do not hand it out again
+            self._close(handle)
+            raise
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(handle)
+                handle = None
+        if handle is not None:
+            self._close(handle)
+
+    def _close(self, handle) -> None:
+        try:
+            self._close_handle(handle)
+        except Exception as error:
+            self.log.debug("problem closing pooled handle %s: %s", handle, error)
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for handle in idle:
+            self._close(handle)
@@ -0,0 +1,96 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.bssinfo
+~~~~~~~~~~~~~~
+
+fixed field BSS summaries which skip information element decoding
+"""
+
+from collections import namedtuple
+from ctypes import addressof, c_char, sizeof
+
+from lswifi import wlanapi as WLAN_API
+from lswifi.elements import WirelessNetworkBss
+from lswifi.helpers import convert_mac_address_to_string
+
+BssSummary = namedtuple(
+    "BssSummary",
+    ["bssid", "ssid", "rssi", "frequency", "link_quality", "phy_id", "raw"],
+    defaults=[None],
+)
+BssSummary.__doc__ = """Fixed fields of a WLAN_BSS_ENTRY; frequency is in MHz and raw is
+only kept for entries which may need a full decode later"""
+
+
+def decode_ssid(dot11_ssid) -> str:
+    try:
+        return dot11_ssid.SSID[: WLAN_API.DOT11_SSID_MAX_LENGTH].decode("utf-8")
+    except UnicodeDecodeError:
+        return dot11_ssid.SSID[: WLAN_API.DOT11_SSID_MAX_LENGTH].decode("latin-1")
+
+
+def format_frequency(frequency) -> str:
+    """MHz to the GHz string used by the decoded output, e.g. 5180 to 5.180"""
+    return f"{int(frequency) / 1000:.3f}"
+
+
+def bss_entry_ies(bss_entry) -> bytes:
+    """The information elements which follow an entry, at IeOffset from its start"""
+    return bytes(
+        (c_char * bss_entry.IeSize).from_address(
+            addressof(bss_entry) + bss_entry.IeOffset
+        )
+    )
+
+
+def copy_bss_entry(bss_entry) -> bytes:
+    """Copy an entry and its IEs out of WLAN owned memory.
+
+    The IEs are placed directly after the entry and IeOffset is rewritten to
+    match, so the copy can be decoded after the BSS list has been freed.
+    """
+    copy = type(bss_entry).from_buffer_copy(bss_entry)
+    copy.IeOffset = sizeof(copy)
+    return bytes(copy) + bss_entry_ies(bss_entry)
+
+
+def summarize_bss_entry(bss_entry, keep_raw=False) -> BssSummary:
+    return BssSummary(
+        bssid=convert_mac_address_to_string(bss_entry.dot11Bssid),
+        ssid=decode_ssid(bss_entry.dot11Ssid),
+        rssi=bss_entry.Rssi,
+        frequency=round(bss_entry.ChCenterFrequency / 1000),  # kHz to MHz
+        link_quality=bss_entry.LinkQuality,
+        phy_id=bss_entry.PhyId,
+        raw=copy_bss_entry(bss_entry) if keep_raw else None,
+    )
+
+
+def summarize_bss_entries(bss_entries, keep_raw=()) -> list:
+    """Summarize entries, keeping raw copies only for BSSIDs in keep_raw"""
+    summaries = []
+    for bss_entry in bss_entries:
+        bssid = convert_mac_address_to_string(bss_entry.dot11Bssid)
+        summaries.append(summarize_bss_entry(bss_entry, keep_raw=bssid in keep_raw))
+    return summaries
+
+
+def decode_bss_summary(summary, connected_bssid=None, is_bytes_arg=False):
+    """Fully decode a summary which was taken with keep_raw; returns None otherwise"""
+    if summary.raw is None:
+        return None
+    buffer = bytearray(summary.raw)
+    bss_entry = WLAN_API.WLANBSSEntry.from_buffer(buffer)
+    bss = WirelessNetworkBss(bss_entry, connected_bssid, is_bytes_arg=is_bytes_arg)
+    # the decoded object holds on to bss_entry, which points into buffer
+    bss.raw_buffer = buffer
+    return bss
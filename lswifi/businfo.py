@@ -0,0 +1,204 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.businfo
+~~~~~~~~~~~~~~
+
+persistent cache of adapter bus type and link speed
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import Future
+from threading import Lock, Thread
+
+from lswifi.__version__ import __title__
+from lswifi.constants import BUSINFOJSONFILE
+
+try:
+    import winreg
+except ImportError:  # not win32
+    winreg = None
+
+# bus type and link speed rarely change, so entries are trusted for a week
+BUS_INFO_TTL = 7 * 24 * 60 * 60
+
+NETWORK_CLASS_KEY = (
+    r"SYSTEM\CurrentControlSet\Control\Network\{4D36E972-E325-11CE-BFC1-08002BE10318}"
+)
+
+
+def default_cache_path():
+    """businfo.json in the lswifi appdata folder, or None when there is no LOCALAPPDATA"""
+    if not os.getenv("LOCALAPPDATA"):
+        return None
+    return os.path.join(os.getenv("LOCALAPPDATA"), __title__, BUSINFOJSONFILE)  # type: ignore
+
+
+def read_pnp_instance_id(adapter_guid: str):
+    """PnP instance ID of the adapter from the registry, which is a single key read.
+
+    Returns None when it cannot be read, in which case cache entries are
+    matched on the GUID alone.
+    """
+    if winreg is None:
+        return None
+    try:
+        key_path = f"{NETWORK_CLASS_KEY}\\{{{adapter_guid.upper()}}}\\Connection"
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path) as key:
+            return str(winreg.QueryValueEx(key, "PnPInstanceId")[0])
+    except OSError:
+        return None
+
+
+class BusInfoCache:
+    """Bus type and link speed per adapter, kept on disk between runs.
+
+    Entries are keyed by adapter GUID and checked against the PnP instance
+    ID, so moving an adapter to another port or swapping the hardware behind
+    a GUID invalidates the entry. Cached entries are returned straight away;
+    stale ones are refreshed in the background and missing ones are probed
+    in parallel when prefetched. Probes run on daemon threads, so a refresh
+    still in progress never holds up the process on exit.
+    """
+
+    def __init__(
+        self, path=None, probe=None, ttl=BUS_INFO_TTL, pnp_lookup=read_pnp_instance_id
+    ):
+        self.log = logging.getLogger(__name__)
+        self.path = path
+        self.ttl = ttl
+        self._probe = probe
+        self._pnp_lookup = pnp_lookup
+        self._lock = Lock()
+        self._entries = None
+        self._pending = {}
+        self.probes = 0
+
+    def __repr__(self):
+        return f"BusInfoCache(path={self.path!r}, ttl={self.ttl}, probes={self.probes})"
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            self._entries = {}
+            if self.path and os.path.isfile(self.path):
+                try:
+                    with open(self.path, encoding="utf-8") as file:
+                        self._entries = json.load(file)
+                except (OSError, ValueError):
+                    self.log.debug("ignoring unreadable bus info cache %s", self.path)
+        return self._entries
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp = f"{self.path}.tmp"
+            with open(temp, "w", encoding="utf-8") as file:
+                json.dump(self._entries, file, indent=2)
+            os.replace(temp, self.path)
+        except OSError as error:
+            self.log.debug("could not write bus info cache %s: %s", self.path, error)
+
+    def _lookup(self, guid: str):
+        """The cached entry for guid if it still matches the adapter, and whether it is stale"""
+        entry = self._load().get(guid)
+        if entry is None:
+            return None, True
+        pnp_id = self._pnp_lookup(guid)
+        if pnp_id and entry.get("pnp_id") and pnp_id != entry["pnp_id"]:
+            return None, True
+        return entry, time.time() - entry.get("updated", 0) > self.ttl
+
+    def _refresh(self, guid: str) -> tuple:
+        try:
+            bus_type, bus_info = self._probe(guid)
+            pnp_id = self._pnp_lookup(guid)
+        except Exception:
+            with self._lock:
+                self._pending.pop(guid, None)
+            raise
+        with self._lock:
+            self.probes += 1
+            if bus_type is None and bus_info is None:
+                # failed or timed out; keep any older entry and probe again next time
+                self.log.debug("bus info probe for %s returned nothing", guid)
+            else:
+                self._load()[guid] = {
+                    "pnp_id": pnp_id,
+                    "bus_type": bus_type,
+                    "bus_info": bus_info,
+                    "updated": time.time(),
+                }
+                self._save()
+            # only now, so nothing sees the entry as missing while it is stored
+            self._pending.pop(guid, None)
+        return bus_type, bus_info
+
+    def _submit(self, guid: str):
+        """Start a probe for guid unless one is already running; call with the lock held"""
+        future = self._pending.get(guid)
+        if future is None:
+            future = Future()
+            self._pending[guid] = future
+            Thread(
+                target=self._run, args=(guid, future), name="businfo", daemon=True
+            ).start()
+        return future
+
+    def _run(self, guid: str, future: Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = self._refresh(guid)
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def prefetch(self, guids) -> None:
+        """Start probes in parallel for every adapter which is missing or stale."""
+        with self._lock:
+            for guid in guids:
+                _entry, stale = self._lookup(guid)
+                if stale:
+                    self._submit(guid)
+
+    def get(self, guid: str) -> tuple:
+        """(bus_type, bus_info) for guid.
+
+        A cached entry is returned immediately, even when stale, in which case
+        it is refreshed in the background. Only a missing entry waits on the
+        probe.
+        """
+        with self._lock:
+            entry, stale = self._lookup(guid)
+            future = self._submit(guid) if stale else None
+        if entry is not None:
+            return entry["bus_type"], entry["bus_info"]
+        try:
+            return future.result()
+        except Exception:
+            self.log.debug("bus info probe failed for %s", guid, exc_info=True)
+            return None, None
+
+    def invalidate(self, guid=None) -> None:
+        """Forget guid, or every adapter, e.g. after an interface arrives."""
+        with self._lock:
+            entries = self._load()
+            if guid is None:
+                entries.clear()
+            else:
+                entries.pop(guid, None)
+            self._save()
@@ -15,6 +15,7 @@ lswifi.client
 client side code for requesting a scan, waiting for scan complete, and getting the results.
 """
 
+import contextlib
 import ctypes
 import datetime
 import functools
@@ -27,19 +28,28 @@ import subprocess
 import sys
 import time
 import traceback
-import winreg
 from ctypes import wintypes
+from threading import Event as ThreadingEvent
 from threading import Lock, Timer
-from types import SimpleNamespace
 from typing import Optional, Union
 
+from lswifi import metrics
 from lswifi import wlanapi as WLAN_API
+from lswifi.bssinfo import format_frequency
+from lswifi.businfo import BusInfoCache, default_cache_path
+from lswifi.directed import SsidRotation
 from lswifi.helpers import (
     is_five_band,
     is_six_band,
     is_two_four_band,
 )
-from lswifi.slog import message as syslog
+from lswifi.slog import send as syslog
+from lswifi.watch import WatchState
+
+try:
+    import winreg
+except ImportError:  # not win32
+    winreg = None
 
 # PCI Express Link Speed Encoding (PciExpressCurrentLinkSpeedEncoded)
 # https://learn.microsoft.com/en-us/windows/win32/fwp/wmi/netadaptercimprov/msft-netadapterhardwareinfosettingdata
@@ -73,17 +83,19 @@ OPEN_EXISTING = 3
 IOCTL_USB_GET_NODE_CONNECTION_INFORMATION_EX_V2 = 0x22045C
 GUID_DEVINTERFACE_USB_HUB = "{f18a0e88-c30c-11d0-8815-00a0c906bed8}"
 
-_kernel32 = ctypes.windll.kernel32
-_kernel32.CreateFileW.restype = wintypes.HANDLE
-_kernel32.CreateFileW.argtypes = [
-    wintypes.LPCWSTR,
-    wintypes.DWORD,
-    wintypes.DWORD,
-    wintypes.LPVOID,
-    wintypes.DWORD,
-    wintypes.DWORD,
-    wintypes.HANDLE,
-]
+_kernel32 = None
+if sys.platform == "win32":
+    _kernel32 = ctypes.windll.kernel32
+    _kernel32.CreateFileW.restype = wintypes.HANDLE
+    _kernel32.CreateFileW.argtypes = [
+        wintypes.LPCWSTR,
+        wintypes.DWORD,
+        wintypes.DWORD,
+        wintypes.LPVOID,
+        wintypes.DWORD,
+        wintypes.DWORD,
+        wintypes.HANDLE,
+    ]
 _INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
 
 
@@ -160,6 +172,10 @@ def get_adapter_bus_info(adapter_guid: str) -> tuple:
     return None, None
 
 
+# bus info probes spawn PowerShell, so results are kept between runs
+BUS_INFO_CACHE = BusInfoCache(default_cache_path(), probe=get_adapter_bus_info)
+
+
 def _is_usb_device_present(pnp_device_id: str) -> bool:
     """Check if USB device is currently present/connected.
 
@@ -424,6 +440,34 @@ class TimerEx:
         self._function(*self._args, **self._kwargs)
 
 
+class ScanLatencyStats:
+    """Running scan completion latency figures for one completion path"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, latency: float) -> None:
+        self.count += 1
+        self.total += latency
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = latency if self.max is None else max(self.max, latency)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def __repr__(self):
+        return f"ScanLatencyStats(count={self.count}, mean={self.mean}, min={self.min}, max={self.max})"
+
+    def __str__(self):
+        if not self.count:
+            return "0 scans"
+        return f"{self.count} scans, mean {self.mean:.3f}s, min {self.min:.3f}s, max {self.max:.3f}s"
+
+
 class Event:
     """Native Wifi event class"""
 
@@ -631,7 +675,7 @@ def get_interface_info(args, iface) -> str:
                     wlanConnectionMode = wlanConnectionMode[21:]
 
                 guid_no_braces = iface.guid_string.strip("{}").lower()
-                bus_type, bus_info = get_adapter_bus_info(guid_no_braces)
+                bus_type, bus_info = BUS_INFO_CACHE.get(guid_no_braces)
 
                 if (
                     args.json
@@ -762,7 +806,19 @@ class Client:
     def __init__(self, args, iface, ssid=None):
         try:
             self.log = logging.getLogger(__name__)
-            self.scan_finished = False
+            # set by the WLAN notification callback (or the timeout timer) once the
+            # scan results are ready, so waiters block instead of polling
+            self.scan_event = ThreadingEvent()
+            self.scan_lock = Lock()
+            self.scan_started = None
+            self.last_scan_latency = None
+            self.last_scan_completed_by = None
+            self.scan_latency_stats = {
+                "notification": ScanLatencyStats(),
+                "timeout": ScanLatencyStats(),
+            }
+            self.scan_listeners = []
+            self.event_listeners = []
             self.data = None
             self.last_event = ""
             now = datetime.datetime.now()
@@ -774,14 +830,16 @@ class Client:
             )
             self.last_scan_time_utc = nowutc
             self.args = args
-            self.get_bssid_args = SimpleNamespace(
-                get_current_ap=True,
-                raw=True,
-                event_watcher=True,
-                get_current_channel=False,
-                supported=False,
-                is_bytes_arg=self.args.bytes,
-            )
+            self.watch = WatchState(iface)
+            # shared MergedScan when results are merged across interfaces
+            self.merge = None
+            # JournalWriter when raw BSS lists are recorded with --record
+            self.journal = None
+            # EventLog when --watchevents are written with --event-log
+            self.events = None
+            self.directed = None
+            if args.directed:
+                self.directed = SsidRotation(args.directed)
             self.timeout_interval = 7.0
             self.client_handle = WLAN_API.WLAN.open_handle()
             # self.scan_timer = Timer(self.timeout_interval, self.scan_timeout)
@@ -816,12 +874,23 @@ class Client:
                     "problem closing %s with result", self.client_handle, result
                 )
 
-    def get_bss_list(self, interface, bytes=False) -> Union[list, None]:
+    def get_bss_list(
+        self, interface, bytes=False, trigger="scan_list_refresh"
+    ) -> Union[list, None]:
         if interface:
             try:
-                wireless_network_bss_list = WLAN_API.WLAN.get_wireless_network_bss_list(
-                    interface, is_bytes_arg=bytes
-                )
+                recorder = None
+                if self.journal is not None:
+                    recorder = self.journal.recorder(interface.guid_string, trigger)
+                get_bss_list = WLAN_API.WLAN.get_wireless_network_bss_list
+                with metrics.DECODE_SECONDS.time(interface=self.mac):
+                    wireless_network_bss_list = get_bss_list(
+                        interface,
+                        is_bytes_arg=bytes,
+                        ssids=self.directed.ssids if self.directed else None,
+                        decoder=self.merge.decoder(self.mac) if self.merge else None,
+                        recorder=recorder,
+                    )
 
                 if len(wireless_network_bss_list) == 0:
                     return None
@@ -846,14 +915,40 @@ class Client:
     def seconds_passed(self, oldepoch, seconds) -> bool:
         return time.time() - oldepoch >= seconds
 
+    def record_event(self, event, bssid) -> None:
+        """Add the event to the event log with the last known state of the connected BSS"""
+        connected = self.watch.connected
+        if connected is not None and connected.bssid == bssid:
+            self.events.record(
+                event,
+                self.mac,
+                bssid=bssid,
+                ssid=connected.ssid,
+                frequency=connected.frequency,
+                rssi=connected.rssi,
+            )
+        else:
+            self.events.record(event, self.mac, bssid=bssid)
+
     def on_event_notification(self, wlan_event, iface_guid) -> None:
         if self.iface.guid_string == str(iface_guid):
             pass
         else:
             return
         if wlan_event is not None:
-            # attempt to get connected bssid
-            bssid = get_interface_info(self.get_bssid_args, self.iface)
+            if str(wlan_event).strip() == "interface_arrival":
+                # the adapter may have been re-plugged into a different port
+                BUS_INFO_CACHE.invalidate(self.iface.guid_string.strip("{}").lower())
+                WLAN_API.invalidate_adapter_cache()
+
+            metrics.WLAN_EVENTS.inc(interface=self.mac, event=str(wlan_event).strip())
+
+            # connected bssid is cached until a connection related event arrives
+            self.watch.on_event(str(wlan_event).strip())
+            bssid = self.watch.connected_bssid
+
+            for listener in list(self.event_listeners):
+                listener(self, str(wlan_event).strip(), bssid)
 
             # if we want to watch wlan events on the terminal
             if self.args.event_watcher:
@@ -890,18 +985,15 @@ class Client:
                     "roaming_start",
                     "roaming_end",
                 ]:
-                    self.data = self.get_bss_list(self.iface, bytes=self.args.bytes)
-                    bssid_data = None
-                    if self.data is not None:
-                        for bss in self.data:
-                            if bssid == str(bss.bssid):
-                                bssid_data = bss
-                                break
+                    # fixed fields only; the connected BSS is decoded on demand
+                    summaries = self.watch.refresh()
+                    bssid_data = self.watch.connected
+                    if summaries is not None:
                         rssi = ""
                         freq = ""
                         if bssid_data:
                             rssi = bssid_data.rssi
-                            freq = bssid_data.channel_frequency
+                            freq = format_frequency(bssid_data.frequency)
                         extra = ""
                         ssid = ""
 
@@ -912,22 +1004,40 @@ class Client:
                             "scan_list_refresh",
                             "scan_complete",
                         ]:
-                            extra = f", scan: ({len(self.data)} BSSIDs found)"
+                            extra = f", scan: ({len(summaries)} BSSIDs found)"
                         if not bssid:
                             msg = f"({self.mac}), event: ({wlan_event})"
                             self.log.info(msg)
                             if self.args.syslog:
-                                syslog(msg, "INFO")
+                                syslog(
+                                    msg,
+                                    "INFO",
+                                    interface=self.mac,
+                                    event=wlan_event,
+                                    bssid=bssid,
+                                )
                         elif bssid == "00:00:00:00:00:00":
                             msg = f"({self.mac}), bssid: ({bssid}), event: ({wlan_event}){extra}"
                             self.log.info(msg)
                             if self.args.syslog:
-                                syslog(msg, "INFO")
+                                syslog(
+                                    msg,
+                                    "INFO",
+                                    interface=self.mac,
+                                    event=wlan_event,
+                                    bssid=bssid,
+                                )
                         else:
                             msg = f"({self.mac}), bssid: ({bssid}), freq: ({freq}), ssid: ({ssid}), rssi: ({rssi}), event: ({wlan_event}){extra}"
                             self.log.info(msg)
                             if self.args.syslog:
-                                syslog(msg, "INFO")
+                                syslog(
+                                    msg,
+                                    "INFO",
+                                    interface=self.mac,
+                                    event=wlan_event,
+                                    bssid=bssid,
+                                )
                 else:
                     if not squelch:
                         if bssid:
@@ -936,12 +1046,27 @@ class Client:
                             )
                             self.log.info(msg)
                             if self.args.syslog:
-                                syslog(msg, "INFO")
+                                syslog(
+                                    msg,
+                                    "INFO",
+                                    interface=self.mac,
+                                    event=wlan_event,
+                                    bssid=bssid,
+                                )
                         else:
                             msg = f"({self.mac}), event: ({wlan_event})"
                             self.log.info(msg)
                             if self.args.syslog:
-                                syslog(msg, "INFO")
+                                syslog(
+                                    msg,
+                                    "INFO",
+                                    interface=self.mac,
+                                    event=wlan_event,
+                                    bssid=bssid,
+                                )
+
+                if self.events is not None:
+                    self.record_event(str(wlan_event).strip(), bssid)
 
             # if we're not watching for events and we want to return scan results
             if not self.args.event_watcher:
@@ -959,7 +1084,6 @@ class Client:
                 if str(wlan_event).strip() == "scan_list_refresh":
                     self.log.debug(f"({self.mac}), start get_bss_list...")
                     self.data = self.get_bss_list(self.iface, bytes=self.args.bytes)
-                    self.scan_finished = True
                     now = datetime.datetime.now()
                     nowutc = now.now(datetime.timezone.utc)
                     self.last_scan_time_epoch = now.timestamp()
@@ -969,6 +1093,7 @@ class Client:
                     )
                     self.last_scan_time_utc = nowutc
                     self.log.debug(f"({self.mac}), finish get_bss_list...")
+                    self.finish_scan("notification")
 
                 # if str(wlan_event).strip() == "network_available":
                 #    pass
@@ -988,12 +1113,70 @@ class Client:
     def my_handle(self):
         return self.client_handle
 
+    @property
+    def scan_finished(self) -> bool:
+        return self.scan_event.is_set()
+
+    def finish_scan(self, completed_by: str) -> bool:
+        """Mark the pending scan complete and wake up anything waiting on it.
+
+        Args:
+            completed_by: which path completed the scan ("notification" or "timeout")
+
+        Returns:
+            True if this call completed the scan, False if it was already complete
+        """
+        with self.scan_lock:
+            if self.scan_event.is_set():
+                return False
+            if self.scan_started is not None:
+                self.last_scan_latency = time.perf_counter() - self.scan_started
+                self.scan_latency_stats[completed_by].add(self.last_scan_latency)
+                metrics.SCAN_LATENCY.observe(self.last_scan_latency, interface=self.mac)
+                self.log.debug(
+                    f"({self.mac}), scan completed by {completed_by} in {self.last_scan_latency:.3f} seconds"
+                )
+            self.last_scan_completed_by = completed_by
+            metrics.SCANS_COMPLETED.inc(interface=self.mac, completed_by=completed_by)
+            self.scan_event.set()
+        for listener in list(self.scan_listeners):
+            listener(self)
+        return True
+
+    def wait_for_scan(self, timeout=None) -> bool:
+        """Block until the pending scan completes or timeout seconds pass."""
+        return self.scan_event.wait(timeout)
+
+    def add_scan_listener(self, listener) -> None:
+        """Call listener(client) from the completing thread whenever a scan finishes."""
+        self.scan_listeners.append(listener)
+
+    def remove_scan_listener(self, listener) -> None:
+        with contextlib.suppress(ValueError):
+            self.scan_listeners.remove(listener)
+
+    def add_event_listener(self, listener) -> None:
+        """Call listener(client, event, bssid) from the notification thread for every WLAN event."""
+        self.event_listeners.append(listener)
+
+    def remove_event_listener(self, listener) -> None:
+        with contextlib.suppress(ValueError):
+            self.event_listeners.remove(listener)
+
     async def scan(self):
         try:
-            self.scan_finished = False
-            self.log.debug(f"{self.iface.guid}: scan requested...")
+            with self.scan_lock:
+                self.scan_event.clear()
+                self.scan_started = time.perf_counter()
+            ssid = self.directed.next() if self.directed else None
+            if ssid:
+                self.log.debug(
+                    f"{self.iface.guid}: directed scan for {ssid} requested..."
+                )
+            else:
+                self.log.debug(f"{self.iface.guid}: scan requested...")
             self.scan_timer.start()
-            WLAN_API.WLAN.scan(self.iface.guid)
+            WLAN_API.WLAN.scan(self.iface.guid, ssid)
         except WLAN_API.WLANScanError as scan_error:
             self.log.critical(
                 "Interface (%s) with GUID (%s): %s",
@@ -1013,6 +1196,8 @@ class Client:
             f"timeout interval ({self.timeout_interval} seconds) for {self.mac} exceeded..."
         )
         self.log.debug(f"({self.mac}), start get_bss_list...")
-        self.data = self.get_bss_list(self.iface, bytes=self.args.bytes)
+        self.data = self.get_bss_list(
+            self.iface, bytes=self.args.bytes, trigger="timeout"
+        )
         self.log.debug(f"({self.mac}), finish get_bss_list...")
-        self.scan_finished = True
+        self.finish_scan("timeout")
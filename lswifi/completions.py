@@ -16,6 +16,8 @@ GLOBAL_OPTIONS = [
     "--scans",
     "--interval",
     "--time",
+    "--changes",
+    "--merge",
     "-ies",
     "-threshold",
     "-all",
@@ -24,17 +26,27 @@ GLOBAL_OPTIONS = [
     "-six",
     "-include",
     "-exclude",
+    "--directed",
     "-bssid",
     "--ap-names",
     "--qbss",
     "--tpc",
     "--period",
     "--uptime",
+    "--top",
     "--rnr",
+    "--occupancy",
+    "--mld",
+    "--rssi-stats",
+    "--rssi-window",
+    "--rssi-evict",
     "--channel-width",
     "-ethers",
     "--append-ethers",
+    "--import-ethers",
     "--display-ethers",
+    "--vendor",
+    "--oui-import",
     "--data-location",
     "-ap",
     "-channel",
@@ -43,26 +55,54 @@ GLOBAL_OPTIONS = [
     "--list-interfaces",
     "--json",
     "--indent",
+    "--ndjson",
+    "--ndjson-per",
+    "--ndjson-to-json",
+    "--metrics",
+    "--sqlite",
     "--csv",
     "-exportraw",
     "-export",
     "-path",
+    "--record",
+    "--replay",
     "-decoderaw",
     "-decode",
     "--bytes",
     "--watchevents",
     "--syslog",
+    "--event-log",
+    "--event-log-max-size",
+    "--event-log-rotate",
+    "--event-log-backups",
+    "--event-log-gzip",
+    "--syslog-protocol",
+    "--syslog-port",
+    "--daemon",
+    "--daemon-address",
+    "--daemon-request",
     "--debug",
     "--version",
     "completion",
+    "history",
 ]
 
 CHANNEL_WIDTHS = ["20", "40", "80", "160", "320"]
 
+NDJSON_PER = ["bss", "scan"]
+
+SYSLOG_PROTOCOLS = ["udp", "tcp"]
+
+DAEMON_REQUESTS = ["ping", "interfaces", "latest", "scan", "current-ap", "events"]
+
 SHELLS = ["powershell"]
 
 OPTIONS_WITH_VALUES = {
     "--channel-width": CHANNEL_WIDTHS,
+    "--ndjson-per": NDJSON_PER,
+    "--syslog-protocol": SYSLOG_PROTOCOLS,
+    "--daemon-address": None,
+    "--daemon-request": DAEMON_REQUESTS,
 }
 
 
@@ -76,6 +116,15 @@ def get_completions(args: list[str], current_word: str) -> list[str]:
     if last_arg == "--channel-width":
         return _filter_completions(CHANNEL_WIDTHS, current_word)
 
+    if last_arg == "--ndjson-per":
+        return _filter_completions(NDJSON_PER, current_word)
+
+    if last_arg == "--syslog-protocol":
+        return _filter_completions(SYSLOG_PROTOCOLS, current_word)
+
+    if last_arg == "--daemon-request":
+        return _filter_completions(DAEMON_REQUESTS, current_word)
+
     if last_arg in OPTIONS_WITH_VALUES and OPTIONS_WITH_VALUES[last_arg] is None:
         return []
 
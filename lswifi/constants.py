@@ -19,6 +19,9 @@ from collections import namedtuple
 
 APNAMEACKFILE = "apnames.ack"
 APNAMEJSONFILE = "apnames.json"
+BUSINFOJSONFILE = "businfo.json"
+ETHERSFILE = "ethers"
+OUIDBFILE = "oui.bin"
 
 DECORS = ["~", "+", "=", "-"]
 DECORS_START = "-"
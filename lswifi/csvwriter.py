@@ -0,0 +1,111 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.csvwriter
+~~~~~~~~~~~~~~~~
+
+keep one CSV writer open for every scan in a session
+"""
+
+import csv
+import gzip
+import logging
+import os
+import time
+from threading import Lock
+
+FLUSH_INTERVAL = 1.0
+
+
+def open_csv(path, mode):
+    """Open path for text CSV I/O, through gzip when it ends with .gz"""
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")  # noqa: SIM115
+
+
+def read_columns(path):
+    """The heading row of an existing CSV file, or None if it is empty"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open_csv(path, "r") as file:
+        line = file.readline()
+    if not line.strip():
+        return None
+    return next(csv.reader([line]))
+
+
+class CSVWriter:
+    """Appends scan rows to a CSV file which stays open for the session.
+
+    The column order is fixed by the heading row: read once from the first
+    line of an existing file, or taken from the keys of the first row written
+    to a new one. Rows are written with csv.writer in that order, values for
+    missing columns are left empty and extra keys are dropped. The file is
+    flushed at most every flush_interval seconds and on close. A path ending
+    in .gz is written gzip compressed; appending to one adds a gzip member,
+    which gzip readers handle as one stream.
+    """
+
+    def __init__(self, path, flush_interval=FLUSH_INTERVAL):
+        self.log = logging.getLogger(__name__)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.rows = 0
+        self._lock = Lock()
+        self.columns = read_columns(path)
+        if self.columns is not None:
+            self.log.debug(f"appending to {path} with columns {self.columns}")
+        self.file = open_csv(path, "a")
+        self.writer = csv.writer(self.file)
+        self._last_flush = time.monotonic()
+
+    def __repr__(self):
+        return f"CSVWriter(path={self.path!r}, rows={self.rows})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_rows(self, rows) -> int:
+        """Append dict rows; returns the number of rows written."""
+        if not rows:
+            return 0
+        with self._lock:
+            if self.file is None:
+                return 0
+            if self.columns is None:
+                self.columns = list(rows[0].keys())
+                self.writer.writerow(self.columns)
+            columns = self.columns
+            self.writer.writerows(
+                [row.get(column, "") for column in columns] for row in rows
+            )
+            self.rows += len(rows)
+            now = time.monotonic()
+            if now - self._last_flush >= self.flush_interval:
+                self.file.flush()
+                self._last_flush = now
+        return len(rows)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self.file is not None:
+                self.file.flush()
+                self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,127 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.delta
+~~~~~~~~~~~~
+
+compare each scan with the previous one so only changed rows are output
+"""
+
+from collections import namedtuple
+
+from lswifi.helpers import ie_content_hash
+
+BssState = namedtuple("BssState", ["bssid", "ssid", "rssi", "channel", "width", "ies"])
+
+Change = namedtuple("Change", ["kind", "reasons", "rssi_delta"])
+
+APPEARED = "appeared"
+CHANGED = "changed"
+DISAPPEARED = "disappeared"
+
+
+def state_from_bss(bss) -> BssState:
+    """Snapshot the fields of a decoded WirelessNetworkBss which are compared"""
+    return BssState(
+        bssid=bss.bssid.value,
+        ssid=str(bss.ssid),
+        rssi=int(bss.rssi.value),
+        channel=str(bss.channel_number),
+        width=str(bss.channel_width),
+        ies=ie_content_hash(bss.iesbytes),
+    )
+
+
+def state_key(state) -> tuple:
+    """BSSIDs are tracked per SSID, as one radio may beacon several SSIDs"""
+    return state.bssid, state.ssid
+
+
+def bss_key(bss) -> tuple:
+    """state_key() of a decoded WirelessNetworkBss, without building its state"""
+    return bss.bssid.value, str(bss.ssid)
+
+
+def describe(change) -> str:
+    """Short form of a change for the table column, e.g. 'rssi +6 channel'"""
+    if change.kind != CHANGED:
+        return "new" if change.kind == APPEARED else "gone"
+    out = []
+    for reason in change.reasons:
+        if reason == "rssi":
+            out.append(f"rssi {change.rssi_delta:+d}")
+        else:
+            out.append(reason)
+    return " ".join(out)
+
+
+class DeltaEngine:
+    """Keeps the last reported state per interface, keyed by BSSID and SSID.
+
+    RSSI uses hysteresis: a BSS is only reported for RSSI once it has moved at
+    least rssi_threshold dB from the value last reported, so slow drift is
+    still caught while beacon to beacon noise is not. The baseline only moves
+    when a change is reported. A BSS listed more than once in the same scan
+    is only compared the first time.
+    """
+
+    def __init__(self, rssi_threshold=5):
+        self.rssi_threshold = rssi_threshold
+        self.previous = {}
+        self.outputs = {}
+        self._seen = {}
+
+    def __repr__(self):
+        return f"DeltaEngine(rssi_threshold={self.rssi_threshold}, interfaces={len(self.previous)})"
+
+    def observe(self, interface, state):
+        """Compare one BSS from the current scan; returns a Change, or None if unchanged."""
+        previous = self.previous.setdefault(interface, {})
+        seen = self._seen.setdefault(interface, set())
+        key = state_key(state)
+        if key in seen:
+            return None
+        seen.add(key)
+        last = previous.get(key)
+        if last is None:
+            previous[key] = state
+            return Change(APPEARED, [], 0)
+        reasons = []
+        rssi_delta = state.rssi - last.rssi
+        if abs(rssi_delta) >= self.rssi_threshold:
+            reasons.append("rssi")
+        for field in ("channel", "width", "ies"):
+            if getattr(state, field) != getattr(last, field):
+                reasons.append(field)
+        if not reasons:
+            return None
+        previous[key] = state
+        return Change(CHANGED, reasons, rssi_delta)
+
+    def remember(self, interface, state, **outputs) -> None:
+        """Keep the last rows output for a BSS so they can be repeated when it disappears."""
+        self.outputs.setdefault(interface, {})[state_key(state)] = outputs
+
+    def finish(self, interface, present=()) -> list:
+        """End the scan for interface; returns (state, outputs) for BSS no longer seen.
+
+        present holds the bss_key() of every BSS in the scan, including those
+        which were filtered out of the output and never observed, so a BSS
+        which is only hidden is not reported as gone.
+        """
+        previous = self.previous.get(interface, {})
+        outputs = self.outputs.get(interface, {})
+        seen = self._seen.pop(interface, set())
+        seen.update(present)
+        gone = []
+        for key in [key for key in previous if key not in seen]:
+            gone.append((previous.pop(key), outputs.pop(key, {})))
+        return gone
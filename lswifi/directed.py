@@ -0,0 +1,48 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.directed
+~~~~~~~~~~~~~~~
+
+rotate target SSIDs across scan cycles for directed scans
+"""
+
+import itertools
+from threading import Lock
+
+
+class SsidRotation:
+    """Round-robin over the SSIDs requested with --directed.
+
+    WlanScan only takes one SSID per request and an interface can only run one
+    scan at a time, so each cycle probes for the next SSID in turn. BSS lists
+    are filtered on all of the SSIDs, since the driver keeps results for the
+    others from earlier cycles.
+    """
+
+    def __init__(self, ssids):
+        # keep order and drop duplicates
+        self.ssids = list(dict.fromkeys(ssids))
+        if not self.ssids:
+            raise ValueError("at least one SSID is required for a directed scan")
+        self._cycle = itertools.cycle(self.ssids)
+        self._lock = Lock()
+
+    def __repr__(self):
+        return f"SsidRotation({self.ssids!r})"
+
+    def __contains__(self, ssid):
+        return ssid in self.ssids
+
+    def next(self) -> str:
+        """The SSID to probe for on the next scan."""
+        with self._lock:
+            return next(self._cycle)
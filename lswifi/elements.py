@@ -34,6 +34,7 @@ from lswifi.constants import (
     _160MHZ_CHANNEL_LIST,
 )
 from lswifi.helpers import *
+from lswifi.helpers import convert_mac_address_to_string
 from lswifi.schemas.auth import Auth
 from lswifi.schemas.band import *
 from lswifi.schemas.beacon import *
@@ -178,6 +179,10 @@ class WirelessNetworkBss:
             self.background_acm = OutObject(header="AC_BK")
             self.has_rnr = False
             self.rnrs = []
+            # Basic Multi-Link element (Wi-Fi 7)
+            self.mld_mac = None
+            self.mld_link_id = None
+            self.mld_links = []
             if not is_byte_input_file:
                 if not is_pcap:
                     self.raw_information_elements = (
@@ -2870,7 +2875,7 @@ class WirelessNetworkBss:
                     self.channel_width.value = eht_cbw
 
         if eid_ext == 107:  # BE Multi-Link
-            pass
+            out += WirelessNetworkBss.__parse_multi_link(self, body)
 
         if eid_ext == 108:  # BE EHT Capabilities
             pass
@@ -2883,6 +2888,78 @@ class WirelessNetworkBss:
 
         return ext_tag_name, out
 
+    def __parse_multi_link(self, body):
+        """
+        P802.11be D6.0 9.4.2.321 Multi-Link element. Only the Basic variant,
+        which an AP affiliated with an AP MLD includes in its beacons and probe
+        responses, is decoded: the MLD MAC address and link ID of the reporting
+        AP from the Common Info, and the link ID and STA MAC address of each
+        Per-STA Profile in the Link Info.
+        """
+        if len(body) < 4:
+            return "Multi-Link Control: truncated"
+        control = int.from_bytes(bytes(body[1:3]), byteorder="little")
+        ml_type = control & 0x07  # B0-B2
+        presence = control >> 4  # B4-B15
+        if ml_type != 0:
+            return f"Multi-Link Type: {ml_type}"
+
+        common_info_length = body[3]
+        common_info = body[4 : 3 + common_info_length]
+        if len(common_info) < 6:
+            return "Multi-Link Type: Basic, Common Info: truncated"
+
+        mld_mac = convert_mac_address_to_string(common_info[0:6])
+        out = f"Multi-Link Type: Basic, MLD MAC Address: {mld_mac}"
+        link_id = None
+        ap_mld_id = None
+        offset = 6
+        # optional Common Info fields in presence bitmap order, with their sizes
+        for bit, size in enumerate([1, 1, 2, 2, 2, 1, 2]):
+            if not presence & (1 << bit):
+                continue
+            if offset + size > len(common_info):
+                break
+            if bit == 0:  # Link ID Info
+                link_id = common_info[offset] & 0x0F
+                out += f", Link ID: {link_id}"
+            elif bit == 1:  # BSS Parameters Change Count
+                out += f", BSS Parameters Change Count: {common_info[offset]}"
+            elif bit == 5:  # AP MLD ID
+                ap_mld_id = common_info[offset]
+                out += f", AP MLD ID: {ap_mld_id}"
+            offset += size
+
+        links = []
+        position = 3 + common_info_length
+        while position + 2 <= len(body):
+            subelement_id = body[position]
+            subelement_length = body[position + 1]
+            subelement = body[position + 2 : position + 2 + subelement_length]
+            position += 2 + subelement_length
+            if subelement_id != 0 or len(subelement) < 2:  # Per-STA Profile
+                continue
+            sta_control = int.from_bytes(bytes(subelement[0:2]), byteorder="little")
+            sta_link_id = sta_control & 0x0F  # B0-B3
+            sta_mac = None
+            # STA Info Length, then the STA MAC Address when B5 is set
+            if sta_control & 0x20 and len(subelement) >= 9:
+                sta_mac = convert_mac_address_to_string(subelement[3:9])
+            links.append((sta_link_id, sta_mac))
+            out += f"\nPer-STA Profile: Link ID: {sta_link_id}"
+            if sta_mac:
+                out += f", STA MAC Address: {sta_mac}"
+            if sta_control & 0x10:
+                out += ", Complete Profile"
+
+        if self is not None:
+            self.mld_mac = mld_mac
+            self.mld_link_id = link_id
+            self.mld_links = links
+            if "be" not in self.modes:
+                self.modes.append("be")
+        return out
+
     def __parse_vht_capabilities_element(self, edata):
         """
         first 4 octets are VHT Capabilities Info.
@@ -0,0 +1,264 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.ethers
+~~~~~~~~~~~~~
+
+BSSID to AP name mapping from the ethers file, with prefix rules
+"""
+
+import bisect
+import csv
+import logging
+import os
+import re
+from threading import Lock
+
+from lswifi.__version__ import __title__
+from lswifi.constants import ETHERSFILE
+
+HEX = re.compile(r"^[0-9a-f]*$")
+
+# heading names recognized when importing CSV and inventory exports
+MAC_COLUMNS = (
+    "bssid",
+    "mac",
+    "mac address",
+    "radio mac",
+    "base radio mac",
+    "ethernet mac",
+)
+NAME_COLUMNS = ("apname", "ap name", "ap_name", "name", "hostname", "host name")
+
+
+def default_ethers_path():
+    """ethers in the lswifi appdata folder"""
+    return os.path.join(os.getenv("LOCALAPPDATA"), __title__, ETHERSFILE)  # type: ignore
+
+
+def normalize_mac(mac) -> str:
+    """12 lowercase hex digits for a MAC address in any of the usual formats"""
+    digits = re.sub(r"[-:.\s]", "", mac.strip().lower())
+    if len(digits) != 12 or not HEX.match(digits):
+        raise ValueError(f"{mac!r} is not a MAC address")
+    return digits
+
+
+def normalize_rule(mac) -> str:
+    """The key an ethers entry is stored under: 12 hex digits for a BSSID, or
+    fewer ending in * for a prefix rule like aa:bb:cc:dd:ee:f*"""
+    mac = mac.strip().lower()
+    if not mac.endswith("*"):
+        return normalize_mac(mac)
+    digits = re.sub(r"[-:.\s]", "", mac[:-1])
+    if not 0 < len(digits) < 12 or not HEX.match(digits):
+        raise ValueError(f"{mac!r} is not a MAC address prefix")
+    return digits + "*"
+
+
+def format_rule(key) -> str:
+    """aa:bb:cc:dd:ee:ff, or aa:bb:cc:dd:ee:f* for a prefix rule"""
+    digits = key.rstrip("*")
+    formatted = ":".join(digits[i : i + 2] for i in range(0, len(digits), 2))
+    return formatted + "*" if key.endswith("*") else formatted
+
+
+def clean_name(name) -> str:
+    """ethers names are single words"""
+    return name.strip().replace(" ", "")
+
+
+class EthersStore:
+    """AP names from the ethers file, loaded once per session.
+
+    Exact BSSIDs are a dict lookup. Prefix rules such as aa:bb:cc:dd:ee:f*,
+    which cover every BSSID of a multi-BSSID radio, are kept in a sorted
+    table and matched longest prefix first with bisect. An exact entry always
+    wins over a rule.
+
+    The file is read again only when its modification time or size changes.
+    add() appends a line, and the last line for a key wins when loading, so a
+    single addition never rewrites the file; import_file() merges in bulk and
+    rewrites the file once, which also compacts it.
+    """
+
+    def __init__(self, path):
+        self.log = logging.getLogger(__name__)
+        self.path = path
+        self._lock = Lock()
+        self._stat = None
+        self._exact = None
+        self._prefixes = []
+        self._prefix_names = []
+        self.loads = 0
+
+    def __repr__(self):
+        return f"EthersStore(path={self.path!r}, loads={self.loads})"
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._exact) + len(self._prefixes)
+
+    def _file_stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read(self) -> dict:
+        entries = {}
+        if not os.path.isfile(self.path):
+            return entries
+        with open(self.path, encoding="utf-8") as infile:
+            for number, line in enumerate(infile, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    mac, name = line.split(None, 1)
+                    entries[normalize_rule(mac)] = name.strip()
+                except ValueError:
+                    self.log.debug(f"ignoring line {number} of {self.path}: {line}")
+        return entries
+
+    def _index(self, entries) -> None:
+        self._exact = {}
+        prefixes = {}
+        for key, name in entries.items():
+            if key.endswith("*"):
+                prefixes[key[:-1]] = name
+            else:
+                self._exact[key] = name
+        self._prefixes = sorted(prefixes)
+        self._prefix_names = [prefixes[prefix] for prefix in self._prefixes]
+
+    def _load(self) -> None:
+        stat = self._file_stat()
+        if self._exact is not None and stat == self._stat:
+            return
+        self._index(self._read())
+        self._stat = stat
+        self.loads += 1
+        self.log.debug(
+            f"loaded {len(self._exact)} BSSIDs and {len(self._prefixes)} prefix rules from {self.path}"
+        )
+
+    def _match_prefix(self, digits):
+        prefixes = self._prefixes
+        index = bisect.bisect_right(prefixes, digits) - 1
+        while index >= 0:
+            prefix = prefixes[index]
+            if digits.startswith(prefix):
+                return self._prefix_names[index]
+            # a shorter matching rule must be a prefix of what the two share
+            common = os.path.commonprefix([prefix, digits])
+            if not common:
+                return None
+            index = bisect.bisect_right(prefixes, common, 0, index) - 1
+        return None
+
+    def lookup(self, bssid):
+        """The AP name for bssid, or None"""
+        try:
+            digits = normalize_mac(str(bssid).replace("(*)", ""))
+        except ValueError:
+            return None
+        with self._lock:
+            self._load()
+            name = self._exact.get(digits)
+            if name is None and self._prefixes:
+                name = self._match_prefix(digits)
+            return name
+
+    def entries(self) -> dict:
+        """Every entry keyed by BSSID or prefix rule, as written in the file"""
+        with self._lock:
+            self._load()
+            entries = {format_rule(key): name for key, name in self._exact.items()}
+            for prefix, name in zip(self._prefixes, self._prefix_names):
+                entries[format_rule(prefix + "*")] = name
+            return entries
+
+    def add(self, mac, name) -> str:
+        """Add or replace one entry; returns the key as written."""
+        key = normalize_rule(mac)
+        name = clean_name(name)
+        if not name:
+            raise ValueError("an AP name is required")
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as outfile:
+                outfile.write(f"{format_rule(key)} {name}\n")
+            # reloaded on the next lookup since the file changed
+            self._exact = None
+        return format_rule(key)
+
+    def import_file(self, path) -> int:
+        """Merge entries from a CSV or inventory export; returns how many were imported."""
+        imported = read_import(path)
+        if not imported:
+            return 0
+        with self._lock:
+            entries = self._read()
+            entries.update(imported)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp = f"{self.path}.tmp"
+            with open(temp, "w", encoding="utf-8") as outfile:
+                outfile.writelines(
+                    f"{format_rule(key)} {name}\n" for key, name in entries.items()
+                )
+            os.replace(temp, self.path)
+            self._exact = None
+        self.log.info(f"imported {len(imported)} entries from {path} to {self.path}")
+        return len(imported)
+
+
+def read_import(path) -> dict:
+    """Entries from a CSV with BSSID and AP name columns, or an ethers file.
+
+    A heading row is recognized by names like BSSID, MAC Address or Radio MAC
+    and AP Name or Hostname in any column order; without one the first two
+    columns are used. Rows which are not a MAC address or prefix rule are
+    skipped.
+    """
+    log = logging.getLogger(__name__)
+    with open(path, encoding="utf-8-sig", newline="") as infile:
+        sample = infile.readline()
+        infile.seek(0)
+        if "," in sample or "\t" in sample or ";" in sample:
+            delimiter = max(",\t;", key=sample.count)
+            rows = list(csv.reader(infile, delimiter=delimiter))
+        else:
+            rows = [line.split(None, 1) for line in infile]
+    mac_column, name_column = 0, 1
+    if rows:
+        heading = [cell.strip().lower() for cell in rows[0]]
+        macs = [i for i, cell in enumerate(heading) if cell in MAC_COLUMNS]
+        names = [i for i, cell in enumerate(heading) if cell in NAME_COLUMNS]
+        if macs and names:
+            mac_column, name_column = macs[0], names[0]
+            rows = rows[1:]
+    entries = {}
+    skipped = 0
+    for row in rows:
+        try:
+            key = normalize_rule(row[mac_column])
+            name = clean_name(row[name_column])
+        except (IndexError, ValueError):
+            skipped += 1
+            continue
+        if name:
+            entries[key] = name
+    if skipped:
+        log.debug(f"skipped {skipped} rows of {path} without a MAC address and name")
+    return entries
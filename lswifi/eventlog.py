@@ -0,0 +1,202 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+
+"""
+lswifi.eventlog
+~~~~~~~~~~~~~~~
+
+write --watchevents notifications to a rotating JSON Lines (NDJSON) file
+"""
+
+import contextlib
+import datetime
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+from lswifi.ndjson import dumps
+
+MAX_BYTES = 50 * 1024 * 1024
+BACKUPS = 10
+FLUSH_INTERVAL = 1.0
+BUFFER_BYTES = 64 * 1024
+
+
+class EventLog:
+    """Appends WLAN notifications to a JSON Lines file for roaming analytics.
+
+    record() only formats the line and adds it to an in-memory buffer, so it
+    can be called from the notification callback thread. A writer thread
+    appends the buffer to the file every flush_interval seconds, or sooner
+    once BUFFER_BYTES are waiting, and rotates the file when it reaches
+    max_bytes or has been open for rotate_interval seconds. Rotated files are
+    renamed path.1, path.2, ... (gzip compressed as path.1.gz, ... with
+    compress) and only the newest backups are kept, so disk use stays under
+    about (backups + 1) * max_bytes however long the watcher runs.
+    """
+
+    def __init__(
+        self,
+        path,
+        max_bytes=MAX_BYTES,
+        rotate_interval=None,
+        backups=BACKUPS,
+        compress=False,
+        flush_interval=FLUSH_INTERVAL,
+    ):
+        self.log = logging.getLogger(__name__)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backups = backups
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.records = 0
+        self.rotations = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._buffer = []
+        self._buffered = 0
+        self._wake = threading.Event()
+        self._closed = False
+        self.file = None
+        self._open()
+        self._thread = threading.Thread(
+            target=self._run, name="lswifi-eventlog", daemon=True
+        )
+        self._thread.start()
+
+    def __repr__(self):
+        return f"EventLog(path={self.path!r}, records={self.records}, rotations={self.rotations})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "a", encoding="utf-8", newline="\n")  # noqa: SIM115
+        self._size = self.file.tell()
+        # an existing file is rotated by age from when it was started
+        self._opened_at = self._started_at() if self._size else time.time()
+
+    def _started_at(self) -> float:
+        """Time of the first record in the file, or its mtime if that cannot be read"""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                first = json.loads(file.readline())
+            return datetime.datetime.fromisoformat(first["timestamp"]).timestamp()
+        except (OSError, ValueError, KeyError, TypeError):
+            return os.path.getmtime(self.path)
+
+    def record(
+        self, event, interface, bssid="", ssid="", frequency=None, rssi=None, **extra
+    ) -> None:
+        """Buffer one notification; the file is written by the writer thread."""
+        now = datetime.datetime.now().astimezone()
+        entry = {
+            "timestamp": now.isoformat(timespec="milliseconds"),
+            "monotonic": round(time.monotonic(), 6),
+            "event": str(event).strip(),
+            "interface_mac": interface,
+            "bssid": bssid or None,
+            "ssid": ssid or None,
+            "frequency": int(frequency) if frequency else None,
+            "rssi": int(rssi) if rssi not in (None, "") else None,
+        }
+        entry.update(extra)
+        line = dumps(entry) + "\n"
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer.append(line)
+            self._buffered += len(line)
+            self.records += 1
+            full = self._buffered >= BUFFER_BYTES
+        if full:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError as error:
+                self.log.error(f"writing events to {self.path} failed: {error}")
+
+    def flush(self) -> None:
+        """Write the buffered events and rotate the file when it is due."""
+        with self._lock:
+            lines, self._buffer, self._buffered = self._buffer, [], 0
+        with self._write_lock:
+            if self.file is None:
+                return
+            if lines:
+                data = "".join(lines)
+                self.file.write(data)
+                self.file.flush()
+                self._size += len(data.encode("utf-8"))
+            if self._size and self._rotation_due():
+                self._rotate()
+
+    def _rotation_due(self) -> bool:
+        if self._size >= self.max_bytes:
+            return True
+        return (
+            self.rotate_interval is not None
+            and time.time() - self._opened_at >= self.rotate_interval
+        )
+
+    def _backup_name(self, number) -> str:
+        return f"{self.path}.{number}{'.gz' if self.compress else ''}"
+
+    def _rotate(self) -> None:
+        self.file.close()
+        self.file = None
+        if self.backups > 0:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._backup_name(self.backups))
+            for number in range(self.backups - 1, 0, -1):
+                with contextlib.suppress(FileNotFoundError):
+                    os.replace(self._backup_name(number), self._backup_name(number + 1))
+            if self.compress:
+                temp = f"{self._backup_name(1)}.tmp"
+                with open(self.path, "rb") as infile, gzip.open(temp, "wb") as outfile:
+                    shutil.copyfileobj(infile, outfile)
+                os.replace(temp, self._backup_name(1))
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self._backup_name(1))
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+        self.log.debug(f"rotated {self.path} after {self._size} bytes")
+        self._open()
+
+    def close(self) -> None:
+        """Write what is buffered and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(5)
+        self.flush()
+        with self._write_lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
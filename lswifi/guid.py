@@ -1,6 +1,8 @@
 #
 # Extracted from from comtypes.py
 
+import struct
+import uuid
 from ctypes import (
     Structure,
     byref,
@@ -8,19 +10,25 @@ from ctypes import (
     c_ulong,
     c_ushort,
     c_wchar_p,
-    oledll,
-    windll,
 )
 
+try:
+    from ctypes import oledll, windll
+except ImportError:  # not win32; only reachable with an injected WLAN library
+    oledll = windll = None
+
 BYTE = c_byte
 WORD = c_ushort
 DWORD = c_ulong
 
-_ole32 = oledll.ole32
+if oledll is not None:
+    _ole32 = oledll.ole32
 
-_CLSIDFromString = _ole32.CLSIDFromString
-_StringFromCLSID = _ole32.StringFromCLSID
-_CoTaskMemFree = windll.ole32.CoTaskMemFree
+    _CLSIDFromString = _ole32.CLSIDFromString
+    _StringFromCLSID = _ole32.StringFromCLSID
+    _CoTaskMemFree = windll.ole32.CoTaskMemFree
+else:
+    _ole32 = None
 
 
 class GUID(Structure):
@@ -28,12 +36,27 @@ class GUID(Structure):
 
     def __init__(self, name=None):
         if name is not None:
-            _CLSIDFromString(str(name), byref(self))
+            if _ole32 is not None:
+                _CLSIDFromString(str(name), byref(self))
+            else:
+                self._from_string(str(name))
 
     def __repr__(self):
         return f'GUID("{self}")'
 
+    def _from_string(self, name):
+        """pure Python CLSIDFromString for platforms without ole32"""
+        parsed = uuid.UUID(name)
+        self.Data1, self.Data2, self.Data3 = parsed.fields[:3]
+        for index, octet in enumerate(parsed.bytes[8:]):
+            self.Data4[index] = octet - 256 if octet > 127 else octet
+
     def __unicode__(self):
+        if _ole32 is None:
+            raw = struct.pack(">IHH", self.Data1, self.Data2, self.Data3) + bytes(
+                octet & 0xFF for octet in self.Data4
+            )
+            return "{" + str(uuid.UUID(bytes=raw)).upper() + "}"
         p = c_wchar_p()
         _StringFromCLSID(byref(self), byref(p))
         result = p.value
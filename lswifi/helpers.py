@@ -15,6 +15,7 @@ lswifi.helpers
 Provides helper functions that are consumed internally.
 """
 
+import hashlib
 import itertools
 import json
 import random
@@ -28,6 +29,10 @@ from lswifi.constants import (
     _20MHZ_CHANNEL_LIST,
 )
 
+# IEs which change beacon to beacon without the BSS configuration changing:
+# TIM (5), BSS Load (11), TPC Report (35), and Quiet (40)
+VOLATILE_IES = frozenset([5, 11, 35, 40])
+
 __control_chars = "".join(
     map(chr, itertools.chain(range(0x00, 0x20), range(0x7F, 0xA0)))
 )
@@ -256,3 +261,21 @@ class Base64Encoder(json.JSONEncoder):
         if isinstance(obj, bytes):
             return b64encode(obj).decode()
         return json.JSONEncoder.default(self, obj)
+
+
+def ie_content_hash(ies, exclude=VOLATILE_IES) -> str:
+    """hash the information elements of a BSS, skipping element IDs in exclude
+
+    a truncated trailing element is hashed as is rather than being dropped
+    """
+    ies = bytes(ies)
+    digest = hashlib.blake2b(digest_size=8)
+    offset = 0
+    while offset + 2 <= len(ies):
+        element_id = ies[offset]
+        end = offset + 2 + ies[offset + 1]
+        if element_id not in exclude:
+            digest.update(ies[offset:end])
+        offset = end
+    digest.update(ies[offset:])
+    return digest.hexdigest()
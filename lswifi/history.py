@@ -0,0 +1,364 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.history
+~~~~~~~~~~~~~~
+
+store scan results in an indexed SQLite database and query them later
+"""
+
+import datetime
+import logging
+import os
+import re
+import sqlite3
+import time
+from collections import namedtuple
+from threading import Lock
+
+from lswifi.helpers import ie_content_hash, strip_mac_address_format
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interfaces (
+    id INTEGER PRIMARY KEY,
+    mac TEXT NOT NULL UNIQUE,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    interface_id INTEGER NOT NULL REFERENCES interfaces(id),
+    time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ies (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bss (
+    id INTEGER PRIMARY KEY,
+    bssid INTEGER NOT NULL,
+    ssid TEXT NOT NULL,
+    UNIQUE (bssid, ssid)
+);
+CREATE TABLE IF NOT EXISTS observations (
+    scan_id INTEGER NOT NULL REFERENCES scans(id),
+    bss_id INTEGER NOT NULL REFERENCES bss(id),
+    rssi INTEGER NOT NULL,
+    channel INTEGER,
+    frequency INTEGER,
+    width INTEGER,
+    ies_id INTEGER REFERENCES ies(id)
+);
+CREATE INDEX IF NOT EXISTS scans_time ON scans(time);
+CREATE INDEX IF NOT EXISTS bss_ssid ON bss(ssid);
+CREATE INDEX IF NOT EXISTS observations_bss ON observations(bss_id, scan_id);
+CREATE INDEX IF NOT EXISTS observations_channel ON observations(channel, scan_id);
+"""
+
+RssiSample = namedtuple("RssiSample", ["time", "interface", "ssid", "rssi", "channel"])
+
+ChannelBss = namedtuple(
+    "ChannelBss", ["bssid", "ssid", "observations", "rssi_min", "rssi_max", "last_seen"]
+)
+
+
+BSSID_DIGITS = re.compile(r"^[0-9a-f]{12}$")
+
+
+def is_bssid(value) -> bool:
+    """Whether value is a MAC address, 12 hex digits in any of the usual formats"""
+    return bool(BSSID_DIGITS.match(strip_mac_address_format(str(value))))
+
+
+def bssid_to_int(bssid) -> int:
+    """48-bit integer form of a MAC address in any of the usual formats"""
+    digits = strip_mac_address_format(str(bssid).replace("(*)", ""))
+    if not BSSID_DIGITS.match(digits):
+        raise ValueError(f"{bssid} is not a BSSID")
+    return int(digits, 16)
+
+
+def int_to_bssid(value) -> str:
+    return ":".join(f"{(value >> shift) & 0xFF:02x}" for shift in range(40, -8, -8))
+
+
+def _int_or_none(value):
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+
+def _frequency_mhz(bss):
+    """channel_frequency is in GHz once the IEs are parsed, MHz before"""
+    value = str(bss.channel_frequency).strip()
+    try:
+        return round(float(value) * 1000) if "." in value else int(value)
+    except ValueError:
+        return None
+
+
+class ScanHistory:
+    """SQLite sink for --sqlite.
+
+    Interfaces, BSSID/SSID pairs and IE blobs are normalized into their own
+    tables, so an observation row is a handful of integers. IEs are keyed by
+    ie_content_hash, so a BSS whose IEs only differ in volatile elements
+    shares one blob across scans. Each scan is inserted in one transaction.
+    The database is in WAL mode so history queries can run while a scan
+    session is writing.
+
+    Scan ids increase with time, so observations are indexed on
+    (bss_id, scan_id) and (channel, scan_id) and a time window is turned into
+    a scan id range before the observations are read.
+    """
+
+    def __init__(self, path):
+        self.log = logging.getLogger(__name__)
+        self.path = path
+        self._lock = Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._interfaces = {}
+        self._bss = {}
+        self._ies = {}
+        self.scans = 0
+
+    def __repr__(self):
+        return f"ScanHistory(path={self.path!r}, scans={self.scans})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _interface_id(self, mac, description):
+        interface_id = self._interfaces.get(mac)
+        if interface_id is None:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO interfaces (mac, description) VALUES (?, ?)",
+                (mac, description),
+            )
+            (interface_id,) = self.connection.execute(
+                "SELECT id FROM interfaces WHERE mac = ?", (mac,)
+            ).fetchone()
+            self._interfaces[mac] = interface_id
+        return interface_id
+
+    def _bss_id(self, bssid, ssid):
+        key = (bssid, ssid)
+        bss_id = self._bss.get(key)
+        if bss_id is None:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO bss (bssid, ssid) VALUES (?, ?)", key
+            )
+            (bss_id,) = self.connection.execute(
+                "SELECT id FROM bss WHERE bssid = ? AND ssid = ?", key
+            ).fetchone()
+            self._bss[key] = bss_id
+        return bss_id
+
+    def _ies_id(self, ies):
+        key = ie_content_hash(ies)
+        ies_id = self._ies.get(key)
+        if ies_id is None:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO ies (hash, data) VALUES (?, ?)",
+                (key, bytes(ies)),
+            )
+            (ies_id,) = self.connection.execute(
+                "SELECT id FROM ies WHERE hash = ?", (key,)
+            ).fetchone()
+            self._ies[key] = ies_id
+        return ies_id
+
+    def record_scan(self, mac, description, timestamp, networks) -> int:
+        """Insert one scan of decoded WirelessNetworkBss; returns the scan id."""
+        with self._lock, self.connection:
+            interface_id = self._interface_id(mac, description)
+            scan_id = self.connection.execute(
+                "INSERT INTO scans (interface_id, time) VALUES (?, ?)",
+                (interface_id, timestamp),
+            ).lastrowid
+            rows = []
+            for bss in networks:
+                rssi = bss.rssi.value
+                merged = getattr(bss, "merged", None)
+                if merged is not None:
+                    # merged results share one object; use this interface's RSSI
+                    rssi = merged.rssi_by_interface().get(mac, rssi)
+                rows.append(
+                    (
+                        scan_id,
+                        self._bss_id(bssid_to_int(bss.bssid), str(bss.ssid)),
+                        int(rssi),
+                        _int_or_none(bss.channel_number),
+                        _frequency_mhz(bss),
+                        _int_or_none(bss.channel_width),
+                        self._ies_id(bss.iesbytes),
+                    )
+                )
+            self.connection.executemany(
+                "INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.scans += 1
+        return scan_id
+
+    def _scan_range(self, since, until):
+        """Lowest and highest scan id in the time window, and the window itself"""
+        if since is None and until is None:
+            return None
+        since = float("-inf") if since is None else since
+        until = float("inf") if until is None else until
+        first, last = self.connection.execute(
+            "SELECT MIN(id), MAX(id) FROM scans WHERE time >= ? AND time <= ?",
+            (since, until),
+        ).fetchone()
+        return (0, -1, since, until) if first is None else (first, last, since, until)
+
+    def rssi_timeline(self, bssid, since=None, until=None) -> list:
+        """RssiSample for every observation of bssid, oldest first"""
+        query = """
+            SELECT scans.time, interfaces.mac, bss.ssid, observations.rssi,
+                   observations.channel
+            FROM bss
+            JOIN observations ON observations.bss_id = bss.id
+            JOIN scans ON scans.id = observations.scan_id
+            JOIN interfaces ON interfaces.id = scans.interface_id
+            WHERE bss.bssid = ?
+        """
+        parameters = [bssid_to_int(bssid)]
+        with self._lock:
+            query, parameters = _scan_window(
+                query, parameters, self._scan_range(since, until)
+            )
+            query += " ORDER BY scans.time"
+            rows = self.connection.execute(query, parameters).fetchall()
+        return [RssiSample(*row) for row in rows]
+
+    def bssids_on_channel(self, channel, since=None, until=None) -> list:
+        """ChannelBss for every BSSID heard on channel, strongest first"""
+        query = """
+            SELECT bss.bssid, bss.ssid, COUNT(*), MIN(observations.rssi),
+                   MAX(observations.rssi), MAX(scans.time)
+            FROM observations
+            JOIN bss ON bss.id = observations.bss_id
+            JOIN scans ON scans.id = observations.scan_id
+            WHERE observations.channel = ?
+        """
+        parameters = [int(channel)]
+        with self._lock:
+            query, parameters = _scan_window(
+                query, parameters, self._scan_range(since, until)
+            )
+            query += """
+                GROUP BY observations.bss_id
+                ORDER BY MAX(observations.rssi) DESC
+            """
+            rows = self.connection.execute(query, parameters).fetchall()
+        return [ChannelBss(int_to_bssid(row[0]), *row[1:]) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+def _scan_window(query, parameters, scan_range):
+    """Limit query to observations from scans in the time window.
+
+    The scan id range narrows the observation indexes. Scan ids need not
+    follow time order, e.g. after --replay appends an older recording, so
+    the time of each scan is checked as well.
+    """
+    if scan_range is not None:
+        query += (
+            " AND observations.scan_id BETWEEN ? AND ? AND scans.time BETWEEN ? AND ?"
+        )
+        parameters.extend(scan_range)
+    return query, parameters
+
+
+RELATIVE_TIME = re.compile(r"^(\d+)([smhd])$")
+RELATIVE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_time(value, now=None):
+    """Epoch seconds for an ISO 8601 time, or a relative one like 30m, 6h or 7d ago"""
+    if value is None:
+        return None
+    match = RELATIVE_TIME.match(value.strip().lower())
+    if match:
+        if now is None:
+            now = time.time()
+        return now - int(match.group(1)) * RELATIVE_UNITS[match.group(2)]
+    try:
+        return datetime.datetime.fromisoformat(value).timestamp()
+    except ValueError as error:
+        raise ValueError(
+            f"{value} is not an ISO 8601 time or a relative time like 30m, 6h or 7d"
+        ) from error
+
+
+def format_time(timestamp) -> str:
+    return datetime.datetime.fromtimestamp(timestamp).isoformat(timespec="seconds")
+
+
+def run_query(args) -> None:
+    """Print the result of `lswifi history`"""
+    try:
+        since = parse_time(args.since)
+        until = parse_time(args.until)
+    except ValueError as error:
+        print(error)
+        raise SystemExit(-1) from error
+    if not os.path.isfile(args.database):
+        print(f"{args.database} does not exist")
+        raise SystemExit(-1)
+    if args.query == "channel" and not args.value.isdigit():
+        print(f"{args.value} is not a channel number")
+        raise SystemExit(-1)
+    if args.query == "rssi" and not is_bssid(args.value):
+        print(f"{args.value} is not a BSSID")
+        raise SystemExit(-1)
+    with ScanHistory(args.database) as history:
+        if args.query == "rssi":
+            samples = history.rssi_timeline(args.value, since, until)
+            if not samples:
+                print(f"no observations of {args.value} in {args.database}")
+                return
+            print(f"{'TIME':19}  {'INTERFACE':17}  {'RSSI':>4}  {'CH':>3}  SSID")
+            for sample in samples:
+                print(
+                    f"{format_time(sample.time):19}  {sample.interface:17}  "
+                    f"{sample.rssi:>4}  {sample.channel or '':>3}  {sample.ssid}"
+                )
+        else:
+            seen = history.bssids_on_channel(args.value, since, until)
+            if not seen:
+                print(f"no BSSIDs seen on channel {args.value} in {args.database}")
+                return
+            print(
+                f"{'BSSID':17}  {'SEEN':>5}  {'MIN':>4}  {'MAX':>4}  {'LAST SEEN':19}  SSID"
+            )
+            for bss in seen:
+                print(
+                    f"{bss.bssid:17}  {bss.observations:>5}  {bss.rssi_min:>4}  "
+                    f"{bss.rssi_max:>4}  {format_time(bss.last_seen):19}  {bss.ssid}"
+                )
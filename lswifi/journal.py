@@ -0,0 +1,214 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.journal
+~~~~~~~~~~~~~~
+
+append only journal of the raw BSS lists returned by the driver
+"""
+
+import logging
+import os
+import struct
+import time
+import uuid
+from collections import namedtuple
+from threading import Lock
+
+from lswifi import wlanapi as WLAN_API
+from lswifi.elements import WirelessNetworkBss
+
+# file header: magic and format version
+JOURNAL_MAGIC = b"LSWJ"
+JOURNAL_VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")
+
+# record: length of what follows, then interface GUID, host time in
+# nanoseconds, trigger name length; the trigger name and the raw
+# WLAN_BSS_LIST follow
+RECORD_LENGTH = struct.Struct("<I")
+RECORD_HEADER = struct.Struct("<16sqB")
+
+JournalRecord = namedtuple("JournalRecord", ["guid", "timestamp", "trigger", "data"])
+JournalRecord.__doc__ = """One BSS list; guid is formatted like {XXXXXXXX-...}, timestamp
+is seconds since the epoch, trigger is the event which caused the read and data
+is the raw WLAN_BSS_LIST"""
+
+
+class JournalError(Exception):
+    pass
+
+
+class JournalWriter:
+    """Appends raw BSS lists to a journal file.
+
+    Each record is one write of a length-prefixed header and the buffer as
+    the driver returned it, so recording costs a memory copy and a buffered
+    append. Records are flushed as they are written; a process killed
+    mid-record leaves a truncated tail which the reader ignores, and which
+    is cut off when the journal is next opened for appending.
+    """
+
+    def __init__(self, path):
+        self.log = logging.getLogger(__name__)
+        self.path = path
+        self._lock = Lock()
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not is_new:
+            check_header(path)
+            end = complete_length(path)
+            if end < os.path.getsize(path):
+                # a record cut short by a killed process would otherwise swallow
+                # the start of the next one written after it
+                self.log.warning(
+                    f"dropping the truncated record at the end of {path} before appending"
+                )
+                os.truncate(path, end)
+        self.file = open(path, "ab")  # noqa: SIM115
+        if is_new:
+            self.file.write(FILE_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION))
+        self.records = 0
+
+    def __repr__(self):
+        return f"JournalWriter(path={self.path!r}, records={self.records})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, guid, data, trigger="scan_list_refresh", timestamp=None) -> None:
+        """Append the raw WLAN_BSS_LIST data read from the interface guid."""
+        if timestamp is None:
+            timestamp_ns = time.time_ns()
+        else:
+            # split so the fraction keeps its precision at epoch magnitudes
+            seconds = int(timestamp)
+            timestamp_ns = seconds * 1_000_000_000 + round((timestamp - seconds) * 1e9)
+        trigger_bytes = str(trigger).encode("ascii", "replace")[:255]
+        header = RECORD_HEADER.pack(
+            uuid.UUID(str(guid)).bytes, timestamp_ns, len(trigger_bytes)
+        )
+        length = len(header) + len(trigger_bytes) + len(data)
+        with self._lock:
+            if self.file is None:
+                return
+            self.file.write(
+                b"".join(
+                    [RECORD_LENGTH.pack(length), header, trigger_bytes, bytes(data)]
+                )
+            )
+            self.file.flush()
+            self.records += 1
+
+    def recorder(self, guid, trigger="scan_list_refresh"):
+        """record() for one interface and trigger, taking only the data"""
+
+        def record(data):
+            self.record(guid, data, trigger)
+
+        return record
+
+    def close(self) -> None:
+        with self._lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def check_header(path) -> None:
+    with open(path, "rb") as file:
+        header = file.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size:
+        raise JournalError(f"{path} is not an lswifi journal")
+    magic, version = FILE_HEADER.unpack(header)
+    if magic != JOURNAL_MAGIC:
+        raise JournalError(f"{path} is not an lswifi journal")
+    if version != JOURNAL_VERSION:
+        raise JournalError(f"{path} has unsupported journal version {version}")
+
+
+def is_journal(path) -> bool:
+    try:
+        check_header(path)
+    except (OSError, JournalError):
+        return False
+    return True
+
+
+def _record_bodies(file, path):
+    """Yield the end offset and body of every complete record after the header"""
+    log = logging.getLogger(__name__)
+    file.seek(FILE_HEADER.size)
+    while True:
+        prefix = file.read(RECORD_LENGTH.size)
+        if not prefix:
+            return
+        if len(prefix) < RECORD_LENGTH.size:
+            log.warning(f"ignoring truncated record at the end of {path}")
+            return
+        (length,) = RECORD_LENGTH.unpack(prefix)
+        body = file.read(length)
+        if len(body) < length:
+            log.warning(f"ignoring truncated record at the end of {path}")
+            return
+        yield file.tell(), body
+
+
+def complete_length(path) -> int:
+    """Size of the file up to the end of its last complete record"""
+    end = FILE_HEADER.size
+    with open(path, "rb") as file:
+        for record_end, _body in _record_bodies(file, path):
+            end = record_end
+    return end
+
+
+def read_journal(path):
+    """Yield every complete JournalRecord in the file, in the order written"""
+    check_header(path)
+    with open(path, "rb") as file:
+        for _end, body in _record_bodies(file, path):
+            guid, timestamp_ns, trigger_length = RECORD_HEADER.unpack_from(body)
+            offset = RECORD_HEADER.size
+            trigger = body[offset : offset + trigger_length].decode("ascii")
+            yield JournalRecord(
+                guid="{" + str(uuid.UUID(bytes=guid)).upper() + "}",
+                timestamp=timestamp_ns // 1_000_000_000
+                + (timestamp_ns % 1_000_000_000) / 1e9,
+                trigger=trigger,
+                data=body[offset + trigger_length :],
+            )
+
+
+def scans_from_journal(path) -> dict:
+    """Raw BSS lists keyed by interface GUID, ready for replay.ReplayWlanApi"""
+    scans = {}
+    for record in read_journal(path):
+        scans.setdefault(record.guid, []).append(record.data)
+    return scans
+
+
+def decode_record(record, connected_bssid=None) -> list:
+    """Decode a record straight into WirelessNetworkBss objects"""
+    buffer = bytearray(record.data)
+    bss_list = WLAN_API.WLANBSSList.from_buffer(buffer)
+    entries = (WLAN_API.WLANBSSEntry * bss_list.NumberOfItems).from_buffer(
+        buffer, WLAN_API.WLANBSSList.wlanBssEntries.offset
+    )
+    networks = []
+    for entry in entries:
+        bss = WirelessNetworkBss(entry, connected_bssid)
+        # the decoded objects hold on to entries which point into buffer
+        bss.raw_buffer = buffer
+        networks.append(bss)
+    return networks
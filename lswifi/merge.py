@@ -0,0 +1,137 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.merge
+~~~~~~~~~~~~
+
+combine the scan results of several interfaces into one deduplicated view
+"""
+
+from collections import namedtuple
+from statistics import mean
+from threading import Lock
+
+from lswifi.bssinfo import bss_entry_ies
+from lswifi.elements import WirelessNetworkBss
+from lswifi.helpers import convert_mac_address_to_string, ie_content_hash
+
+Observation = namedtuple("Observation", ["interface", "rssi"])
+
+
+class MergedBss:
+    """One decoded BSS and the interfaces which heard it during a cycle.
+
+    Observations are keyed by interface, so an interface whose list refreshes
+    more than once in a cycle only counts with its latest RSSI.
+    """
+
+    def __init__(self, bss):
+        self.bss = bss
+        self.observations = {}
+
+    def __repr__(self):
+        return f"MergedBss(bssid={self.bss.bssid.value!r}, observations={self.observations!r})"
+
+    @property
+    def best_rssi(self) -> int:
+        return max(observation.rssi for observation in self.observations.values())
+
+    @property
+    def mean_rssi(self) -> int:
+        return round(
+            mean(observation.rssi for observation in self.observations.values())
+        )
+
+    @property
+    def interfaces(self) -> list:
+        return list(self.observations)
+
+    def rssi_by_interface(self) -> dict:
+        return {
+            interface: observation.rssi
+            for interface, observation in self.observations.items()
+        }
+
+
+class MergedClient:
+    """Stands in for a Client when the merged results are parsed and printed"""
+
+    def __init__(self, clients, data):
+        latest = max(clients, key=lambda client: client.last_scan_time_epoch)
+        self.mac = ", ".join(client.mac for client in clients)
+        self.iface = latest.iface
+        self.data = data
+        self.last_scan_time_epoch = latest.last_scan_time_epoch
+        self.last_scan_time_iso = latest.last_scan_time_iso
+
+    def __repr__(self):
+        return f"MergedClient(bss={len(self.data)})"
+
+
+class MergedScan:
+    """Decodes each distinct (BSSID, IE hash) once per cycle across interfaces.
+
+    Every client decodes through the same MergedScan, so a BSS heard by two
+    adapters is only decoded by whichever reports it first; the others only
+    add their RSSI. IEs which change from beacon to beacon are left out of the
+    hash, see helpers.VOLATILE_IES.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._merged = {}
+        self.decodes = 0
+        self.observations = 0
+
+    def __repr__(self):
+        return f"MergedScan(bss={len(self._merged)}, decodes={self.decodes}, observations={self.observations})"
+
+    def decode(self, interface, bss_entry, connected_bssid=None, is_bytes_arg=False):
+        """Decoded WirelessNetworkBss for bss_entry, shared between interfaces."""
+        bssid = convert_mac_address_to_string(bss_entry.dot11Bssid)
+        key = (bssid, ie_content_hash(bss_entry_ies(bss_entry)))
+        with self._lock:
+            merged = self._merged.get(key)
+            if merged is None:
+                merged = MergedBss(
+                    WirelessNetworkBss(
+                        bss_entry, connected_bssid, is_bytes_arg=is_bytes_arg
+                    )
+                )
+                merged.bss.merged = merged
+                self._merged[key] = merged
+                self.decodes += 1
+            if connected_bssid and bssid == connected_bssid:
+                merged.bss.bssid.connected = True
+            merged.observations[interface] = Observation(interface, int(bss_entry.Rssi))
+            self.observations += 1
+            return merged.bss
+
+    def decoder(self, interface):
+        """decode() bound to one interface, as taken by get_wireless_network_bss_list"""
+
+        def decode(bss_entry, connected_bssid=None, is_bytes_arg=False):
+            return self.decode(interface, bss_entry, connected_bssid, is_bytes_arg)
+
+        return decode
+
+    def results(self) -> list:
+        """The merged BSS of this cycle, with rssi set to the best observation"""
+        with self._lock:
+            merged = list(self._merged.values())
+        for item in merged:
+            item.bss.rssi.value = item.best_rssi
+        return [item.bss for item in merged]
+
+    def reset(self) -> None:
+        """Start a new cycle."""
+        with self._lock:
+            self._merged = {}
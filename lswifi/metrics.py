@@ -0,0 +1,349 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+
+"""
+lswifi.metrics
+~~~~~~~~~~~~~~
+
+scan, decode and export performance as Prometheus text format metrics
+"""
+
+import bisect
+import contextlib
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lswifi.__version__ import __version__
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_PORT = 9101
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 4.0, 5.0, 7.0, 10.0)
+DECODE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+WRITE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra="") -> str:
+    labels = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A metric family; values are kept per tuple of label values.
+
+    Updates take one lock and a dict lookup, so instrumenting the scan and
+    notification paths costs next to nothing; the text format is only built
+    when the endpoint is scraped.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(name={self.name!r}, labels={self.labels!r}, series={len(self._values)})"
+
+    def _key(self, labels) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def samples(self):
+        """(suffix, label values, extra label, value) for every series"""
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield "", key, "", value
+
+    def exposition(self) -> list:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, key, extra, value in self.samples():
+            lines.append(
+                f"{self.name}{suffix}{format_labels(self.labels, key, extra)} {format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # per bucket counts, then the sum
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe how long the with block takes"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        series = self.value(**labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(series)) for key, series in self._values.items()]
+        for key, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                yield "_bucket", key, f'le="{format_value(float(bound))}"', cumulative
+            yield "_sum", key, "", series[-1]
+            yield "_count", key, "", cumulative
+
+
+class Registry:
+    """The metrics served by MetricsServer.
+
+    Besides metrics updated as things happen, collectors are called on each
+    scrape. They read counters which other parts of lswifi already keep,
+    such as decode cache hits, so those cost nothing extra between scrapes.
+    """
+
+    def __init__(self):
+        self.log = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._metrics = []
+        self._caches = {}
+        self._collectors = {}
+
+    def __repr__(self):
+        return f"Registry(metrics={len(self._metrics)}, caches={len(self._caches)}, collectors={len(self._collectors)})"
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labels=()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def track_cache(self, cache, stats) -> None:
+        """Report stats(), a (hits, misses) tuple, as the hit rate of cache"""
+        with self._lock:
+            self._caches[cache] = stats
+
+    def add_collector(self, name, collector) -> None:
+        """collector() returns metrics to add to each scrape"""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def _cache_metrics(self) -> list:
+        with self._lock:
+            caches = list(self._caches.items())
+        if not caches:
+            return []
+        hits = Counter(
+            "lswifi_cache_hits_total", "lookups answered from a cache", ["cache"]
+        )
+        misses = Counter(
+            "lswifi_cache_misses_total", "lookups a cache could not answer", ["cache"]
+        )
+        for cache, stats in caches:
+            try:
+                cache_hits, cache_misses = stats()
+            except Exception as error:
+                self.log.debug(f"reading {cache} cache stats failed: {error}")
+                continue
+            hits.inc(cache_hits, cache=cache)
+            misses.inc(cache_misses, cache=cache)
+        return [hits, misses]
+
+    def exposition(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors.items())
+        metrics += self._cache_metrics()
+        for name, collector in collectors:
+            try:
+                metrics += collector()
+            except Exception as error:
+                self.log.debug(f"{name} metrics collector failed: {error}")
+        lines = []
+        for metric in metrics:
+            lines += metric.exposition()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+INFO = REGISTRY.gauge("lswifi_info", "lswifi version", ["version"])
+INFO.set(1, version=__version__)
+SCAN_LATENCY = REGISTRY.histogram(
+    "lswifi_scan_latency_seconds",
+    "time from requesting a scan to its completion",
+    ["interface"],
+)
+SCANS_COMPLETED = REGISTRY.counter(
+    "lswifi_scans_completed_total",
+    "scans completed by the scan complete notification or by the timeout",
+    ["interface", "completed_by"],
+)
+BSS_COUNT = REGISTRY.gauge(
+    "lswifi_bss", "BSS heard in the last scan, by band", ["interface", "band"]
+)
+DECODE_SECONDS = REGISTRY.histogram(
+    "lswifi_scan_decode_seconds",
+    "time to read and decode the BSS list of one scan",
+    ["interface"],
+    buckets=DECODE_BUCKETS,
+)
+EXPORT_SECONDS = REGISTRY.histogram(
+    "lswifi_export_write_seconds",
+    "time to write one scan to an output file",
+    ["format"],
+    buckets=WRITE_BUCKETS,
+)
+WLAN_EVENTS = REGISTRY.counter(
+    "lswifi_wlan_events_total",
+    "WLAN notifications received",
+    ["interface", "event"],
+)
+
+
+def native_call_metrics(api_stats):
+    """A collector for the per-function call figures of the native API bindings"""
+
+    def collect():
+        calls = Counter(
+            "lswifi_native_calls_total", "calls to native API functions", ["function"]
+        )
+        seconds = Counter(
+            "lswifi_native_call_seconds_total",
+            "time spent in native API functions",
+            ["function"],
+        )
+        for function, stats in api_stats().items():
+            calls.inc(stats.count, function=function)
+            seconds.inc(stats.total_ns / 1e9, function=function)
+        return [calls, seconds]
+
+    return collect
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = self.registry.exposition().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+        elif path == "/":
+            body = b'<html><body><a href="/metrics">metrics</a></body></html>\n'
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+        else:
+            body = b"not found\n"
+            self.send_response(404)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(f"{self.address_string()} {format % args}")
+
+
+class MetricsServer:
+    """Serves /metrics from a background thread"""
+
+    def __init__(self, host="127.0.0.1", port=METRICS_PORT, registry=REGISTRY):
+        self.log = logging.getLogger(__name__)
+        handler = type("Handler", (MetricsHandler,), {"registry": registry})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="lswifi-metrics", daemon=True
+        )
+        self._thread.start()
+        self.log.info(f"serving metrics at http://{host}:{self.port}/metrics")
+
+    def __repr__(self):
+        return f"MetricsServer(address={self.address!r})"
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(5)
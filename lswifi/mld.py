@@ -0,0 +1,203 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+
+"""
+lswifi.mld
+~~~~~~~~~~
+
+groups the affiliated APs of a Wi-Fi 7 AP MLD from a decoded BSS list
+"""
+
+from collections import namedtuple
+
+from lswifi.occupancy import channel_band
+
+# RNR MLD Parameters of a reported AP which is not affiliated with an AP MLD
+UNAFFILIATED_MLD_ID = 255
+
+MLDLink = namedtuple("MLDLink", ["bssid", "link_id", "band", "channel", "rssi"])
+MLDLink.__doc__ = """One affiliated AP of an AP MLD. rssi is None for a link which was only
+reported by another link's RNR or Multi-Link element and not heard in the scan"""
+
+MLD = namedtuple("MLD", ["mld_mac", "ssid", "links"])
+MLD.__doc__ = """An AP MLD and its links ordered by link ID; mld_mac is None when the
+grouping only comes from RNR MLD Parameters and no link sent a Multi-Link element"""
+
+
+def normalize_bssid(bssid):
+    """lowercase aa:bb:cc:dd:ee:ff without the (*) marking the connected BSSID"""
+    return str(bssid).replace("(*)", "").strip().lower()
+
+
+def _channel(value):
+    """36 from an RNR channel like 36@80"""
+    channel = str(value).split("@", 1)[0]
+    return int(channel) if channel.isdigit() else None
+
+
+def _int(value):
+    return value if isinstance(value, int) else None
+
+
+class MLDIndex:
+    """Groups BSSIDs into AP MLDs as BSS are added.
+
+    Every fact linking two things is a union in a disjoint set keyed by
+    BSSID, so grouping is a hash join over the BSS and their RNR entries
+    rather than a comparison of every pair of links:
+
+    - a Basic Multi-Link element joins the BSSID to its MLD MAC address, as
+      do the STA MAC addresses of its Per-STA Profiles
+    - an RNR entry with AP MLD ID 0 is affiliated with the same AP MLD as
+      the reporting AP, so joins the two BSSIDs
+    - other AP MLD IDs name the MLD of a nontransmitted BSSID of the
+      reporting AP, so entries with the same reporter and ID are joined
+    """
+
+    def __init__(self):
+        self._parent = {}
+        self._reported = {}
+        self._heard = {}
+        self._mld_macs = {}
+
+    def __repr__(self):
+        return f"MLDIndex(links={len(self._reported)}, heard={len(self._heard)})"
+
+    def __len__(self):
+        return len(self._reported)
+
+    def _find(self, key):
+        parent = self._parent
+        parent.setdefault(key, key)
+        while parent[key] != key:
+            # path halving keeps the trees flat
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def _union(self, first, second):
+        first, second = self._find(first), self._find(second)
+        if first != second:
+            self._parent[second] = first
+
+    def _report(self, bssid, link_id=None, band=None, channel=None):
+        """An affiliated AP, as far as any link has described it"""
+        link = self._reported.setdefault(
+            bssid, {"link_id": None, "band": None, "channel": None}
+        )
+        for field, value in (
+            ("link_id", link_id),
+            ("band", band),
+            ("channel", channel),
+        ):
+            if value is not None:
+                link[field] = value
+        self._find(bssid)
+
+    def add(self, bss) -> None:
+        """Index a decoded WirelessNetworkBss and the APs it reports"""
+        bssid = normalize_bssid(bss.bssid.value)
+        channel = str(bss.channel_number.value)
+        # kept for every BSS since a later one may report it as a link
+        self._heard[bssid] = (
+            bss.ssid.value,
+            channel_band(bss.channel_frequency.value),
+            int(channel) if channel.isdigit() else None,
+            int(bss.rssi.value),
+        )
+        mld_mac = getattr(bss, "mld_mac", None)
+        if mld_mac:
+            key = ("mld", mld_mac)
+            self._mld_macs[key] = mld_mac
+            self._report(bssid, link_id=getattr(bss, "mld_link_id", None))
+            self._union(key, bssid)
+            for link_id, sta_mac in bss.mld_links:
+                if sta_mac:
+                    self._report(sta_mac, link_id=link_id)
+                    self._union(key, sta_mac)
+        for rnr in bss.rnrs:
+            ap_mld_id = _int(rnr.RNR_AP_MLD_ID.value)
+            neighbor = normalize_bssid(rnr.RNR_BSSID.value)
+            if ap_mld_id is None or ap_mld_id == UNAFFILIATED_MLD_ID or not neighbor:
+                continue
+            self._report(
+                neighbor,
+                link_id=_int(rnr.RNR_LINK_ID.value),
+                band=channel_band(rnr.RNR_FREQ.value),
+                channel=_channel(rnr.RNR_CHANNEL.value),
+            )
+            if ap_mld_id == 0:
+                self._report(bssid)
+                self._union(bssid, neighbor)
+            else:
+                self._union(("rnr", bssid, ap_mld_id), neighbor)
+
+    def _link(self, bssid) -> MLDLink:
+        reported = self._reported[bssid]
+        heard = self._heard.get(bssid)
+        if heard is None:
+            return MLDLink(bssid, rssi=None, **reported)
+        # what the BSS was heard on wins over what a neighbor reported
+        _ssid, band, channel, rssi = heard
+        return MLDLink(
+            bssid,
+            reported["link_id"],
+            band or reported["band"],
+            channel if channel is not None else reported["channel"],
+            rssi,
+        )
+
+    def groups(self) -> list:
+        """Every AP MLD found, ordered by SSID and MLD MAC address"""
+        members = {}
+        for bssid in self._reported:
+            members.setdefault(self._find(bssid), []).append(bssid)
+        mld_macs = {self._find(key): mac for key, mac in self._mld_macs.items()}
+        mlds = []
+        for root, bssids in members.items():
+            links = sorted(
+                (self._link(bssid) for bssid in bssids),
+                key=lambda link: (
+                    link.link_id is None,
+                    link.link_id or 0,
+                    link.bssid,
+                ),
+            )
+            ssid = next(
+                (
+                    self._heard[bssid][0]
+                    for bssid in bssids
+                    if bssid in self._heard and self._heard[bssid][0]
+                ),
+                "",
+            )
+            mlds.append(MLD(mld_macs.get(root), ssid, links))
+        mlds.sort(key=lambda mld: (mld.ssid, mld.mld_mac or "", mld.links[0].bssid))
+        return mlds
+
+
+def group_mlds(bss_list) -> list:
+    """The AP MLDs among bss_list, each with its links"""
+    index = MLDIndex()
+    for bss in bss_list:
+        index.add(bss)
+    return index.groups()
+
+
+def to_json(mlds) -> list:
+    return [
+        {
+            "mld_mac": mld.mld_mac,
+            "ssid": mld.ssid,
+            "links": [link._asdict() for link in mld.links],
+        }
+        for mld in mlds
+    ]
@@ -0,0 +1,181 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.ndjson
+~~~~~~~~~~~~~
+
+stream scan results to a JSON Lines (NDJSON) file
+"""
+
+import json
+import logging
+import os
+from threading import Lock
+
+from lswifi.__version__ import __version__
+
+PER_BSS = "bss"
+PER_SCAN = "scan"
+
+
+class NDJSONWriter:
+    """Appends scan results to a JSON Lines file kept open for the session.
+
+    Unlike --json, which loads and re-dumps the whole file for every scan, each
+    scan is a single buffered append, so a long run stays linear in I/O and a
+    process killed mid-write at worst leaves one incomplete line at the end,
+    which is cut off when the file is next opened for appending.
+    With per="bss" every BSS observation is a line of its own; with per="scan"
+    each line holds the timestamp, interface and the list of BSS records. A new
+    file starts with a {"lswifi": {"version": ...}} line.
+    """
+
+    def __init__(self, path, per=PER_BSS):
+        if per not in (PER_BSS, PER_SCAN):
+            raise ValueError(f"per must be {PER_BSS!r} or {PER_SCAN!r}, not {per!r}")
+        self.log = logging.getLogger(__name__)
+        self.path = path
+        self.per = per
+        self.lines = 0
+        self._lock = Lock()
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not is_new:
+            end = complete_length(path)
+            if end < os.path.getsize(path):
+                self.log.warning(f"cutting incomplete line at the end of {path}")
+                os.truncate(path, end)
+                is_new = end == 0
+        self.file = open(path, "a", encoding="utf-8", newline="\n")  # noqa: SIM115
+        if is_new:
+            self.file.write(dumps({"lswifi": {"version": f"lswifi {__version__}"}}))
+            self.file.write("\n")
+
+    def __repr__(self):
+        return f"NDJSONWriter(path={self.path!r}, per={self.per!r}, lines={self.lines})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_scan(self, records) -> int:
+        """Append the BSS records from one scan; returns the number of lines written."""
+        if not records:
+            return 0
+        if self.per == PER_BSS:
+            lines = [dumps(record) for record in records]
+        else:
+            lines = [
+                dumps(
+                    {
+                        "timestamp": records[0].get("timestamp"),
+                        "interface_mac": records[0].get("interface_mac"),
+                        "scan": records,
+                    }
+                )
+            ]
+        with self._lock:
+            if self.file is None:
+                return 0
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+            self.lines += len(lines)
+        return len(lines)
+
+    def close(self) -> None:
+        with self._lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def dumps(record) -> str:
+    return json.dumps(record, separators=(",", ":"))
+
+
+def complete_length(path, chunk_size=4096) -> int:
+    """Return the size of the file up to and including its last newline"""
+    with open(path, "rb") as file:
+        position = file.seek(0, os.SEEK_END)
+        while position > 0:
+            start = max(0, position - chunk_size)
+            file.seek(start)
+            index = file.read(position - start).rfind(b"\n")
+            if index != -1:
+                return start + index + 1
+            position = start
+    return 0
+
+
+def read_ndjson(path):
+    """Yield each JSON object in the file; an unparsable last line is ignored"""
+    log = logging.getLogger(__name__)
+    bad_line = None
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            if bad_line is not None:
+                # only the last line may be damaged; anything earlier is an error
+                raise bad_line[1]
+            try:
+                record = json.loads(line)
+            except json.decoder.JSONDecodeError as error:
+                bad_line = (number, error)
+                continue
+            yield record
+    if bad_line is not None:
+        log.warning(f"ignoring unparsable line {bad_line[0]} at the end of {path}")
+
+
+def read_scans(path):
+    """Yield the list of BSS records for each scan, whichever way it was written"""
+    scan = []
+    key = None
+    for record in read_ndjson(path):
+        if "lswifi" in record:
+            continue
+        if "scan" in record:
+            if scan:
+                yield scan
+                scan, key = [], None
+            yield record["scan"]
+            continue
+        # one line per BSS; a scan is a run of lines from the same cycle
+        record_key = (record.get("timestamp"), record.get("interface_mac"))
+        if scan and record_key != key:
+            yield scan
+            scan = []
+        key = record_key
+        scan.append(record)
+    if scan:
+        yield scan
+
+
+def to_nested(path) -> dict:
+    """Convert a JSON Lines file to the document --json writes.
+
+    As with --json, the records of the first scan are inline in scan_data and
+    each later scan is appended to it as a list.
+    """
+    version = f"lswifi {__version__}"
+    for record in read_ndjson(path):
+        if "lswifi" in record:
+            version = record["lswifi"].get("version", version)
+        break
+    scan_data = []
+    for index, scan in enumerate(read_scans(path)):
+        if index == 0:
+            scan_data.extend(scan)
+        else:
+            scan_data.append(scan)
+    return {"lswifi": {"version": version}, "scan_data": scan_data}
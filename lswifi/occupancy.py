@@ -0,0 +1,251 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+
+"""
+lswifi.occupancy
+~~~~~~~~~~~~~~~~
+
+per 20 MHz channel occupancy and bonded channel overlap from a decoded BSS list
+"""
+
+import math
+from collections import namedtuple
+
+from lswifi.helpers import is_five_band, is_six_band, is_two_four_band
+
+try:
+    import numpy as np
+except ImportError:  # optional; the pure Python aggregation is used instead
+    np = None
+
+BANDS = ("2.4GHz", "5GHz", "6GHz")
+# a slot is band index * CHANNEL_SLOTS + channel number
+CHANNEL_SLOTS = 256
+# below this many BSS the Python loop beats converting to arrays
+NUMPY_THRESHOLD = 500
+
+Coverage = namedtuple(
+    "Coverage", ["band", "channel", "channels", "rssi", "stations", "utilization"]
+)
+Coverage.__doc__ = """Where one BSS transmits: its primary channel and every 20 MHz channel its
+width covers; stations and utilization are from the QBSS Load element, or None"""
+
+ChannelUsage = namedtuple(
+    "ChannelUsage",
+    [
+        "band",
+        "channel",
+        "bss",
+        "overlapping",
+        "rssi_max",
+        "rssi_total",
+        "stations",
+        "utilization",
+    ],
+)
+ChannelUsage.__doc__ = """Occupancy of one 20 MHz channel.
+
+bss counts BSS with their primary channel here and overlapping counts wider
+BSS whose bonded channel covers it. rssi_max and rssi_total (the received
+power of those primary BSS summed in mW, in dBm) are None without one.
+stations is the summed QBSS station count and utilization the highest QBSS
+channel utilization in percent, None when no BSS here reports QBSS Load."""
+
+
+def channel_band(frequency):
+    """2.4GHz, 5GHz or 6GHz for a channel frequency, or None"""
+    try:
+        if is_two_four_band(frequency):
+            return "2.4GHz"
+        if is_five_band(frequency):
+            return "5GHz"
+        if is_six_band(frequency):
+            return "6GHz"
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def channel_width(width) -> int:
+    """MHz for a width like 20, 40, 160 or 80+80; the primary segment of 80+80"""
+    digits = str(width).strip().split("+", 1)[0]
+    return int(digits) if digits.isdigit() and int(digits) >= 20 else 20
+
+
+def covered_channels(band, channel, width=20, marking="") -> list:
+    """The 20 MHz channels a BSS on primary channel at width covers.
+
+    5 and 6 GHz channels bond in aligned blocks, starting at 36 and 149 in
+    5 GHz and 1 in 6 GHz; 320 MHz is taken to be the 320-1 channelization.
+    2.4 GHz only bonds to 40 MHz, above or below the primary as marked.
+    """
+    size = max(channel_width(width) // 20, 1)
+    if size == 1:
+        return [channel]
+    if band == "2.4GHz":
+        if marking == "+" and channel <= 9:
+            return [channel, channel + 4]
+        if marking == "-" and channel >= 5:
+            return [channel - 4, channel]
+        return [channel]
+    base = 1 if band == "6GHz" else (149 if channel >= 149 else 36)
+    if channel < base or (channel - base) % 4:
+        return [channel]
+    offset = (channel - base) // 4
+    start = offset - offset % size
+    return [base + 4 * (start + index) for index in range(size)]
+
+
+def _number(value):
+    try:
+        return int(str(value).strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+def bss_coverage(bss):
+    """Coverage of a decoded WirelessNetworkBss, or None without a usable channel"""
+    band = channel_band(bss.channel_frequency.value)
+    channel = _number(bss.channel_number.value)
+    if band is None or channel is None:
+        return None
+    return Coverage(
+        band=band,
+        channel=channel,
+        channels=covered_channels(
+            band, channel, bss.channel_width.value, bss.channel_marking
+        ),
+        rssi=int(bss.rssi.value),
+        stations=_number(bss.stations.value),
+        utilization=_number(bss.utilization.value),
+    )
+
+
+def power_sum(milliwatts):
+    return round(10 * math.log10(milliwatts), 1) if milliwatts > 0 else None
+
+
+def _aggregate_python(coverages) -> list:
+    slots = {}
+    for coverage in coverages:
+        band = BANDS.index(coverage.band)
+        for channel in coverage.channels:
+            if channel != coverage.channel:
+                slot = slots.setdefault((band, channel), [0, 0, None, 0.0, None, None])
+                slot[1] += 1
+        slot = slots.setdefault((band, coverage.channel), [0, 0, None, 0.0, None, None])
+        slot[0] += 1
+        if slot[2] is None or coverage.rssi > slot[2]:
+            slot[2] = coverage.rssi
+        slot[3] += 10 ** (coverage.rssi / 10)
+        if coverage.stations is not None:
+            slot[4] = (slot[4] or 0) + coverage.stations
+        if coverage.utilization is not None and (
+            slot[5] is None or coverage.utilization > slot[5]
+        ):
+            slot[5] = coverage.utilization
+    return [
+        ChannelUsage(
+            BANDS[band],
+            channel,
+            bss,
+            overlapping,
+            rssi_max,
+            power_sum(milliwatts),
+            stations,
+            utilization,
+        )
+        for (band, channel), (
+            bss,
+            overlapping,
+            rssi_max,
+            milliwatts,
+            stations,
+            utilization,
+        ) in sorted(slots.items())
+    ]
+
+
+def _aggregate_numpy(coverages) -> list:
+    size = len(BANDS) * CHANNEL_SLOTS
+    band = np.fromiter((BANDS.index(c.band) for c in coverages), np.int64)
+    primary = band * CHANNEL_SLOTS + np.fromiter(
+        (c.channel for c in coverages), np.int64
+    )
+    rssi = np.fromiter((c.rssi for c in coverages), np.float64)
+    stations = np.fromiter(
+        (-1 if c.stations is None else c.stations for c in coverages), np.int64
+    )
+    utilization = np.fromiter(
+        (-1 if c.utilization is None else c.utilization for c in coverages), np.int64
+    )
+    widths = np.fromiter((len(c.channels) for c in coverages), np.int64)
+    covered = np.repeat(band * CHANNEL_SLOTS, widths) + np.fromiter(
+        (channel for c in coverages for channel in c.channels), np.int64
+    )
+    secondary = covered[covered != np.repeat(primary, widths)]
+
+    bss = np.bincount(primary, minlength=size)
+    overlapping = np.bincount(secondary, minlength=size)
+    milliwatts = np.bincount(primary, weights=10 ** (rssi / 10), minlength=size)
+    rssi_max = np.full(size, -np.inf)
+    np.maximum.at(rssi_max, primary, rssi)
+    reported = stations >= 0
+    station_total = np.bincount(
+        primary[reported], weights=stations[reported], minlength=size
+    )
+    station_reports = np.bincount(primary[reported], minlength=size)
+    utilization_max = np.full(size, -1, dtype=np.int64)
+    np.maximum.at(utilization_max, primary, utilization)
+
+    rows = []
+    for slot in np.flatnonzero(bss + overlapping):
+        slot = int(slot)
+        rows.append(
+            ChannelUsage(
+                BANDS[slot // CHANNEL_SLOTS],
+                slot % CHANNEL_SLOTS,
+                int(bss[slot]),
+                int(overlapping[slot]),
+                int(rssi_max[slot]) if bss[slot] else None,
+                power_sum(float(milliwatts[slot])),
+                int(station_total[slot]) if station_reports[slot] else None,
+                int(utilization_max[slot]) if utilization_max[slot] >= 0 else None,
+            )
+        )
+    return rows
+
+
+def aggregate(bss_list, use_numpy=None) -> list:
+    """ChannelUsage for every 20 MHz channel used or overlapped, by band and channel.
+
+    bss_list may hold decoded WirelessNetworkBss or Coverage. With NumPy
+    installed, lists of NUMPY_THRESHOLD or more BSS are aggregated with
+    vectorized bincounts; use_numpy forces either path.
+    """
+    coverages = []
+    for bss in bss_list:
+        coverage = bss if isinstance(bss, Coverage) else bss_coverage(bss)
+        if coverage is not None:
+            coverages.append(coverage)
+    if not coverages:
+        return []
+    if use_numpy is None:
+        use_numpy = np is not None and len(coverages) >= NUMPY_THRESHOLD
+    if use_numpy:
+        if np is None:
+            raise RuntimeError("numpy is not installed")
+        return _aggregate_numpy(coverages)
+    return _aggregate_python(coverages)
+
+
+def to_json(rows) -> list:
+    return [row._asdict() for row in rows]
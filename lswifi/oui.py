@@ -0,0 +1,314 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.oui
+~~~~~~~~~~
+
+vendor lookup from a compiled, memory-mapped copy of the IEEE registries
+"""
+
+import csv
+import logging
+import mmap
+import os
+import re
+import struct
+from threading import Lock
+
+from lswifi.__version__ import __title__
+from lswifi.constants import OUIDBFILE
+
+# file header: magic, format version, then the number of 24, 28 and 36 bit
+# assignments. the three tables of RECORD follow in that order, each sorted
+# by prefix, and then the NUL terminated organization names
+OUI_MAGIC = b"LSWO"
+OUI_VERSION = 1
+HEADER = struct.Struct("<4sH3I")
+RECORD = struct.Struct("<QI")
+PREFIX_BITS = (24, 28, 36)
+
+HEX_DIGITS = {6: 24, 7: 28, 9: 36}
+MAC_SEPARATORS = re.compile(r"[-:.\s]")
+HEX_LINE = re.compile(
+    r"^\s*([0-9A-Fa-f]{2}-[0-9A-Fa-f]{2}-[0-9A-Fa-f]{2})\s+\(hex\)\s*(.*)$"
+)
+BASE16_LINE = re.compile(
+    r"^\s*([0-9A-Fa-f]+)(?:-([0-9A-Fa-f]+))?\s+\(base 16\)\s*(.*)$"
+)
+
+
+def default_oui_path():
+    """oui.bin in the lswifi appdata folder"""
+    return os.path.join(os.getenv("LOCALAPPDATA"), __title__, OUIDBFILE)  # type: ignore
+
+
+def _csv_assignments(file):
+    """IEEE oui.csv, mam.csv and oui36.csv: Registry,Assignment,Organization Name,..."""
+    for row in csv.reader(file):
+        if len(row) < 3 or row[0] == "Registry":
+            continue
+        yield row[1].strip(), row[2].strip()
+
+
+def _txt_assignments(file):
+    """IEEE oui.txt, mam.txt and oui36.txt.
+
+    Each assignment is an "XX-XX-XX (hex)" line followed by a "(base 16)"
+    line, which for MA-M and MA-S gives the range of the lower 24 bits.
+    """
+    oui = None
+    for line in file:
+        match = HEX_LINE.match(line)
+        if match:
+            oui = match.group(1).replace("-", "")
+            continue
+        match = BASE16_LINE.match(line)
+        if match and oui is not None:
+            start, end, name = match.groups()
+            if end is None:
+                yield start, name.strip()
+            else:
+                # the digits start and end share are the rest of the prefix
+                length = len(start)
+                while length and start[length - 1] == "0" and end[length - 1] in "Ff":
+                    length -= 1
+                yield oui + start[:length], name.strip()
+            oui = None
+
+
+def _manuf_assignments(file):
+    """Wireshark manuf: XX:XX:XX[:XX:XX:XX/bits] short-name [long-name]"""
+    for line in file:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        fields = line.split("\t")
+        if len(fields) < 2:
+            fields = line.split(None, 1)
+            if len(fields) < 2:
+                continue
+        prefix, _, bits = fields[0].partition("/")
+        digits = MAC_SEPARATORS.sub("", prefix)
+        bits = int(bits) if bits else len(digits) * 4
+        name = fields[2] if len(fields) > 2 and fields[2].strip() else fields[1]
+        yield digits[: bits // 4], name.strip()
+
+
+def parse_registry(path) -> dict:
+    """(bits, prefix) to organization name from an IEEE or Wireshark registry file"""
+    log = logging.getLogger(__name__)
+    with open(path, encoding="utf-8", errors="replace", newline="") as file:
+        sample = file.read(4096)
+        file.seek(0)
+        if sample.startswith("Registry,Assignment"):
+            assignments = _csv_assignments(file)
+        elif "(hex)" in sample:
+            assignments = _txt_assignments(file)
+        else:
+            assignments = _manuf_assignments(file)
+        entries = {}
+        skipped = 0
+        for digits, name in assignments:
+            bits = HEX_DIGITS.get(len(digits))
+            if bits is None or not name:
+                skipped += 1
+                continue
+            try:
+                entries[(bits, int(digits, 16))] = name
+            except ValueError:
+                skipped += 1
+    if skipped:
+        log.debug(
+            f"skipped {skipped} assignments of {path} which are not MA-L, MA-M or MA-S"
+        )
+    return entries
+
+
+def compile_registry(sources, path) -> int:
+    """Compile registry files into the lookup file at path; returns the number of assignments.
+
+    Later sources win where two give the same prefix.
+    """
+    entries = {}
+    for source in sources:
+        entries.update(parse_registry(source))
+    names = bytearray()
+    name_offsets = {}
+    tables = {bits: [] for bits in PREFIX_BITS}
+    for (bits, prefix), name in entries.items():
+        offset = name_offsets.get(name)
+        if offset is None:
+            offset = name_offsets[name] = len(names)
+            names += name.encode("utf-8") + b"\0"
+        tables[bits].append((prefix, offset))
+    out = bytearray(
+        HEADER.pack(
+            OUI_MAGIC, OUI_VERSION, *(len(tables[bits]) for bits in PREFIX_BITS)
+        )
+    )
+    for bits in PREFIX_BITS:
+        for prefix, offset in sorted(tables[bits]):
+            out += RECORD.pack(prefix, offset)
+    out += names
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as file:
+        file.write(out)
+    os.replace(temp, path)
+    return len(entries)
+
+
+class OUIDatabase:
+    """Vendor names for MAC addresses from a file built by compile_registry.
+
+    The file is memory-mapped rather than parsed, so opening it costs the
+    same for the full registry as for a handful of entries. A lookup binary
+    searches the 36 bit (MA-S), then 28 bit (MA-M) and then 24 bit (MA-L)
+    table, so the most specific assignment wins. Results are remembered per
+    24 bit prefix where that is all that matched, which covers almost every
+    BSSID of a survey or capture after the first few.
+    """
+
+    def __init__(self, path):
+        self.log = logging.getLogger(__name__)
+        self.path = path
+        self._lock = Lock()
+        self._map = None
+        self._tables = None
+        self._names_offset = 0
+        self._opened = False
+        self._oui_cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"OUIDatabase(path={self.path!r})"
+
+    def __len__(self):
+        self._open()
+        if self._tables is None:
+            return 0
+        return sum(count for _base, count in self._tables.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def available(self) -> bool:
+        self._open()
+        return self._map is not None
+
+    def _open(self) -> None:
+        if self._opened:
+            return
+        with self._lock:
+            if not self._opened:
+                self._map_file()
+                self._opened = True
+
+    def _map_file(self) -> None:
+        try:
+            with open(self.path, "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.log.debug(f"no OUI database at {self.path}")
+            return
+        header = HEADER.unpack_from(data) if len(data) >= HEADER.size else (None, None)
+        if header[:2] != (OUI_MAGIC, OUI_VERSION):
+            self.log.warning(
+                f"{self.path} is not an OUI database for this version of lswifi"
+            )
+            data.close()
+            return
+        self._tables = {}
+        base = HEADER.size
+        for bits, count in zip(PREFIX_BITS, header[2:]):
+            self._tables[bits] = (base, count)
+            base += count * RECORD.size
+        self._names_offset = base
+        self._map = data
+
+    def _search(self, bits, prefix):
+        base, count = self._tables[bits]
+        low, high = 0, count
+        data = self._map
+        while low < high:
+            middle = (low + high) // 2
+            key, offset = RECORD.unpack_from(data, base + middle * RECORD.size)
+            if key < prefix:
+                low = middle + 1
+            elif key > prefix:
+                high = middle
+            else:
+                start = self._names_offset + offset
+                return data[start : data.find(b"\0", start)].decode("utf-8")
+        return None
+
+    def lookup(self, mac):
+        """The organization assigned the prefix of mac, or None"""
+        self._open()
+        if self._map is None:
+            return None
+        digits = MAC_SEPARATORS.sub("", str(mac).replace("(*)", "")).lower()
+        try:
+            value = int(digits[:12], 16)
+        except ValueError:
+            return None
+        if len(digits) != 12:
+            return None
+        oui = value >> 24
+        if oui in self._oui_cache:
+            self.hits += 1
+            return self._oui_cache[oui]
+        self.misses += 1
+        for bits in (36, 28):
+            if self._tables[bits][1]:
+                name = self._search(bits, value >> (48 - bits))
+                if name is not None:
+                    return name
+        name = self._search(24, oui)
+        # only cached when no longer assignment exists inside this OUI
+        if not self._has_longer(oui):
+            self._oui_cache[oui] = name
+        return name
+
+    def _has_longer(self, oui) -> bool:
+        for bits in (36, 28):
+            base, count = self._tables[bits]
+            if not count:
+                continue
+            shift = bits - 24
+            low, high = 0, count
+            first = oui << shift
+            while low < high:
+                middle = (low + high) // 2
+                (key,) = struct.unpack_from(
+                    "<Q", self._map, base + middle * RECORD.size
+                )
+                if key < first:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < count:
+                (key,) = struct.unpack_from("<Q", self._map, base + low * RECORD.size)
+                if key >> shift == oui:
+                    return True
+        return False
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._tables = None
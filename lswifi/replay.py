@@ -0,0 +1,463 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.replay
+~~~~~~~~~~~~~
+
+replay backend standing in for wlanapi.dll and iphlpapi.dll
+"""
+
+import itertools
+import logging
+import struct
+from collections import namedtuple
+from ctypes import (
+    Structure,
+    c_long,
+    c_wchar_p,
+    cast,
+    create_unicode_buffer,
+    pointer,
+    sizeof,
+)
+from threading import Lock, Timer
+
+from lswifi import wlanapi as WLAN_API
+from lswifi.guid import GUID
+from lswifi.journal import is_journal, scans_from_journal
+from lswifi.pcap import PCAP, parse_radiotap_header
+
+ReplayBss = namedtuple(
+    "ReplayBss",
+    [
+        "bssid",
+        "ssid",
+        "rssi",
+        "frequency",
+        "ies",
+        "beacon_period",
+        "capability",
+        "timestamp",
+        "phy_type",
+    ],
+    defaults=[100, 0, 0, 7],
+)
+ReplayBss.__doc__ = """One BSS in a replayed scan; bssid is a string or six octets,
+ssid is bytes, frequency is in MHz, ies are the raw information elements,
+and timestamp is the TSF in microseconds"""
+
+ReplayInterface = namedtuple(
+    "ReplayInterface", ["guid", "description", "mac", "state"], defaults=[4]
+)
+
+DEFAULT_INTERFACES = [
+    ReplayInterface(
+        "{00000000-0000-0000-0000-00000000A1F1}", "lswifi replay", "02:00:00:00:00:01"
+    )
+]
+
+# management frame subtypes which carry the BSS information elements
+BEACON = 8
+PROBE_RESPONSE = 5
+
+# the first SSID element starts after the header and fixed fields
+BEACON_IE_OFFSET = 36
+
+
+def mac_octets(mac) -> list:
+    if isinstance(mac, str):
+        return [int(octet, 16) for octet in mac.replace("-", ":").split(":")]
+    return list(mac)
+
+
+def link_quality(rssi) -> int:
+    """Approximate the 0 to 100 link quality Windows reports for an RSSI"""
+    return max(0, min(100, 2 * (int(rssi) + 100)))
+
+
+def build_bss_list(networks) -> bytearray:
+    """Lay out a WLAN_BSS_LIST with the IEs after the entries, like WlanGetNetworkBssList.
+
+    networks is a list of ReplayBss. IeOffset is relative to each entry, as
+    the decoder expects.
+    """
+
+    class BssList(Structure):
+        _fields_ = WLAN_API.WLANBSSList._fields_[:2] + [
+            ("wlanBssEntries", WLAN_API.WLANBSSEntry * len(networks))
+        ]
+
+    ies = [bytes(network.ies) for network in networks]
+    buffer = bytearray(sizeof(BssList) + sum(len(ie) for ie in ies))
+    bss_list = BssList.from_buffer(buffer)
+    bss_list.TotalSize = len(buffer)
+    bss_list.NumberOfItems = len(networks)
+    entries_offset = WLAN_API.WLANBSSList.wlanBssEntries.offset
+    ie_position = sizeof(BssList)
+    for index, network in enumerate(networks):
+        entry = bss_list.wlanBssEntries[index]
+        ssid = bytes(network.ssid)[: WLAN_API.DOT11_SSID_MAX_LENGTH]
+        entry.dot11Ssid.SSIDLength = len(ssid)
+        entry.dot11Ssid.SSID = ssid
+        entry.dot11Bssid[:] = mac_octets(network.bssid)
+        entry.dot11BssType = 1  # infrastructure
+        entry.dot11BssPhyType = network.phy_type
+        entry.Rssi = network.rssi
+        entry.LinkQuality = link_quality(network.rssi)
+        entry.InRegDomain = True
+        entry.BeaconPeriod = network.beacon_period
+        entry.Timestamp = network.timestamp
+        entry.CapabilityInformation = network.capability
+        entry.ChCenterFrequency = int(network.frequency) * 1000  # MHz to kHz
+        entry.IeOffset = ie_position - (
+            entries_offset + index * sizeof(WLAN_API.WLANBSSEntry)
+        )
+        entry.IeSize = len(ies[index])
+        buffer[ie_position : ie_position + len(ies[index])] = ies[index]
+        ie_position += len(ies[index])
+    return buffer
+
+
+def parse_beacon(packet_data):
+    """ReplayBss from a radiotap framed beacon or probe response, or None for any other frame"""
+    if len(packet_data) < 8:
+        return None
+    radiotap = parse_radiotap_header(packet_data)
+    header_len = radiotap["header_len"]
+    if header_len < 8 or header_len > len(packet_data):
+        return None
+    frame = packet_data[header_len:]
+    if len(frame) < BEACON_IE_OFFSET:
+        return None
+    frame_control = struct.unpack_from("<H", frame)[0]
+    frame_type = (frame_control & 0x000C) >> 2
+    frame_subtype = (frame_control & 0x00F0) >> 4
+    if frame_type != 0 or frame_subtype not in (BEACON, PROBE_RESPONSE):
+        return None
+    ies = frame[BEACON_IE_OFFSET:]
+    if radiotap["fcs_present"] and len(ies) >= 4:
+        ies = ies[:-4]
+    ssid = b""
+    if len(ies) >= 2 and ies[0] == 0 and ies[1] <= len(ies) - 2:
+        ssid = ies[2 : 2 + ies[1]]
+    timestamp, beacon_period, capability = struct.unpack_from("<QHH", frame, 24)
+    return ReplayBss(
+        bssid=list(frame[16:22]),
+        ssid=bytes(ssid),
+        rssi=radiotap["rssi"],
+        frequency=radiotap["frequency"],
+        ies=bytes(ies),
+        beacon_period=beacon_period,
+        capability=capability,
+        timestamp=timestamp,
+    )
+
+
+def scans_from_pcap(path, window=None) -> list:
+    """Scans made of the beacons and probe responses in a capture.
+
+    Without a window the whole capture is one scan. With a window in seconds,
+    a new scan starts every window seconds of capture time. Within a scan the
+    last beacon heard from each BSSID is kept.
+    """
+    scans = []
+    current = {}
+    start = None
+    with PCAP(path, mode="r") as pcap:
+        for _interface_id, _name, timestamp, packet_data in pcap.get_packets():
+            network = parse_beacon(packet_data)
+            if network is None:
+                continue
+            if start is None:
+                start = timestamp
+            if window and timestamp - start >= window and current:
+                scans.append(list(current.values()))
+                current = {}
+                start = timestamp
+            current[bytes(network.bssid)] = network
+    if current:
+        scans.append(list(current.values()))
+    return scans
+
+
+class ReplayWlanApi:
+    """Serves recorded scans through the wlanapi.dll functions lswifi calls.
+
+    Each scan is a list of ReplayBss, or the raw bytes of a WLAN_BSS_LIST.
+    scans is either one list replayed on every interface, or a dict of lists
+    keyed by interface GUID.
+    Every WlanScan advances the interface to its next scan after scan_latency
+    seconds, then sends scan_complete and, event_interval seconds later,
+    scan_list_refresh to the registered notification callbacks, much like the
+    driver does. Every drop_every'th scan sends no notifications, which
+    exercises the client timeout path. Bind it with install().
+    """
+
+    def __init__(
+        self,
+        scans,
+        interfaces=None,
+        scan_latency=0.05,
+        event_interval=0.0,
+        drop_every=0,
+        connected=None,
+        loop=True,
+    ):
+        self.log = logging.getLogger(__name__)
+        self.interfaces = list(interfaces or DEFAULT_INTERFACES)
+        if isinstance(scans, dict):
+            self.scans = {guid.upper(): list(value) for guid, value in scans.items()}
+        else:
+            self.scans = {
+                interface.guid.upper(): list(scans) for interface in self.interfaces
+            }
+        if not any(self.scans.values()):
+            raise ValueError("at least one scan is required to replay")
+        self.scan_latency = scan_latency
+        self.event_interval = event_interval
+        self.drop_every = drop_every
+        self.connected = connected
+        self.loop = loop
+        self._lock = Lock()
+        self._handles = itertools.count(1)
+        self._callbacks = {}
+        # -1 until the first scan completes, which then serves the first scan
+        self._cursor = {interface.guid.upper(): -1 for interface in self.interfaces}
+        self._memory = {}
+        self._timers = []
+        self.scan_requests = 0
+        self.notifications = 0
+
+    def __repr__(self):
+        return f"ReplayWlanApi(scans={self.scan_count}, interfaces={len(self.interfaces)}, scan_requests={self.scan_requests})"
+
+    @property
+    def scan_count(self) -> int:
+        """Scans recorded for the interface with the most of them"""
+        return max(len(scans) for scans in self.scans.values())
+
+    def _interface(self, guid):
+        guid = str(guid)
+        for interface in self.interfaces:
+            if interface.guid.upper() == guid.upper():
+                return interface
+        return None
+
+    def current_scan(self, guid):
+        with self._lock:
+            guid = self._interface(guid).guid.upper()
+            scans = self.scans.get(guid) or [[]]
+            return scans[max(0, min(self._cursor[guid], len(scans) - 1))]
+
+    def notify(self, guid, event_name: str) -> None:
+        """Send an ACM notification for guid to every registered callback."""
+        data = WLAN_API.WLANNotificationData()
+        data.NotificationSource = WLAN_API.WLAN_NOTIFICATION_SOURCE_ACM
+        data.NotificationCode = WLAN_API.WLAN_NOTIFICATION_ACM_ENUM[event_name].value
+        data.InterfaceGuid = GUID(str(guid))
+        with self._lock:
+            callbacks = list(self._callbacks.values())
+            self.notifications += 1
+        for callback in callbacks:
+            callback(pointer(data), None)
+
+    def _start_timer(self, delay, function, *args) -> None:
+        timer = Timer(delay, function, args)
+        timer.daemon = True
+        with self._lock:
+            self._timers = [t for t in self._timers if t.is_alive()] + [timer]
+        timer.start()
+
+    def _complete_scan(self, guid, notify: bool) -> None:
+        interface = self._interface(guid)
+        with self._lock:
+            guid = interface.guid.upper()
+            count = len(self.scans.get(guid, ()))
+            cursor = self._cursor[guid] + 1
+            if cursor >= count:
+                cursor = 0 if self.loop else max(count - 1, 0)
+            self._cursor[guid] = cursor
+        if notify:
+            self.notify(guid, "scan_complete")
+            self._start_timer(
+                self.event_interval, self.notify, guid, "scan_list_refresh"
+            )
+
+    def cancel(self) -> None:
+        """Stop any scans which are still pending."""
+        with self._lock:
+            timers, self._timers = self._timers, []
+        for timer in timers:
+            timer.cancel()
+
+    # wlanapi.dll
+
+    def WlanOpenHandle(self, version, reserved, negotiated, handle):
+        negotiated._obj.value = version
+        handle._obj.value = next(self._handles)
+        return 0
+
+    def WlanCloseHandle(self, handle, reserved):
+        with self._lock:
+            self._callbacks.pop(handle.value, None)
+        return 0
+
+    def WlanFreeMemory(self, memory):
+        with self._lock:
+            self._memory.pop(id(memory), None)
+
+    def _hand_out(self, buffer, data, structure) -> None:
+        """Point the ppData output at structure laid over buffer"""
+        contents = structure.from_buffer(buffer)
+        data._obj.contents = contents
+        # WLAN.free_memory is called with the pointer which was handed out
+        with self._lock:
+            self._memory[id(data._obj)] = buffer
+
+    def WlanEnumInterfaces(self, handle, reserved, data):
+        class InterfaceList(Structure):
+            _fields_ = WLAN_API.WLANInterfaceInfoList._fields_[:2] + [
+                ("InterfaceInfo", WLAN_API.WLANInterfaceInfo * len(self.interfaces))
+            ]
+
+        buffer = bytearray(sizeof(InterfaceList))
+        interface_list = InterfaceList.from_buffer(buffer)
+        interface_list.NumberOfItems = len(self.interfaces)
+        for index, interface in enumerate(self.interfaces):
+            info = interface_list.InterfaceInfo[index]
+            info.InterfaceGuid = GUID(interface.guid)
+            info.strInterfaceDescription = interface.description
+            info.isState = interface.state
+        self._hand_out(buffer, data, WLAN_API.WLANInterfaceInfoList)
+        return 0
+
+    def WlanRegisterNotification(
+        self, handle, source, ignore_duplicate, callback, context, reserved, previous
+    ):
+        with self._lock:
+            if source:
+                self._callbacks[handle.value] = callback
+            else:
+                self._callbacks.pop(handle.value, None)
+        return 0
+
+    def WlanScan(self, handle, guid, ssid, raw, reserved):
+        guid = guid._obj
+        if self._interface(guid) is None:
+            return WLAN_API.SystemErrorCodes.ERROR_NOT_FOUND.value
+        with self._lock:
+            self.scan_requests += 1
+            dropped = self.drop_every and self.scan_requests % self.drop_every == 0
+        self._start_timer(self.scan_latency, self._complete_scan, guid, not dropped)
+        return 0
+
+    def WlanGetNetworkBssList(self, handle, guid, ssid, kind, secure, reserved, data):
+        if self._interface(guid._obj) is None:
+            return WLAN_API.SystemErrorCodes.ERROR_NOT_FOUND.value
+        scan = self.current_scan(guid._obj)
+        if isinstance(scan, (bytes, bytearray)):
+            buffer = bytearray(scan)
+        else:
+            buffer = build_bss_list(scan)
+        self._hand_out(buffer, data, WLAN_API.WLANBSSList)
+        return 0
+
+    def WlanQueryInterface(self, handle, guid, opcode, reserved, size, data, kind):
+        interface = self._interface(guid._obj)
+        if interface is None:
+            return WLAN_API.SystemErrorCodes.ERROR_NOT_FOUND.value
+        opcode_name = WLAN_API.WLAN_INTF_OPCODE_DICT[opcode.value]
+        result = WLAN_API.WLAN_INTF_OPCODE_TYPE_DICT[opcode_name]()
+        connected = None
+        scan = self.current_scan(interface.guid)
+        if self.connected and not isinstance(scan, (bytes, bytearray)):
+            connected = next(
+                (
+                    network
+                    for network in scan
+                    if mac_octets(network.bssid) == mac_octets(self.connected)
+                ),
+                None,
+            )
+        if opcode_name == "wlan_intf_opcode_interface_state":
+            result = type(result)(interface.state)
+        elif opcode_name == "wlan_intf_opcode_rssi":
+            result = c_long(connected.rssi if connected else 0)
+        elif opcode_name == "wlan_intf_opcode_current_connection" and connected:
+            result.isState = 1  # connected
+            association = result.wlanAssociationAttributes
+            association.dot11Ssid.SSIDLength = len(connected.ssid)
+            association.dot11Ssid.SSID = bytes(connected.ssid)
+            association.dot11Bssid[:] = mac_octets(connected.bssid)
+            association.dot11BssType = 1
+            association.wlanSignalQuality = link_quality(connected.rssi)
+        data._obj.contents = result
+        return 0
+
+
+class ReplayIpHelper:
+    """Serves the replayed interfaces through GetAdaptersAddresses."""
+
+    def __init__(self, interfaces=None):
+        self.interfaces = list(interfaces or DEFAULT_INTERFACES)
+        self.calls = 0
+        self._strings = []
+
+    def __repr__(self):
+        return f"ReplayIpHelper(interfaces={len(self.interfaces)}, calls={self.calls})"
+
+    def GetAdaptersAddresses(self, family, flags, reserved, buffer, size):
+        self.calls += 1
+        needed = sizeof(WLAN_API.IP_ADAPTER_ADDRESSES) * len(self.interfaces)
+        if buffer is None or size._obj.value < needed:
+            size._obj.value = needed
+            return WLAN_API.SystemErrorCodes.ERROR_BUFFER_OVERFLOW.value
+        entries = (WLAN_API.IP_ADAPTER_ADDRESSES * len(self.interfaces)).from_buffer(
+            buffer._obj
+        )
+        for index, interface in enumerate(self.interfaces):
+            entry = entries[index]
+            # the structures only hold pointers, so the strings are kept here
+            name = interface.guid.encode()
+            description = create_unicode_buffer(interface.description)
+            self._strings.extend([name, description])
+            entry.AdapterName = name
+            entry.FriendlyName = cast(description, c_wchar_p)
+            entry.Description = cast(description, c_wchar_p)
+            mac = mac_octets(interface.mac)
+            entry.PhysicalAddress[: len(mac)] = mac
+            entry.PhysicalAddressLength = len(mac)
+            if index + 1 < len(self.interfaces):
+                entry.Next = pointer(entries[index + 1])
+        return 0
+
+
+def install(wlanapi: ReplayWlanApi, iphlpapi=None) -> None:
+    """Bind the WLAN functions to a replay backend."""
+    WLAN_API.use_library(wlanapi, iphlpapi or ReplayIpHelper(wlanapi.interfaces))
+
+
+def backend_from_file(path, **kwargs) -> ReplayWlanApi:
+    """A ReplayWlanApi for an lswifi journal, or for a pcap or pcapng capture.
+
+    Journals replay each recorded interface under its own GUID; a capture
+    replays as a single scan on one interface.
+    """
+    if is_journal(path):
+        scans = scans_from_journal(path)
+        interfaces = [
+            ReplayInterface(
+                guid, f"lswifi replay {index}", f"02:00:00:00:00:{index:02x}"
+            )
+            for index, guid in enumerate(scans, start=1)
+        ]
+        return ReplayWlanApi(scans, interfaces=interfaces, **kwargs)
+    return ReplayWlanApi(scans_from_pcap(path), **kwargs)
@@ -0,0 +1,194 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+
+"""
+lswifi.rssistats
+~~~~~~~~~~~~~~~~
+
+bounded per-BSSID RSSI history with statistics updated as samples arrive
+"""
+
+import math
+from array import array
+from collections import namedtuple
+from threading import Lock
+
+WINDOW = 120
+EWMA_ALPHA = 0.2
+EVICT_AFTER = 10
+# RSSI is kept as whole dBm from -127 to 0, one histogram bin per dBm
+RSSI_FLOOR = -127
+RSSI_BINS = 128
+
+RssiStats = namedtuple(
+    "RssiStats",
+    ["samples", "avg", "stddev", "min", "max", "ewma", "p10", "p50", "p90"],
+)
+RssiStats.__doc__ = """RSSI statistics of one BSSID. samples, avg, stddev, min, max and the
+percentiles cover the samples in the window; ewma covers every sample"""
+
+
+def clamp_rssi(rssi) -> int:
+    return min(max(int(rssi), RSSI_FLOOR), RSSI_FLOOR + RSSI_BINS - 1)
+
+
+class RssiSeries:
+    """The last window (timestamp, RSSI) samples of one BSSID in a ring buffer.
+
+    Adding a sample updates running sums and a histogram of whole dBm for
+    the window, taking the sample it overwrites back out, so every statistic
+    is available without looking at the samples again. The EWMA carries on
+    across the whole run.
+    """
+
+    __slots__ = (
+        "times",
+        "values",
+        "histogram",
+        "index",
+        "count",
+        "total",
+        "squares",
+        "ewma",
+        "last_scan",
+    )
+
+    def __init__(self, window=WINDOW):
+        self.times = array("d", bytes(8 * window))
+        self.values = array("b", bytes(window))
+        self.histogram = array("H", bytes(2 * RSSI_BINS))
+        self.index = 0
+        self.count = 0
+        self.total = 0
+        self.squares = 0
+        self.ewma = None
+        self.last_scan = 0
+
+    def __repr__(self):
+        return f"RssiSeries(window={len(self.values)}, count={self.count}, ewma={self.ewma})"
+
+    def add(self, timestamp, rssi, alpha=EWMA_ALPHA) -> None:
+        rssi = clamp_rssi(rssi)
+        if self.count == len(self.values):
+            old = self.values[self.index]
+            self.total -= old
+            self.squares -= old * old
+            self.histogram[old - RSSI_FLOOR] -= 1
+        else:
+            self.count += 1
+        self.times[self.index] = timestamp
+        self.values[self.index] = rssi
+        self.index = (self.index + 1) % len(self.values)
+        self.total += rssi
+        self.squares += rssi * rssi
+        self.histogram[rssi - RSSI_FLOOR] += 1
+        self.ewma = (
+            rssi if self.ewma is None else alpha * rssi + (1 - alpha) * self.ewma
+        )
+
+    def samples(self) -> list:
+        """(timestamp, rssi) in the window, oldest first"""
+        if self.count < len(self.values):
+            order = range(self.count)
+        else:
+            order = [(self.index + i) % self.count for i in range(self.count)]
+        return [(self.times[i], self.values[i]) for i in order]
+
+    def percentile(self, fraction):
+        """The RSSI at or below which fraction of the window's samples fall"""
+        if not self.count:
+            return None
+        rank = max(math.ceil(fraction * self.count), 1)
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank:
+                return index + RSSI_FLOOR
+        return None
+
+    def stats(self) -> RssiStats:
+        count = self.count
+        if not count:
+            return RssiStats(0, None, None, None, None, None, None, None, None)
+        mean = self.total / count
+        variance = max(self.squares / count - mean * mean, 0.0)
+        low = next(i for i, n in enumerate(self.histogram) if n)
+        high = (
+            RSSI_BINS - 1 - next(i for i, n in enumerate(reversed(self.histogram)) if n)
+        )
+        return RssiStats(
+            samples=count,
+            avg=round(mean, 1),
+            stddev=round(math.sqrt(variance), 1),
+            min=low + RSSI_FLOOR,
+            max=high + RSSI_FLOOR,
+            ewma=round(self.ewma, 1),
+            p10=self.percentile(0.1),
+            p50=self.percentile(0.5),
+            p90=self.percentile(0.9),
+        )
+
+
+class RssiTracker:
+    """RssiSeries per interface and BSSID for the BSSIDs still being heard.
+
+    A BSSID is dropped once it has not been in evict_after consecutive scans
+    of an interface, so memory is bounded by the BSSIDs currently in range
+    times the window, however long the run is.
+    """
+
+    def __init__(self, window=WINDOW, evict_after=EVICT_AFTER, alpha=EWMA_ALPHA):
+        self.window = window
+        self.evict_after = evict_after
+        self.alpha = alpha
+        self._lock = Lock()
+        self._series = {}
+        self._scans = {}
+        self.evicted = 0
+
+    def __repr__(self):
+        return f"RssiTracker(window={self.window}, evict_after={self.evict_after}, bssids={len(self)}, evicted={self.evicted})"
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(series) for series in self._series.values())
+
+    def observe_scan(self, interface, timestamp, samples) -> None:
+        """Add one scan's (bssid, rssi) samples and evict BSSIDs gone too long."""
+        with self._lock:
+            scan = self._scans.get(interface, 0) + 1
+            self._scans[interface] = scan
+            series = self._series.setdefault(interface, {})
+            for bssid, rssi in samples:
+                entry = series.get(bssid)
+                if entry is None:
+                    entry = series[bssid] = RssiSeries(self.window)
+                entry.add(timestamp, rssi, self.alpha)
+                entry.last_scan = scan
+            gone = [
+                bssid
+                for bssid, entry in series.items()
+                if scan - entry.last_scan >= self.evict_after
+            ]
+            for bssid in gone:
+                del series[bssid]
+            self.evicted += len(gone)
+
+    def stats(self, interface, bssid) -> RssiStats:
+        with self._lock:
+            entry = self._series.get(interface, {}).get(bssid)
+            if entry is None:
+                return RssiStats(0, None, None, None, None, None, None, None, None)
+            return entry.stats()
+
+    def series(self, interface, bssid):
+        with self._lock:
+            return self._series.get(interface, {}).get(bssid)
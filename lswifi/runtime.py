@@ -0,0 +1,144 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.runtime
+~~~~~~~~~~~~~~
+
+a long-lived event loop which drives scan requests, completion, and output for a session.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import deque
+
+
+class ScanRuntime:
+    """Owns one event loop for the whole scanning session.
+
+    Each cycle requests a scan on every client, waits for the completions, then
+    hands the clients to on_results. Completion is delivered from the WLAN
+    notification thread into the loop with call_soon_threadsafe, so there is no
+    per-cycle thread pool or event loop to spin up and tear down.
+
+    Each pending future is tagged with its cycle and completions are matched to
+    requests in order, so a completion arriving after its cycle timed out is
+    dropped instead of resolving the next cycle early.
+    """
+
+    def __init__(self, clients: dict, on_results, timeout=None):
+        """
+        :param clients: index to Client mapping which live for the session
+        :param on_results: called with the index sorted clients after every cycle
+        :param timeout: optional seconds to wait for a scan before giving up on it
+        """
+        self.log = logging.getLogger(__name__)
+        self.clients = clients
+        self.on_results = on_results
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.pending = {}
+        self.requested = {}
+        self.cycles = 0
+        for client in self.clients.values():
+            client.add_scan_listener(self._on_scan_complete)
+
+    def __repr__(self):
+        return f"ScanRuntime(clients={len(self.clients)}, cycles={self.cycles})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _on_scan_complete(self, client) -> None:
+        """Scan listener; runs on the notification or timeout timer thread."""
+        if self.loop.is_closed():
+            return
+        with contextlib.suppress(RuntimeError):
+            self.loop.call_soon_threadsafe(self._resolve, client)
+
+    def _resolve(self, client) -> None:
+        requested = self.requested.get(client)
+        cycle = requested.popleft() if requested else None
+        pending = self.pending.get(client)
+        if pending is None or pending[0] != cycle:
+            self.log.debug(f"ignoring late scan completion for {client.mac}")
+            return
+        future = self.pending.pop(client)[1]
+        if not future.done():
+            future.set_result(client)
+
+    async def scan_client(self, client) -> None:
+        """Request a scan on one client and wait for its completion signal."""
+        requested = self.requested.setdefault(client, deque())
+        if not getattr(client, "scan_finished", True):
+            # the client folds its unfinished scan into this request and
+            # completes once for both
+            requested.clear()
+        future = self.loop.create_future()
+        self.pending[client] = (self.cycles, future)
+        requested.append(self.cycles)
+        await client.scan()
+        try:
+            if self.timeout:
+                await asyncio.wait_for(future, self.timeout)
+            else:
+                await future
+        except asyncio.TimeoutError:
+            self.pending.pop(client, None)
+            self.log.warning(
+                f"no scan completion for {client.mac} after {self.timeout} seconds"
+            )
+
+    async def cycle(self) -> None:
+        """Scan on all clients concurrently, then emit the results in index order."""
+        iface_count = len(self.clients)
+        if iface_count > 1:
+            self.log.info(f"starting scans on {iface_count} interfaces")
+        await asyncio.gather(
+            *(self.scan_client(client) for client in self.clients.values())
+        )
+        self.on_results({k: self.clients[k] for k in sorted(self.clients)})
+        self.cycles += 1
+
+    async def session(self, scans=1, interval=0.1, duration=0) -> int:
+        """Run cycles for a number of scans, or until duration seconds have passed."""
+        if duration > 0:
+            deadline = self.loop.time() + duration
+            while self.loop.time() < deadline:
+                await self.cycle()
+                await asyncio.sleep(interval)
+        else:
+            for index in range(scans):
+                if index:
+                    await asyncio.sleep(interval)
+                await self.cycle()
+        return self.cycles
+
+    def run(self, scans=1, interval=0.1, duration=0) -> int:
+        """Blocking entry point; returns the number of completed cycles."""
+        return self.loop.run_until_complete(
+            self.session(scans=scans, interval=interval, duration=duration)
+        )
+
+    def close(self) -> None:
+        for client in self.clients.values():
+            client.remove_scan_listener(self._on_scan_complete)
+        if self.loop.is_closed():
+            return
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        if tasks and not self.loop.is_running():
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
@@ -0,0 +1,490 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+
+"""
+lswifi.service
+~~~~~~~~~~~~~~
+
+a long-running lswifi which answers scan, current AP and event requests over a local pipe
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import queue
+import sys
+import tempfile
+import threading
+from multiprocessing.connection import Client as Connect
+from multiprocessing.connection import Listener
+
+from lswifi.__version__ import __version__
+from lswifi.runtime import ScanRuntime
+
+# events waiting for a subscriber which is not reading; later ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 256
+# seconds a scan request waits for the driver before giving up on it
+SCAN_TIMEOUT = 10
+
+
+def default_address() -> str:
+    """A named pipe on Windows, and a Unix socket in the temp folder elsewhere"""
+    if sys.platform == "win32":
+        return r"\\.\pipe\lswifi"
+    return os.path.join(tempfile.gettempdir(), f"lswifi-{os.getuid()}.sock")
+
+
+def bss_record(bss, apname=None, vendor=None) -> dict:
+    """The fields of a decoded WirelessNetworkBss a service client is sent,
+    named and formatted as in the --json output"""
+    record = {
+        "apname": apname or str(bss.apname).strip(),
+        "bssid": str(bss.bssid).replace("(*)", "").strip(),
+        "channel_frequency": str(bss.channel_frequency).strip(),
+        "channel_number": str(bss.channel_number).strip(),
+        "channel_width": str(bss.channel_width).strip(),
+        "connected": bss.bssid.connected,
+        "modes": sorted(bss.modes.elements),
+        "phy_type": str(bss.phy_type).strip(),
+        "rssi": str(bss.rssi),
+        "security": str(bss.security).strip(),
+        "ssid": str(bss.ssid),
+    }
+    if vendor is not None:
+        record["vendor"] = vendor
+    return record
+
+
+class ServiceError(Exception):
+    pass
+
+
+class LswifiService:
+    """Serves requests from one process which keeps everything a CLI
+    invocation would otherwise set up and throw away: the clients and their
+    WLAN handles and notification registrations, the decode caches, the AP
+    name, ethers and OUI stores, and the latest scan of every interface.
+
+    Each request and response is one JSON object sent as a message over a
+    multiprocessing connection, which is a named pipe on Windows and a Unix
+    socket elsewhere; nothing is pickled. Requests are handled on a thread
+    per connection. Scans are serialized on the one ScanRuntime, and the
+    records sent for the latest scan of an interface are built once per scan.
+    Every scan also goes through app.process_scan_results without printing,
+    so --csv, --json, --ndjson, --sqlite, --rssi-stats and --merge behave as
+    they do for a scan loop.
+
+    A connection which sends {"request": "subscribe"} is sent every WLAN
+    event from then on. Events go through a bounded queue per subscriber so
+    the notification thread never waits on a slow reader.
+    """
+
+    def __init__(
+        self, app, clients: dict, args, address=None, is_caching_acknowledged=False
+    ):
+        self.log = logging.getLogger(__name__)
+        self.app = app
+        self.clients = clients
+        self.args = args
+        self.address = address or default_address()
+        self.is_caching_acknowledged = is_caching_acknowledged
+        self.requests = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._latest = {}
+        self._subscribers = []
+        self._listener = None
+        self._threads = []
+        self._runtime = ScanRuntime(clients, self._on_scan, timeout=SCAN_TIMEOUT)
+        self._handlers = {
+            "ping": self._ping,
+            "interfaces": self._interfaces,
+            "latest": self._latest_scan,
+            "scan": self._scan,
+            "current_ap": self._current_ap,
+        }
+        for client in clients.values():
+            client.add_event_listener(self._on_event)
+
+    def __repr__(self):
+        return f"LswifiService(address={self.address!r}, clients={len(self.clients)}, requests={self.requests})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self) -> None:
+        """Load the stores, scan once, and start accepting connections"""
+        if self.args.ethers:
+            self.app.ethers_store()
+        if self.args.vendor:
+            self.app.vendor_db()
+        if self.args.apnames:
+            self.app.apname_store()
+        self.scan()
+        if (
+            sys.platform != "win32"
+            and os.path.exists(self.address)
+            and not is_running(self.address)
+        ):
+            # left behind by a service which did not exit cleanly
+            os.unlink(self.address)
+        self._listener = Listener(self.address)
+        self._threads.append(self._start_thread(self._accept, "lswifi-service"))
+        if self.args.interval:
+            self._threads.append(
+                self._start_thread(self._scan_periodically, "lswifi-service-scan")
+            )
+        self.log.info(f"lswifi service listening on {self.address}")
+
+    def serve_forever(self) -> None:
+        """start() and block until close() or a KeyboardInterrupt"""
+        self.start()
+        while not self._closed.wait(1):
+            pass
+
+    def _start_thread(self, target, name, *args) -> threading.Thread:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        return thread
+
+    def _accept(self) -> None:
+        while not self._closed.is_set():
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                if self._closed.is_set():
+                    return
+                self.log.exception("failed to accept a service connection")
+                continue
+            if self._closed.is_set():
+                connection.close()
+                return
+            # connection threads are not joined; they end with their client
+            self._start_thread(self._serve, "lswifi-service-connection", connection)
+
+    def _serve(self, connection) -> None:
+        with connection:
+            while not self._closed.is_set():
+                try:
+                    request = json.loads(connection.recv_bytes())
+                except (EOFError, OSError):
+                    return
+                except ValueError:
+                    self._send(connection, {"error": "request is not JSON"})
+                    continue
+                if request.get("request") == "subscribe":
+                    self._stream_events(connection)
+                    return
+                if not self._send(connection, self.handle(request)):
+                    return
+
+    def _send(self, connection, message) -> bool:
+        try:
+            connection.send_bytes(json.dumps(message).encode("utf-8"))
+        except OSError:
+            return False
+        return True
+
+    def handle(self, request: dict) -> dict:
+        """The response to one request, {"result": ...} or {"error": "..."}"""
+        with self._lock:
+            self.requests += 1
+        handler = self._handlers.get(request.get("request"))
+        if handler is None:
+            return {"error": f"unknown request {request.get('request')!r}"}
+        try:
+            return {"result": handler(request)}
+        except Exception as error:
+            self.log.exception(f"failed to answer {request}")
+            return {"error": str(error)}
+
+    def _ping(self, request):
+        return {
+            "version": __version__,
+            "pid": os.getpid(),
+            "interfaces": len(self.clients),
+            "requests": self.requests,
+        }
+
+    def _interfaces(self, request):
+        return [
+            {
+                "connection_name": client.iface.connection_name,
+                "description": client.iface.description,
+                "guid": client.iface.guid_string.strip("{}").lower(),
+                "mac": client.mac,
+                "state": client.iface.state_string,
+            }
+            for client in self.clients.values()
+        ]
+
+    def _selected(self, request) -> list:
+        interface = request.get("interface")
+        clients = [
+            client
+            for client in self.clients.values()
+            if interface is None or client.mac == interface
+        ]
+        if not clients:
+            raise ServiceError(f"no interface {interface}")
+        return clients
+
+    def _latest_scan(self, request):
+        return [self.latest(client) for client in self._selected(request)]
+
+    def _scan(self, request):
+        clients = self._selected(request)
+        self.scan()
+        return [self.latest(client) for client in clients]
+
+    def _current_ap(self, request):
+        # imported here so the requesting side of this module stays light
+        from lswifi.client import get_interface_info
+
+        args = argparse.Namespace(**vars(self.args))
+        args.get_current_ap = True
+        args.get_current_channel = False
+        args.get_interface_info = False
+        args.supported = False
+        args.event_watcher = False
+        args.json = bool(request.get("json"))
+        args.raw = bool(request.get("raw"))
+        return [
+            get_interface_info(args, client.iface) for client in self._selected(request)
+        ]
+
+    def scan(self) -> None:
+        """Scan on every interface; concurrent requests share a scan in progress"""
+        if not self._scan_lock.acquire(blocking=False):
+            # someone else is scanning; their results are fresh enough
+            with self._scan_lock:
+                return
+        try:
+            self._runtime.run(scans=1, interval=0)
+        finally:
+            self._scan_lock.release()
+
+    def _on_scan(self, scanned) -> None:
+        """Runtime callback; writes the exports of the session without printing"""
+        self.app.process_scan_results(
+            scanned,
+            self.is_caching_acknowledged,
+            self.args.csv or "",
+            self.args.json or "",
+            self.args,
+            display=False,
+        )
+
+    def _scan_periodically(self) -> None:
+        while not self._closed.wait(float(self.args.interval)):
+            try:
+                self.scan()
+            except Exception:
+                self.log.exception("background scan failed")
+
+    def latest(self, client) -> dict:
+        """The latest scan of client as sent to service clients, built once per scan"""
+        key = (id(client.data), client.last_scan_time_epoch)
+        with self._lock:
+            cached = self._latest.get(client.mac)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+        ethers = self.app.ethers if self.args.ethers else None
+        vendors = self.app.vendors if self.args.vendor else None
+        networks = [
+            bss_record(
+                bss,
+                apname=ethers.lookup(bss.bssid.value) if ethers else None,
+                vendor=(vendors.lookup(bss.bssid.value) or "") if vendors else None,
+            )
+            for bss in client.data or []
+        ]
+        scan = {
+            "interface_mac": client.mac,
+            "timestamp": client.last_scan_time_iso,
+            "networks": networks,
+        }
+        with self._lock:
+            self._latest[client.mac] = (key, scan)
+        return scan
+
+    def _on_event(self, client, event, bssid) -> None:
+        """Event listener; runs on the WLAN notification thread"""
+        message = {
+            "event": event,
+            "interface_mac": client.mac,
+            "bssid": bssid or None,
+        }
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+
+    def _stream_events(self, connection) -> None:
+        events = queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.append(events)
+        try:
+            if not self._send(connection, {"result": "subscribed"}):
+                return
+            while not self._closed.is_set():
+                try:
+                    message = events.get(timeout=1)
+                except queue.Empty:
+                    continue
+                if not self._send(connection, message):
+                    return
+        finally:
+            with self._lock:
+                self._subscribers.remove(events)
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        for client in self.clients.values():
+            client.remove_event_listener(self._on_event)
+        if self._listener is not None:
+            # closing the listener does not wake a blocked accept everywhere
+            with contextlib.suppress(OSError):
+                Connect(self.address).close()
+            self._listener.close()
+        for thread in self._threads:
+            thread.join(5)
+        with self._scan_lock:
+            self._runtime.close()
+
+
+class ServiceClient:
+    """Sends requests to a running lswifi service.
+
+    >>> with ServiceClient() as service:
+    ...     for scan in service.latest():
+    ...         print(scan["interface_mac"], len(scan["networks"]))
+    """
+
+    def __init__(self, address=None):
+        self.address = address or default_address()
+        self._connection = None
+
+    def __repr__(self):
+        return f"ServiceClient(address={self.address!r})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = Connect(self.address)
+        return self._connection
+
+    def request(self, name, **params):
+        """The result of one request; raises ServiceError when the service reports an error"""
+        connection = self._connect()
+        connection.send_bytes(json.dumps(dict(params, request=name)).encode("utf-8"))
+        response = json.loads(connection.recv_bytes())
+        if "error" in response:
+            raise ServiceError(response["error"])
+        return response["result"]
+
+    def ping(self) -> dict:
+        return self.request("ping")
+
+    def interfaces(self) -> list:
+        return self.request("interfaces")
+
+    def latest(self, interface=None) -> list:
+        """The latest scan of every interface, or of the one with MAC address interface"""
+        return self.request("latest", interface=interface)
+
+    def scan(self, interface=None) -> list:
+        """Scan now and return the results"""
+        return self.request("scan", interface=interface)
+
+    def current_ap(self, as_json=False, raw=False) -> list:
+        """What lswifi -ap prints, for each interface"""
+        return self.request("current_ap", json=as_json, raw=raw)
+
+    def events(self):
+        """Yield every WLAN event the service sees until the connection closes"""
+        connection = self._connect()
+        self.request("subscribe")
+        while True:
+            try:
+                yield json.loads(connection.recv_bytes())
+            except (EOFError, OSError):
+                return
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def is_running(address=None) -> bool:
+    """Whether a service answers at address"""
+    try:
+        with ServiceClient(address) as service:
+            service.ping()
+    except (OSError, EOFError, ValueError, ServiceError):
+        return False
+    return True
+
+
+def run_request(args) -> bool:
+    """Answer a CLI invocation from a running service; False when there is none.
+
+    --daemon-request prints the JSON result, or every event as a line for
+    events, and exits with status 1 when the service reports an error. lswifi
+    -ap is answered by the service when one is running and falls back to
+    querying the interfaces itself when the service cannot answer.
+    """
+    log = logging.getLogger(__name__)
+    try:
+        with ServiceClient(args.daemon_address) as service:
+            if args.daemon_request == "events":
+                for event in service.events():
+                    print(json.dumps(event), flush=True)
+            elif args.daemon_request:
+                print(
+                    json.dumps(
+                        service.request(args.daemon_request.replace("-", "_")),
+                        indent=args.json_indent,
+                    )
+                )
+            else:
+                for line in service.current_ap(as_json=bool(args.json), raw=args.raw):
+                    print(line)
+    except ServiceError as error:
+        log.error(f"lswifi service: {error}")
+        if args.daemon_request:
+            sys.exit(1)
+        return False
+    except (OSError, EOFError) as error:
+        log.debug(
+            f"no lswifi service at {args.daemon_address or default_address()}: {error}"
+        )
+        return False
+    return True
@@ -16,8 +16,13 @@ define syslog bits
 """
 
 import contextlib
+import logging
+import os
+import queue
 import socket
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
 
 SYSLOG_SERVERS = []
 
@@ -38,7 +43,7 @@ LOG_LEVEL = SYSLOG_LEVEL["DEBUG"]
 SYSLOG_SOCKET = sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)  # UDP
 
 
-# Send syslog messages
+# Send syslog messages; this blocks on the socket, send() queues instead
 def message(message, level):
     if SYSLOG_LEVEL[level] <= LOG_LEVEL and SYSLOG_SERVERS:
         for ip in SYSLOG_SERVERS:
@@ -52,3 +57,256 @@ def message(message, level):
             )
             with contextlib.suppress(OSError):
                 SYSLOG_SOCKET.sendto(bytes(line_to_send, "utf-8"), (ip, 514))
+
+
+# RFC 5424 facility user-level messages
+SYSLOG_FACILITY = 1
+SYSLOG_PORT = 514
+# structured data ID; 32473 is the enterprise number reserved for documentation
+SD_ID = "lswifi@32473"
+
+
+def _sd_escape(value) -> str:
+    return (
+        str(value).strip().replace("\\", "\\\\").replace('"', '\\"').replace("]", "\\]")
+    )
+
+
+def format_rfc5424(
+    message,
+    level,
+    structured_data=None,
+    timestamp=None,
+    hostname=None,
+    app_name="lswifi",
+    msgid="-",
+) -> bytes:
+    """One RFC 5424 syslog message with optional structured data"""
+    priority = SYSLOG_FACILITY * 8 + int(SYSLOG_LEVEL[level])
+    moment = datetime.fromtimestamp(
+        time.time() if timestamp is None else timestamp, tz=timezone.utc
+    )
+    stamp = moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    if structured_data:
+        params = " ".join(
+            f'{key}="{_sd_escape(value)}"'
+            for key, value in structured_data.items()
+            if value is not None and str(value).strip()
+        )
+        sd = f"[{SD_ID} {params}]" if params else "-"
+    else:
+        sd = "-"
+    header = (
+        f"<{priority}>1 {stamp} {hostname or socket.gethostname() or '-'} "
+        f"{app_name} {os.getpid()} {msgid} {sd}"
+    )
+    return f"{header} {message}".encode()
+
+
+class SyslogSender:
+    """Sends syslog messages from a background thread.
+
+    submit() only puts the message on a bounded queue and never blocks, so it
+    is safe to call from the WLAN notification callback thread. When the
+    queue is full the message is dropped and counted. The sender thread takes
+    up to batch_size messages at a time: over UDP each is one datagram, over
+    TCP the batch is framed with octet counting (RFC 6587) and written with
+    one sendall, reconnecting with backoff when the connection is lost.
+    """
+
+    def __init__(
+        self,
+        servers,
+        port=SYSLOG_PORT,
+        protocol="udp",
+        queue_size=1000,
+        batch_size=64,
+        reconnect_delay=1.0,
+        hostname=None,
+    ):
+        if protocol not in ("udp", "tcp"):
+            raise ValueError(f"unsupported syslog protocol {protocol!r}")
+        self.log = logging.getLogger(__name__)
+        self.servers = list(servers)
+        self.port = port
+        self.protocol = protocol
+        self.batch_size = batch_size
+        self.reconnect_delay = reconnect_delay
+        self.hostname = hostname or socket.gethostname()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._udp = None
+        self._tcp = {}
+        self._retry_at = {}
+        self._closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(
+            target=self._run, name="lswifi-syslog", daemon=True
+        )
+        self._thread.start()
+
+    def __repr__(self):
+        return (
+            f"SyslogSender(servers={self.servers!r}, port={self.port}, protocol={self.protocol!r}, "
+            f"sent={self.sent}, dropped={self.dropped}, failed={self.failed})"
+        )
+
+    def submit(self, message, level="INFO", structured_data=None) -> bool:
+        """Queue one message; returns False when it was dropped."""
+        if self._closed or SYSLOG_LEVEL[level] > LOG_LEVEL:
+            return False
+        record = format_rfc5424(message, level, structured_data, hostname=self.hostname)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "sent": self.sent,
+                "dropped": self.dropped,
+                "failed": self.failed,
+            }
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            batch = [record]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+            for server in self.servers:
+                if self.protocol == "tcp":
+                    self._send_tcp(server, batch)
+                else:
+                    self._send_udp(server, batch)
+            if stop:
+                return
+
+    def _count(self, sent, failed) -> None:
+        with self._lock:
+            self.sent += sent
+            self.failed += failed
+
+    def _send_udp(self, server, batch) -> None:
+        if self._udp is None:
+            self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sent = 0
+        for record in batch:
+            try:
+                self._udp.sendto(record, (server, self.port))
+                sent += 1
+            except OSError as error:
+                self.log.debug(f"syslog to {server}:{self.port} failed: {error}")
+        self._count(sent, len(batch) - sent)
+
+    def _connection(self, server):
+        conn = self._tcp.get(server)
+        if conn is not None:
+            return conn
+        if time.monotonic() < self._retry_at.get(server, 0):
+            return None
+        try:
+            conn = socket.create_connection(
+                (server, self.port), timeout=self.reconnect_delay * 5
+            )
+        except OSError as error:
+            self.log.debug(f"syslog connect to {server}:{self.port} failed: {error}")
+            self._retry_at[server] = time.monotonic() + self.reconnect_delay
+            return None
+        self._tcp[server] = conn
+        return conn
+
+    def _send_tcp(self, server, batch) -> None:
+        payload = b"".join(b"%d %s" % (len(record), record) for record in batch)
+        # one reconnect when a connection that was idle turns out to be gone
+        for _attempt in range(2):
+            conn = self._connection(server)
+            if conn is None:
+                break
+            try:
+                conn.sendall(payload)
+            except OSError as error:
+                self.log.debug(f"syslog to {server}:{self.port} failed: {error}")
+                self._tcp.pop(server, None)
+                with contextlib.suppress(OSError):
+                    conn.close()
+                continue
+            self._count(len(batch), 0)
+            return
+        self._count(0, len(batch))
+
+    def close(self, timeout=2.0) -> None:
+        """Send what is queued, waiting up to timeout seconds, and stop."""
+        if self._closed:
+            return
+        self._closed = True
+        with contextlib.suppress(queue.Full):
+            self._queue.put(None, timeout=timeout)
+        self._thread.join(timeout)
+        for conn in self._tcp.values():
+            with contextlib.suppress(OSError):
+                conn.close()
+        self._tcp.clear()
+        if self._udp is not None:
+            self._udp.close()
+            self._udp = None
+        stats = self.stats()
+        if stats["dropped"] or stats["failed"]:
+            self.log.warning(
+                f"syslog: {stats['sent']} sent, {stats['dropped']} dropped with the queue full, "
+                f"{stats['failed']} failed to send"
+            )
+
+
+SENDER = None
+_SENDER_LOCK = threading.Lock()
+
+
+def start(servers=None, port=SYSLOG_PORT, protocol="udp") -> SyslogSender:
+    """Start the sender used by send()"""
+    global SENDER
+    with _SENDER_LOCK:
+        if SENDER is not None:
+            SENDER.close()
+        SENDER = SyslogSender(servers or SYSLOG_SERVERS, port=port, protocol=protocol)
+        return SENDER
+
+
+def send(message, level, **structured_data) -> bool:
+    """Queue a syslog message for the configured servers without blocking"""
+    global SENDER
+    if not SYSLOG_SERVERS and SENDER is None:
+        return False
+    sender = SENDER
+    if sender is None:
+        with _SENDER_LOCK:
+            if SENDER is None:
+                SENDER = SyslogSender(SYSLOG_SERVERS)
+            sender = SENDER
+    return sender.submit(message, level, structured_data)
+
+
+def stop() -> None:
+    """Flush and stop the sender started by start() or send()"""
+    global SENDER
+    with _SENDER_LOCK:
+        if SENDER is not None:
+            SENDER.close()
+            SENDER = None
@@ -0,0 +1,111 @@
+#
+# lswifi - a CLI-centric Wi-Fi scanning tool for Windows
+# Copyright (c) 2025 Josh Schmelzle
+# SPDX-License-Identifier: BSD-3-Clause
+#  _              _  __ _
+# | |_____      _(_)/ _(_)
+# | / __\ \ /\ / / | |_| |
+# | \__ \\ V  V /| |  _| |
+# |_|___/ \_/\_/ |_|_| |_|
+
+"""
+lswifi.watch
+~~~~~~~~~~~~
+
+connected AP cache and fixed field BSS lookups for --watchevents
+"""
+
+import logging
+from threading import Lock
+
+from lswifi import wlanapi as WLAN_API
+from lswifi.bssinfo import decode_bss_summary
+
+# events after which the connected BSSID may have changed
+CONNECTION_EVENTS = frozenset(
+    [
+        "associating",
+        "associated",
+        "authenticating",
+        "connected",
+        "roaming_start",
+        "roaming_end",
+        "disconnecting",
+        "disconnected",
+        "connection_start",
+        "connection_complete",
+        "connection_attempt_fail",
+        "interface_arrival",
+        "interface_removal",
+        "radio_state_change",
+        "adapter_removal",
+    ]
+)
+
+
+class WatchState:
+    """Per-interface state for the event watcher.
+
+    The connected BSSID is looked up with a single query and cached until a
+    connection related event arrives. BSS lists are read as fixed field
+    summaries; only the connected BSS is copied so it can be fully decoded,
+    and only when something asks for it.
+    """
+
+    def __init__(self, interface, query_bssid=None, get_summaries=None):
+        self.log = logging.getLogger(__name__)
+        self.interface = interface
+        self._query_bssid = query_bssid or WLAN_API.WLAN.query_connected_bssid
+        self._get_summaries = (
+            get_summaries or WLAN_API.WLAN.get_wireless_network_bss_summaries
+        )
+        self._lock = Lock()
+        self._bssid = None
+        self._decoded = None
+        self.summaries = []
+        self.connected = None
+        self.lookups = 0
+        self.decodes = 0
+
+    def __repr__(self):
+        return f"WatchState(bssid={self._bssid!r}, summaries={len(self.summaries)}, lookups={self.lookups}, decodes={self.decodes})"
+
+    def on_event(self, event_name: str) -> None:
+        """Forget the cached connection if event_name can change it."""
+        if event_name in CONNECTION_EVENTS:
+            with self._lock:
+                self._bssid = None
+
+    @property
+    def connected_bssid(self) -> str:
+        """The connected BSSID, or "" when not connected."""
+        with self._lock:
+            if self._bssid is None:
+                self._bssid = self._query_bssid(self.interface) or ""
+                self.lookups += 1
+            return self._bssid
+
+    def refresh(self):
+        """Read the BSS list as fixed field summaries and find the connected BSS.
+
+        Returns None when the BSS list could not be read.
+        """
+        bssid = self.connected_bssid
+        summaries = self._get_summaries(
+            self.interface, keep_raw=(bssid,) if bssid else ()
+        )
+        with self._lock:
+            self.summaries = summaries or []
+            self.connected = next((s for s in self.summaries if s.bssid == bssid), None)
+            self._decoded = None
+        return summaries
+
+    def connected_bss(self, is_bytes_arg=False):
+        """Fully decoded WirelessNetworkBss for the connected BSS, decoded on first use."""
+        with self._lock:
+            if self._decoded is None and self.connected is not None:
+                self._decoded = decode_bss_summary(
+                    self.connected, self.connected.bssid, is_bytes_arg=is_bytes_arg
+                )
+                self.decodes += 1
+            return self._decoded
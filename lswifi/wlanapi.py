@@ -15,10 +15,11 @@ lswifi.wlanapi
 mostly wrapper code around Native Wifi wlanapi.h
 """
 
+import atexit
 import contextlib
 import logging
-import sys
 import threading
+import time
 from collections import namedtuple
 from ctypes import (
     c_bool,
@@ -36,20 +37,22 @@ from ctypes import (
     c_wchar_p,
     cast,
     create_string_buffer,
+    string_at,
 )
 from enum import Enum
 
+from lswifi.bindings import BoundLibrary, HandlePool, Prototype
 from lswifi.guid import GUID
 
-if sys.platform == "win32":
+try:
     from ctypes import windll
-else:
-    print("ERROR: win32 support only")
-    sys.exit(-1)
+except ImportError:  # not win32; a fake library can be injected with use_library()
+    windll = None
 
 from ctypes import CFUNCTYPE, POINTER, Structure, Union, addressof, byref, pointer
 from ctypes.wintypes import BOOL, DWORD, HANDLE
 
+from lswifi import bssinfo
 from lswifi.elements import WirelessNetworkBss
 from lswifi.helpers import convert_mac_address_to_string
 
@@ -70,6 +73,7 @@ class SystemErrorCodes(Enum):
     ERROR_BAD_ENVIRONMENT = 10
     ERROR_INVALID_PARAMETER = 87
     ERROR_NOT_SUPPORTED = 50
+    ERROR_BUFFER_OVERFLOW = 111
     ERROR_SERVICE_NOT_ACTIVE = 1062
     ERROR_NOT_FOUND = 1168
     ERROR_REMOTE_SESSION_LIMIT_EXCEEDED = 1220
@@ -99,23 +103,27 @@ DOT11_MAC_ADDRESS = c_ubyte * 6
 
 # load wlanapi.dll into memory
 
-WLAN_API_EXISTS = True
+WLAN_API_EXISTS = windll is not None
+WLAN_API = None
 
-try:
-    WLAN_API = windll.LoadLibrary("wlanapi.dll")
-except OSError:
-    WLAN_API_EXISTS = False
-    print("!!! wlanapi.dll not foud !!!")
+if WLAN_API_EXISTS:
+    try:
+        WLAN_API = windll.LoadLibrary("wlanapi.dll")
+    except OSError:
+        WLAN_API_EXISTS = False
+        print("!!! wlanapi.dll not foud !!!")
 
 # load iphlpapi.dll into memory
 
-IPHLP_API_EXISTS = True
+IPHLP_API_EXISTS = windll is not None
+IPHLP_API = None
 
-try:
-    IPHLP_API = windll.LoadLibrary("iphlpapi.dll")
-except OSError:
-    IPHLP_API_EXISTS = False
-    print("!!! iphlpapi.dll not foud !!!")
+if IPHLP_API_EXISTS:
+    try:
+        IPHLP_API = windll.LoadLibrary("iphlpapi.dll")
+    except OSError:
+        IPHLP_API_EXISTS = False
+        print("!!! iphlpapi.dll not foud !!!")
 
 MAX_ADAPTER_NAME_LENGTH = 256
 MAX_ADAPTER_DESCRIPTION_LENGTH = 128
@@ -159,51 +167,75 @@ NetworkAdapter = namedtuple(
 )
 
 
-def get_adapter_infos_by_guid(interface_guid):
-    # Call with 0 size to get required buffer size first
-    buffer_size = c_ulong(0)
-    result = IPHLP_API.GetAdaptersAddresses(
-        0,
-        0,
-        None,
-        None,
-        byref(buffer_size),  # Family  # Flags  # Reserved  # Buffer
-    )
+# GAA_FLAG_SKIP_UNICAST | ANYCAST | MULTICAST | DNS_SERVER; only names and MACs are used
+GAA_FLAGS_SKIP_ADDRESSES = 0x0001 | 0x0002 | 0x0004 | 0x0008
+
+# adapters are enumerated at most once per this many seconds
+ADAPTER_CACHE_TTL = 5.0
+
+_ADAPTER_CACHE_LOCK = threading.Lock()
+_ADAPTER_CACHE = {"adapters": None, "time": 0.0}
 
-    adapter_addresses = create_string_buffer(buffer_size.value)
-    result = IPHLP_API.GetAdaptersAddresses(
+
+def enumerate_adapters() -> dict:
+    """Walk GetAdaptersAddresses once; returns NetworkAdapter keyed by lowercase {GUID}"""
+    buffer_size = c_ulong(0)
+    result = IPHLP_LIB.GetAdaptersAddresses(
         0,  # Family (0 = unspecified, returns both IPv4 and IPv6)
-        0,  # Flags
+        GAA_FLAGS_SKIP_ADDRESSES,  # Flags
         None,  # Reserved
-        byref(adapter_addresses),
+        None,  # Buffer
         byref(buffer_size),
     )
+    # adapters can appear between the size query and the call, so retry
+    for _attempt in range(3):
+        adapter_addresses = create_string_buffer(buffer_size.value)
+        result = IPHLP_LIB.GetAdaptersAddresses(
+            0,
+            GAA_FLAGS_SKIP_ADDRESSES,
+            None,
+            byref(adapter_addresses),
+            byref(buffer_size),
+        )
+        if result != SystemErrorCodes.ERROR_BUFFER_OVERFLOW.value:
+            break
 
     if result != SystemErrorCodes.ERROR_SUCCESS.value:
         raise RuntimeError(
             f"Failed to retrieve adapter addresses, error code: {result}"
         )
 
+    adapters = {}
     adapter = cast(adapter_addresses, POINTER(IP_ADAPTER_ADDRESSES))
-
     while adapter:
-        # Convert adapter name to GUID format and compare
-        adapter_name = adapter.contents.AdapterName.decode()
-        guid_str = f"{adapter_name}"
-        if guid_str.lower() == str(interface_guid).lower():
-            mac_address = adapter.contents.PhysicalAddress
-            mac_length = adapter.contents.PhysicalAddressLength
-            return NetworkAdapter(
-                mac_address=":".join(
-                    f"{mac_address[i]:02X}" for i in range(mac_length)
-                ),
-                description=adapter.contents.Description,
-                friendly_name=adapter.contents.FriendlyName,
-            )
-
+        mac_address = adapter.contents.PhysicalAddress
+        mac_length = adapter.contents.PhysicalAddressLength
+        adapters[adapter.contents.AdapterName.decode().lower()] = NetworkAdapter(
+            mac_address=":".join(f"{mac_address[i]:02X}" for i in range(mac_length)),
+            description=adapter.contents.Description,
+            friendly_name=adapter.contents.FriendlyName,
+        )
         adapter = adapter.contents.Next
+    return adapters
 
-    # raise ValueError("GUID not found among physical adapters")
+
+def get_adapters_by_guid(max_age=ADAPTER_CACHE_TTL) -> dict:
+    """Adapters keyed by lowercase {GUID}, enumerated again only when older than max_age"""
+    with _ADAPTER_CACHE_LOCK:
+        now = time.monotonic()
+        if _ADAPTER_CACHE["adapters"] is None or now - _ADAPTER_CACHE["time"] > max_age:
+            _ADAPTER_CACHE["adapters"] = enumerate_adapters()
+            _ADAPTER_CACHE["time"] = now
+        return _ADAPTER_CACHE["adapters"]
+
+
+def invalidate_adapter_cache() -> None:
+    with _ADAPTER_CACHE_LOCK:
+        _ADAPTER_CACHE["adapters"] = None
+
+
+def get_adapter_infos_by_guid(interface_guid):
+    return get_adapters_by_guid().get(str(interface_guid).lower())
 
 
 # DOT11_AUTH_ALGORITHM enumeration
@@ -1002,14 +1034,16 @@ class InformationElement:  # TODO: MOVE THIS TO ELEMENTS.PY DOES NOT BELONG IN W
 class WirelessInterface:
     """Data class for the wireless interface"""
 
-    def __init__(self, wlan_iface_info):
+    def __init__(self, wlan_iface_info, adapters=None):
         self.log = logging.getLogger(__name__)
         self.description = wlan_iface_info.strInterfaceDescription
         self.guid = GUID(wlan_iface_info.InterfaceGuid)
         self.guid_string = str(wlan_iface_info.InterfaceGuid)
         self.state = wlan_iface_info.isState
         self.state_string = WLAN_INTERFACE_STATE_DICT.get(self.state, 0)
-        adapter_info = get_adapter_infos_by_guid(self.guid_string)
+        if adapters is None:
+            adapters = get_adapters_by_guid()
+        adapter_info = adapters.get(self.guid_string.lower())
         self.connection_name = "unknown"
         self.description = "unknown"
         self.mac = "unknown"
@@ -1474,6 +1508,74 @@ class WirelessNetwork:
         return result
 
 
+WLAN_NOTIFICATION_CALLBACK = CFUNCTYPE(
+    None,  # type for return value
+    POINTER(WLANNotificationData),
+    c_void_p,
+    use_last_error=True,
+)
+
+# function prototypes, declared once and bound when the library is loaded
+
+WLAN_PROTOTYPES = {
+    "WlanOpenHandle": Prototype(
+        [DWORD, c_void_p, POINTER(DWORD), POINTER(HANDLE)], DWORD
+    ),
+    "WlanCloseHandle": Prototype([HANDLE, c_void_p], DWORD),
+    "WlanFreeMemory": Prototype([c_void_p], None),
+    "WlanEnumInterfaces": Prototype(
+        [HANDLE, c_void_p, POINTER(POINTER(WLANInterfaceInfoList))], DWORD
+    ),
+    "WlanRegisterNotification": Prototype(
+        [
+            HANDLE,
+            DWORD,
+            BOOL,
+            WLAN_NOTIFICATION_CALLBACK,
+            c_void_p,
+            c_void_p,
+            POINTER(DWORD),
+        ],
+        DWORD,
+    ),
+    "WlanScan": Prototype(
+        [HANDLE, POINTER(GUID), POINTER(DOT11SSID), POINTER(WLANRawData), c_void_p],
+        DWORD,
+    ),
+    "WlanGetNetworkBssList": Prototype(
+        [
+            HANDLE,
+            POINTER(GUID),
+            POINTER(DOT11SSID),
+            c_void_p,  # DOT11_BSS_TYPE,
+            c_void_p,  # BOOL,
+            c_void_p,  # c_void_p,
+            POINTER(POINTER(WLANBSSList)),
+        ],
+        DWORD,
+    ),
+    # ppData is PVOID*; the pointed to type depends on the opcode
+    "WlanQueryInterface": Prototype(
+        [
+            HANDLE,
+            POINTER(GUID),
+            WLAN_INTF_OPCODE,
+            c_void_p,
+            POINTER(DWORD),
+            c_void_p,
+            POINTER(WLAN_OPCODE_VALUE_TYPE),
+        ],
+        DWORD,
+    ),
+}
+
+IPHLP_PROTOTYPES = {
+    "GetAdaptersAddresses": Prototype(
+        [c_ulong, c_ulong, c_void_p, c_void_p, POINTER(c_ulong)], c_ulong
+    ),
+}
+
+
 class WLAN:
     global WLANNotificationSource
 
@@ -1512,16 +1614,14 @@ class WLAN:
           PHANDLE phClientHandle # Handle for client used by other func throughout sesion
         );
         """
-        func = WLAN_API.WlanOpenHandle
-        func.argtypes = [DWORD, c_void_p, POINTER(DWORD), POINTER(HANDLE)]
-        func.restype = DWORD
-
         client_ver = (
             2  # Client version for Windows Vista and Windows Server 2008 and above.
         )
         negotiated_version = DWORD()
         client_handle = HANDLE()
-        result = func(client_ver, None, byref(negotiated_version), byref(client_handle))
+        result = WLAN_LIB.WlanOpenHandle(
+            client_ver, None, byref(negotiated_version), byref(client_handle)
+        )
         if result is not SystemErrorCodes.ERROR_SUCCESS.value:
             raise Exception(
                 f"wlanapi.wlan.open_handle() failed: {SystemErrorCodes(result)}:{result}"
@@ -1530,10 +1630,7 @@ class WLAN:
 
     @staticmethod
     def close_handle(client_handle: HANDLE) -> int:
-        func = WLAN_API.WlanCloseHandle
-        func.argtypes = [HANDLE, c_void_p]
-        func.restype = DWORD
-        result = func(client_handle, None)
+        result = WLAN_LIB.WlanCloseHandle(client_handle, None)
         if result is not SystemErrorCodes.ERROR_SUCCESS.value:
             raise Exception(
                 f"wlanapi.wlan.close_handle() failed: {SystemErrorCodes(result)}:{result}"
@@ -1542,9 +1639,7 @@ class WLAN:
 
     @staticmethod
     def free_memory(memory) -> None:
-        func = WLAN_API.WlanFreeMemory
-        func.argtypes = [c_void_p]
-        func(memory)
+        WLAN_LIB.WlanFreeMemory(memory)
 
     @staticmethod
     def enumerate_interfaces(client_handle):
@@ -1557,11 +1652,8 @@ class WLAN:
           PWLAN_INTERFACE_INFO_LIST *ppInterfaceList
         );
         """
-        func_ref = WLAN_API.WlanEnumInterfaces
-        func_ref.argtypes = [HANDLE, c_void_p, POINTER(POINTER(WLANInterfaceInfoList))]
-        func_ref.restype = DWORD
         wlan_ifaces = pointer(WLANInterfaceInfoList())
-        result = func_ref(client_handle, None, byref(wlan_ifaces))
+        result = WLAN_LIB.WlanEnumInterfaces(client_handle, None, byref(wlan_ifaces))
         if result is not SystemErrorCodes.ERROR_SUCCESS.value:
             raise Exception(
                 f"wlanapi.wlan.enumerate_interfaces failed: {SystemErrorCodes(result)}:{result}"
@@ -1570,32 +1662,13 @@ class WLAN:
 
     @staticmethod
     def wlan_register_notification(client_handle: HANDLE, callback):
-        WLAN_NOTIFICATION_CALLBACK_M = CFUNCTYPE(
-            None,  # type for return value
-            POINTER(WLANNotificationData),
-            c_void_p,
-            use_last_error=True,
-        )
-
-        func_ref = WLAN_API.WlanRegisterNotification
-        func_ref.argtypes = [
-            HANDLE,
-            DWORD,
-            BOOL,
-            WLAN_NOTIFICATION_CALLBACK_M,
-            c_void_p,
-            c_void_p,
-            POINTER(DWORD),
-        ]
-        func_ref.restype = DWORD
-
         notification_source = 0xFFFF
         ignore_duplicate = True
-        func_callback = WLAN_NOTIFICATION_CALLBACK_M(callback)
+        func_callback = WLAN_NOTIFICATION_CALLBACK(callback)
         callback_context = None
         previous_notification_source = None
 
-        result = func_ref(
+        result = WLAN_LIB.WlanRegisterNotification(
             client_handle,
             notification_source,
             ignore_duplicate,
@@ -1612,27 +1685,18 @@ class WLAN:
         return func_callback
 
     @staticmethod
-    def scan(guid) -> None:
-        """Tell driver to scan for Wi-Fi networks"""
-        handle = WLAN.open_handle()
-        result = WLAN.wlan_scan(handle, guid)
+    def scan(guid, ssid=None) -> None:
+        """Tell driver to scan for Wi-Fi networks, probing for ssid when given"""
+        with HANDLE_POOL.handle() as handle:
+            result = WLAN.wlan_scan(handle, guid, ssid)
         if result is not SystemErrorCodes.ERROR_SUCCESS.value:
-            WLAN.close_handle(handle)
             raise Exception(f"wlan scan() failed: {SystemErrorCodes(result)}:{result}")
-        WLAN.close_handle(handle)
 
     @staticmethod
     def wlan_scan(client_handle: HANDLE, interface_guid: GUID, ssid=None):
-        func_ref = WLAN_API.WlanScan
-        func_ref.argtypes = [
-            HANDLE,
-            POINTER(GUID),
-            POINTER(DOT11SSID),
-            POINTER(WLANRawData),
-            c_void_p,
-        ]
-        func_ref.restype = DWORD
         if ssid:
+            if isinstance(ssid, str):
+                ssid = ssid.encode("utf-8")
             length = len(ssid)
             if length > DOT11_SSID_MAX_LENGTH:
                 raise Exception("SSIDs have a maximum length of 32 characters.")
@@ -1640,7 +1704,9 @@ class WLAN:
             dot11_ssid = byref(DOT11SSID(length, data))
         else:
             dot11_ssid = None  # type: ignore
-        result = func_ref(client_handle, byref(interface_guid), dot11_ssid, None, None)
+        result = WLAN_LIB.WlanScan(
+            client_handle, byref(interface_guid), dot11_ssid, None, None
+        )
         if result is not SystemErrorCodes.ERROR_SUCCESS.value:
             raise WLANScanError(
                 f"wlan_scan failed: {SystemErrorCodes(result)}:{result}\n{SYSTEM_ERROR_CODE_REASON.get(result, 0)}"
@@ -1654,69 +1720,62 @@ class WLAN:
         """
         ifaces = {}
         wlan_interfaces = None
-        handle = None
         try:
-            threads = []
-            handle = WLAN.open_handle()
-            wlan_interfaces = WLAN.enumerate_interfaces(handle)
+            with HANDLE_POOL.handle() as handle:
+                wlan_interfaces = WLAN.enumerate_interfaces(handle)
             data_type = wlan_interfaces.contents.InterfaceInfo._type_
             num = wlan_interfaces.contents.NumberOfItems
             ifaces_pointer = addressof(wlan_interfaces.contents.InterfaceInfo)
             wlan_interface_info_list = (data_type * num).from_address(ifaces_pointer)
 
-            def WirelessInterfaceThread(index, info):
-                ifaces[index] = WirelessInterface(info)
-
+            # one adapter enumeration shared by every interface
+            adapters = get_adapters_by_guid()
             for index, info in enumerate(wlan_interface_info_list):
-                t = threading.Thread(
-                    target=WirelessInterfaceThread,
-                    args=(
-                        index,
-                        info,
-                    ),
-                )
-                t.daemon = (
-                    True  # we want the thread to terminate if the main process ends
-                )
-                threads.append(t)
-                t.start()
-
-            for _index, t in enumerate(threads):
-                t.join()
-
-            ifaces = {
-                k: ifaces[k] for k in sorted(ifaces)
-            }  # sort by key (index) numerically
+                ifaces[index] = WirelessInterface(info, adapters)
         except Exception:
             raise
         finally:
             if wlan_interfaces:
                 WLAN.free_memory(wlan_interfaces)
-            if handle:
-                WLAN.close_handle(handle)
         return ifaces
 
     @staticmethod
-    def get_wireless_network_bss_list(interface, is_bytes_arg) -> list:
+    def get_wireless_network_bss_list(
+        interface, is_bytes_arg, ssids=None, decoder=None, recorder=None
+    ) -> list:
         """Returns a list of WirelessNetworkBss objects based on the wireless
-        networks available.
+        networks available. When ssids is given, entries for other SSIDs are
+        skipped on their fixed fields before any information elements are decoded.
+        decoder(bss_entry, connected_bssid, is_bytes_arg) replaces the decode,
+        e.g. to share decoded entries between interfaces. recorder is called
+        with a copy of the raw WLAN_BSS_LIST before anything is decoded.
         """
         connected_bssid = None
         with contextlib.suppress(TypeError):
             connected_bssid = WLAN.get_connected_bssid(interface)
 
         networks = []
-        handle = WLAN.open_handle()
         bss_list = None
         with contextlib.suppress(WLANGetNetworkBSSListError):
-            bss_list = WLAN.get_network_bss_list(handle, interface.guid)
+            with HANDLE_POOL.handle() as handle:
+                bss_list = WLAN.get_network_bss_list(handle, interface.guid)
+            if recorder is not None:
+                recorder(
+                    string_at(addressof(bss_list.contents), bss_list.contents.TotalSize)
+                )
             data_type = bss_list.contents.wlanBssEntries._type_
             _numberOfItems = bss_list.contents.NumberOfItems
             bss_pointer = addressof(bss_list.contents.wlanBssEntries)
             bss_entries_list = (data_type * _numberOfItems).from_address(bss_pointer)
 
             for bss_entry in bss_entries_list:
-                if connected_bssid:
+                if ssids and bssinfo.decode_ssid(bss_entry.dot11Ssid) not in ssids:
+                    continue
+                if decoder is not None:
+                    networks.append(
+                        decoder(bss_entry, connected_bssid, is_bytes_arg=is_bytes_arg)
+                    )
+                elif connected_bssid:
                     networks.append(
                         WirelessNetworkBss(
                             bss_entry, connected_bssid, is_bytes_arg=is_bytes_arg
@@ -1730,11 +1789,42 @@ class WLAN:
         if bss_list is not None:
             # print("if get_wireless_network_bss_list bss_list is not None")
             WLAN.free_memory(bss_list)
-        if handle is not None:
-            # print("if get_wireless_network_bss_list handle is not None")
-            WLAN.close_handle(handle)
         return networks
 
+    @staticmethod
+    def get_wireless_network_bss_summaries(interface, keep_raw=()):
+        """Returns a list of fixed field BssSummary tuples for the wireless
+        networks available, without decoding any information elements. Raw
+        copies are kept for BSSIDs in keep_raw so they can be decoded later.
+        Returns None when the BSS list could not be read.
+        """
+        summaries = None
+        bss_list = None
+        with contextlib.suppress(WLANGetNetworkBSSListError):
+            with HANDLE_POOL.handle() as handle:
+                bss_list = WLAN.get_network_bss_list(handle, interface.guid)
+            data_type = bss_list.contents.wlanBssEntries._type_
+            _numberOfItems = bss_list.contents.NumberOfItems
+            bss_pointer = addressof(bss_list.contents.wlanBssEntries)
+            bss_entries_list = (data_type * _numberOfItems).from_address(bss_pointer)
+            summaries = bssinfo.summarize_bss_entries(bss_entries_list, keep_raw)
+
+        if bss_list is not None:
+            WLAN.free_memory(bss_list)
+        return summaries
+
+    @staticmethod
+    def query_connected_bssid(interface):
+        """Returns the BSSID of the current connection, or "" when there is none,
+        using a single current_connection query.
+        """
+        result = WLAN.query_interface(interface, "current_connection")
+        if isinstance(result, tuple) and isinstance(
+            result[0], WLANConnectionAttributes
+        ):
+            return result[1]["wlanAssociationAttributes"]["dot11Bssid"]
+        return ""
+
     @staticmethod
     def get_network_bss_list(clientHandle, interfaceGuid, ssid=None):
         """The WlanGetNetworkBssList function retrieves a list of the basic service set
@@ -1749,20 +1839,11 @@ class WLAN:
           PWLAN_BSS_LIST    *ppWlanBssList
         );
         """
-        func = WLAN_API.WlanGetNetworkBssList
-        func.argtypes = [
-            HANDLE,
-            POINTER(GUID),
-            POINTER(DOT11SSID),  # POINTER(DOT11SSID),
-            c_void_p,  # DOT11_BSS_TYPE,
-            c_void_p,  # BOOL,
-            c_void_p,  # c_void_p,
-            POINTER(POINTER(WLANBSSList)),
-        ]
-        func.restype = DWORD
         wlan_bss_list_pointer = pointer(WLANBSSList())
 
         if ssid:
+            if isinstance(ssid, str):
+                ssid = ssid.encode("utf-8")
             length = len(ssid)
             if length > DOT11_SSID_MAX_LENGTH:
                 raise Exception("SSIDs have a maximum length of 32 characters.")
@@ -1770,7 +1851,7 @@ class WLAN:
         else:
             dot11_ssid = None
 
-        result = func(
+        result = WLAN_LIB.WlanGetNetworkBssList(
             clientHandle,
             byref(interfaceGuid),
             dot11_ssid,
@@ -1798,31 +1879,20 @@ class WLAN:
           PWLAN_OPCODE_VALUE_TYPE pWlanOpcodeValueType
         );
         """
-        func = WLAN_API.WlanQueryInterface
         opcode_name = WLAN_INTF_OPCODE_DICT[op_code.value]
         return_type = WLAN_INTF_OPCODE_TYPE_DICT[opcode_name]
         # print("{} {} {}".format(op_code.value, opcode_name, return_type))
-        func.argtypes = [
-            HANDLE,
-            POINTER(GUID),
-            WLAN_INTF_OPCODE,
-            c_void_p,
-            POINTER(DWORD),
-            POINTER(POINTER(return_type)),
-            POINTER(WLAN_OPCODE_VALUE_TYPE),
-        ]
-        func.restype = DWORD
         pdwDataSize = DWORD()
         ppData = pointer(return_type())
         pWlanOpcodeValueType = WLAN_OPCODE_VALUE_TYPE()
-        result = func(
+        result = WLAN_LIB.WlanQueryInterface(
             client_handle,
             byref(interface_guid),
             op_code,
             None,
-            pdwDataSize,
-            ppData,
-            pWlanOpcodeValueType,
+            byref(pdwDataSize),
+            byref(ppData),
+            byref(pWlanOpcodeValueType),
         )
         # print("{} {}".format(result, SystemErrorCodes(result)))
         # print(ppData.contents)
@@ -1835,7 +1905,6 @@ class WLAN:
     @staticmethod
     def query_interface(wireless_interface, opcode_item):
         """Query interface for connection/association attributes"""
-        handle = WLAN.open_handle()
         opcode_item_ext = "".join(["wlan_intf_opcode_", opcode_item])
         # print(opcode_item_ext)
         opcode = None
@@ -1845,9 +1914,10 @@ class WLAN:
                 break
         # print(opcode)
         try:
-            result = WLAN.wlan_query_interface_wrapper(
-                handle, wireless_interface.guid, opcode
-            )
+            with HANDLE_POOL.handle() as handle:
+                result = WLAN.wlan_query_interface_wrapper(
+                    handle, wireless_interface.guid, opcode
+                )
             # print(result)
             result_contents = result.contents
             if opcode_item == "interface_state":
@@ -1900,6 +1970,45 @@ class WLAN:
                 ext_out = None
         except WirelessNetworkBSSWLANOpenHandleError as error:
             return error.message
-        finally:
-            WLAN.close_handle(handle)
         return result.contents, ext_out
+
+
+# session state for the bound libraries
+
+WLAN_LIB = None
+IPHLP_LIB = None
+HANDLE_POOL = None
+
+
+def use_library(wlanapi=None, iphlpapi=None) -> None:
+    """Bind the WLAN and IP Helper functions to a library.
+
+    Defaults to the loaded DLLs. Any object exposing functions with the same
+    names can be injected instead, which is how the API is exercised off Windows.
+    """
+    global WLAN_LIB, IPHLP_LIB, HANDLE_POOL
+    if HANDLE_POOL is not None:
+        HANDLE_POOL.close_all()
+    WLAN_LIB = BoundLibrary(wlanapi, WLAN_PROTOTYPES)
+    IPHLP_LIB = BoundLibrary(iphlpapi, IPHLP_PROTOTYPES)
+    HANDLE_POOL = HandlePool(WLAN.open_handle, WLAN.close_handle)
+    invalidate_adapter_cache()
+
+
+def api_stats() -> dict:
+    """Per-function call counts and latency for every native function called so far"""
+    stats = {}
+    for library in (WLAN_LIB, IPHLP_LIB):
+        for name, stat in library.stats.items():
+            if stat.count:
+                stats[name] = stat
+    return stats
+
+
+def close_handle_pool() -> None:
+    if HANDLE_POOL is not None:
+        HANDLE_POOL.close_all()
+
+
+use_library(WLAN_API, IPHLP_API)
+atexit.register(close_handle_pool)
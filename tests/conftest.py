@@ -0,0 +1,59 @@
+# -*- encoding: utf-8
+
+import pytest
+
+from lswifi import appsetup, replay
+from lswifi import wlanapi as WLAN_API
+from lswifi.client import Client
+
+
+@pytest.fixture
+def network():
+    """Builds a ReplayBss on channel 36 with BSSID 00:01:02:03:04:<last_octet>"""
+
+    def make(last_octet, ssid=b"lswifi", rssi=-50):
+        return replay.ReplayBss(
+            bssid=[0, 1, 2, 3, 4, last_octet],
+            ssid=ssid,
+            rssi=rssi,
+            frequency=5180,
+            ies=bytes([0, len(ssid)]) + ssid + bytes([3, 1, 36]),
+        )
+
+    return make
+
+
+@pytest.fixture
+def backend():
+    backends = []
+
+    def install(scans, **kwargs):
+        api = replay.ReplayWlanApi(scans, scan_latency=0.01, **kwargs)
+        replay.install(api)
+        backends.append(api)
+        return api
+
+    yield install
+    for api in backends:
+        api.cancel()
+    WLAN_API.use_library(WLAN_API.WLAN_API, WLAN_API.IPHLP_API)
+
+
+@pytest.fixture
+def make_clients(backend):
+    made = []
+
+    def make(argv=()):
+        args = appsetup.setup_parser().parse_args(list(argv))
+        clients = {
+            index: Client(args, iface)
+            for index, iface in WLAN_API.WLAN.get_wireless_interfaces().items()
+        }
+        made.extend(clients.values())
+        return clients
+
+    yield make
+    # close the handles while the replay backend is still bound
+    for client in made:
+        client.scan_timer.cancel()
+        client.__del__()
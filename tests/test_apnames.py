@@ -0,0 +1,85 @@
+# -*- encoding: utf-8
+
+import json
+import os
+
+import pytest
+
+from lswifi.apnames import APNameStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "apnames.json"
+    path.write_text(json.dumps({"00:01:02:03:04:05": "ap-1"}))
+    return str(path)
+
+
+def read(path):
+    with open(path) as fp:
+        return json.load(fp)
+
+
+class TestAPNameStore:
+    def test_loaded_once(self, path):
+        store = APNameStore(path)
+        for _ in range(3):
+            assert store.names() == {"00:01:02:03:04:05": "ap-1"}
+        assert store.loads == 1
+
+    def test_reloaded_when_file_changes(self, path):
+        store = APNameStore(path)
+        store.names()
+        with open(path, "w") as fp:
+            json.dump({"00:01:02:03:04:05": "ap-1", "00:01:02:03:04:06": "ap-2"}, fp)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert store.names()["00:01:02:03:04:06"] == "ap-2"
+        assert store.loads == 2
+
+    def test_write_behind(self, path):
+        store = APNameStore(path, write_delay=60)
+        changed = store.update(
+            {"00:01:02:03:04:05": "ap-1", "00:01:02:03:04:06": "ap-2", "x": ""}
+        )
+        assert changed == 1
+        assert store.names()["00:01:02:03:04:06"] == "ap-2"
+        # nothing written until the delay passes or the store is closed
+        assert "00:01:02:03:04:06" not in read(path)
+        store.close()
+        assert read(path)["00:01:02:03:04:06"] == "ap-2"
+        assert store.writes == 1
+        assert not os.path.exists(f"{path}.tmp")
+        # our own write does not cause a reload
+        store.names()
+        assert store.loads == 1
+
+    def test_timer_flushes(self, path):
+        store = APNameStore(path, write_delay=0.05)
+        store.update({"00:01:02:03:04:06": "ap-2"})
+        timer = store._timer
+        timer.join(5)
+        assert read(path)["00:01:02:03:04:06"] == "ap-2"
+
+    def test_pending_survive_reload(self, path):
+        store = APNameStore(path, write_delay=60)
+        store.update({"00:01:02:03:04:06": "ap-2"})
+        with open(path, "w") as fp:
+            json.dump({"00:01:02:03:04:07": "ap-3"}, fp)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert store.names() == {
+            "00:01:02:03:04:07": "ap-3",
+            "00:01:02:03:04:06": "ap-2",
+        }
+        store.close()
+
+    def test_missing_or_unreadable(self, tmp_path):
+        path = tmp_path / "lswifi" / "apnames.json"
+        store = APNameStore(str(path))
+        assert store.names() == {}
+        store.update({"00:01:02:03:04:05": "ap-1"})
+        store.close()
+        assert read(path) == {"00:01:02:03:04:05": "ap-1"}
+        path.write_text("{not json")
+        assert APNameStore(str(path)).names() == {}
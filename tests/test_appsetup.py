@@ -27,6 +27,30 @@ class TestSensitivity:
             appsetup.sensitivity("abc")
 
 
+class TestRssiHysteresis:
+    def test_valid_threshold(self):
+        assert appsetup.rssi_hysteresis("5") == 5
+        assert appsetup.rssi_hysteresis("30") == 30
+
+    def test_invalid_threshold(self):
+        with pytest.raises(argparse.ArgumentTypeError):
+            appsetup.rssi_hysteresis("0")
+        with pytest.raises(argparse.ArgumentTypeError):
+            appsetup.rssi_hysteresis("abc")
+
+
+class TestDirectedSsid:
+    def test_valid_ssid(self):
+        assert appsetup.directed_ssid("corp") == "corp"
+        assert appsetup.directed_ssid("x" * 32) == "x" * 32
+
+    def test_invalid_ssid(self):
+        with pytest.raises(argparse.ArgumentTypeError):
+            appsetup.directed_ssid("")
+        with pytest.raises(argparse.ArgumentTypeError):
+            appsetup.directed_ssid("\u00e9" * 17)
+
+
 class TestJsonIndent:
     def test_valid_indent(self):
         """Valid indent values 0-4 should pass."""
@@ -0,0 +1,74 @@
+# -*- encoding: utf-8
+
+import ctypes
+
+import pytest
+
+from lswifi.bindings import BoundLibrary, HandlePool, Prototype
+
+
+class FakeLibrary:
+    def __init__(self):
+        self.calls = []
+
+    def Add(self, a, b):
+        self.calls.append((a, b))
+        return a + b
+
+
+class TestBoundLibrary:
+    def test_calls_are_counted(self):
+        """Every call through the bound library is counted and timed."""
+        lib = BoundLibrary(FakeLibrary(), {"Add": Prototype([], None)})
+        assert lib.Add(1, 2) == 3
+        assert lib.Add(3, 4) == 7
+        assert lib.stats["Add"].count == 2
+        assert lib.stats["Add"].max_ns >= 0
+        lib.reset_stats()
+        assert lib.stats["Add"].count == 0
+
+    def test_missing_function(self):
+        lib = BoundLibrary(FakeLibrary(), {"Missing": Prototype([], None)})
+        with pytest.raises(AttributeError):
+            lib.Missing()
+
+    def test_prototype_applied_once(self):
+        """ctypes function pointers get argtypes and restype at bind time."""
+        libc = ctypes.CDLL(None)
+        lib = BoundLibrary(libc, {"abs": Prototype([ctypes.c_int], ctypes.c_int)})
+        assert libc.abs.argtypes == [ctypes.c_int]
+        assert lib.abs(-5) == 5
+
+
+class TestHandlePool:
+    def setup_method(self):
+        self.opened = []
+        self.closed = []
+
+    def open_handle(self):
+        self.opened.append(len(self.opened) + 1)
+        return self.opened[-1]
+
+    def test_handle_reused(self):
+        pool = HandlePool(self.open_handle, self.closed.append)
+        for _ in range(4):
+            with pool.handle() as handle:
+                assert handle == 1
+        assert pool.opened == 1
+        assert pool.reused == 3
+        pool.close_all()
+        assert self.closed == [1]
+
+    def test_concurrent_borrowers_get_distinct_handles(self):
+        pool = HandlePool(self.open_handle, self.closed.append, max_idle=1)
+        with pool.handle() as first, pool.handle() as second:
+            assert first != second
+        assert self.closed == [1]
+
+    def test_handle_discarded_on_error(self):
+        pool = HandlePool(self.open_handle, self.closed.append)
+        with pytest.raises(RuntimeError), pool.handle():
+            raise RuntimeError("failed")
+        assert self.closed == [1]
+        with pool.handle() as handle:
+            assert handle == 2
@@ -0,0 +1,141 @@
+# -*- encoding: utf-8
+
+import json
+import threading
+import time
+
+from lswifi.businfo import BusInfoCache
+
+GUID = "4d36e972-e325-11ce-bfc1-08002be10318"
+
+
+class FakeProbe:
+    """Counts probes; each one can be held until released."""
+
+    def __init__(self, result=("PCIe", "8.0 GT/s x1")):
+        self.result = result
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, guid):
+        self.calls.append(guid)
+        self.release.wait(5)
+        return self.result
+
+
+def make_cache(tmp_path, probe, pnp_id="PCI\\VEN_8086", **kwargs):
+    return BusInfoCache(
+        str(tmp_path / "businfo.json"), probe, pnp_lookup=lambda guid: pnp_id, **kwargs
+    )
+
+
+class TestBusInfoCache:
+    def test_persisted_between_runs(self, tmp_path):
+        probe = FakeProbe()
+        assert make_cache(tmp_path, probe).get(GUID) == ("PCIe", "8.0 GT/s x1")
+        assert make_cache(tmp_path, probe).get(GUID) == ("PCIe", "8.0 GT/s x1")
+        assert len(probe.calls) == 1
+        with open(tmp_path / "businfo.json") as file:
+            assert json.load(file)[GUID]["pnp_id"] == "PCI\\VEN_8086"
+
+    def test_pnp_change_invalidates(self, tmp_path):
+        probe = FakeProbe()
+        make_cache(tmp_path, probe).get(GUID)
+        probe.result = ("USB", "SuperSpeed")
+        cache = make_cache(tmp_path, probe, pnp_id="USB\\VID_0E8D")
+        assert cache.get(GUID) == ("USB", "SuperSpeed")
+
+    def test_stale_returned_while_refreshing(self, tmp_path):
+        probe = FakeProbe()
+        make_cache(tmp_path, probe).get(GUID)
+        probe.result = ("USB", "HighSpeed")
+        probe.release.clear()
+        cache = make_cache(tmp_path, probe, ttl=0)
+        time.sleep(0.01)
+        assert cache.get(GUID) == ("PCIe", "8.0 GT/s x1")
+        probe.release.set()
+        cache._pending[GUID].result(5)
+        assert cache.get(GUID) == ("USB", "HighSpeed")
+
+    def test_refresh_does_not_block_exit(self, tmp_path):
+        probe = FakeProbe()
+        make_cache(tmp_path, probe).get(GUID)
+        probe.release.clear()
+        cache = make_cache(tmp_path, probe, ttl=0)
+        time.sleep(0.01)
+        cache.get(GUID)
+        # interpreter shutdown does not wait for a refresh still in progress
+        (thread,) = [t for t in threading.enumerate() if t.name == "businfo"]
+        assert thread.daemon
+        future = cache._pending[GUID]
+        probe.release.set()
+        future.result(5)
+
+    def test_prefetch_in_parallel(self, tmp_path):
+        probe = FakeProbe()
+        probe.release.clear()
+        cache = make_cache(tmp_path, probe)
+        guids = [f"{GUID[:-1]}{i}" for i in range(3)]
+        cache.prefetch(guids)
+        deadline = time.time() + 5
+        while len(probe.calls) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        assert sorted(probe.calls) == guids
+        probe.release.set()
+        assert [cache.get(guid) for guid in guids] == [probe.result] * 3
+        assert cache.probes == 3
+
+    def test_invalidate(self, tmp_path):
+        probe = FakeProbe()
+        cache = make_cache(tmp_path, probe)
+        cache.get(GUID)
+        cache.invalidate(GUID)
+        cache.get(GUID)
+        assert len(probe.calls) == 2
+
+    def test_probe_failure(self, tmp_path):
+        def probe(guid):
+            raise OSError("powershell missing")
+
+        cache = make_cache(tmp_path, probe)
+        assert cache.get(GUID) == (None, None)
+        assert not cache._pending
+
+    def test_failed_probe_not_stored(self, tmp_path):
+        probe = FakeProbe(result=(None, None))
+        cache = make_cache(tmp_path, probe)
+        assert cache.get(GUID) == (None, None)
+        probe.result = ("PCIe", "8.0 GT/s x1")
+        assert make_cache(tmp_path, probe).get(GUID) == ("PCIe", "8.0 GT/s x1")
+        assert len(probe.calls) == 2
+
+    def test_failed_refresh_keeps_entry(self, tmp_path):
+        probe = FakeProbe()
+        make_cache(tmp_path, probe).get(GUID)
+        probe.result = (None, None)
+        probe.release.clear()
+        cache = make_cache(tmp_path, probe, ttl=0)
+        time.sleep(0.01)
+        assert cache.get(GUID) == ("PCIe", "8.0 GT/s x1")
+        future = cache._pending[GUID]
+        probe.release.set()
+        assert future.result(5) == (None, None)
+        assert make_cache(tmp_path, probe).get(GUID) == ("PCIe", "8.0 GT/s x1")
+
+    def test_pending_until_stored(self, tmp_path):
+        """A probe stays pending until its entry is stored, so it is never started twice"""
+        pending_at_save = []
+
+        class Cache(BusInfoCache):
+            def _save(self):
+                pending_at_save.append(GUID in self._pending)
+                super()._save()
+
+        probe = FakeProbe()
+        cache = Cache(
+            str(tmp_path / "businfo.json"), probe, pnp_lookup=lambda guid: None
+        )
+        cache.get(GUID)
+        assert pending_at_save == [True]
+        assert not cache._pending
@@ -0,0 +1,87 @@
+# -*- encoding: utf-8
+
+import asyncio
+import time
+
+from lswifi.client import ScanLatencyStats, TimerEx
+
+
+def start_scan(client):
+    asyncio.run(client.scan())
+
+
+class TestScanCompletion:
+    def test_latency_stats(self):
+        stats = ScanLatencyStats()
+        assert stats.mean is None
+        assert str(stats) == "0 scans"
+        for latency in (0.2, 0.1, 0.3):
+            stats.add(latency)
+        assert (stats.count, stats.min, stats.max) == (3, 0.1, 0.3)
+        assert abs(stats.mean - 0.2) < 1e-9
+
+    def test_completed_by_notification(self, backend, make_clients, network):
+        backend([[network(1)]])
+        client = make_clients()[0]
+        completed = []
+        client.add_scan_listener(completed.append)
+        assert not client.wait_for_scan(0)
+        start_scan(client)
+        assert client.wait_for_scan(5)
+        assert client.last_scan_completed_by == "notification"
+        assert client.scan_latency_stats["notification"].count == 1
+        assert client.scan_latency_stats["timeout"].count == 0
+        assert completed == [client]
+        assert [str(bss.bssid) for bss in client.data] == ["00:01:02:03:04:01"]
+        # a late completion of the same scan is ignored
+        assert not client.finish_scan("timeout")
+        assert completed == [client]
+
+    def test_completed_by_timeout(self, backend, make_clients, network):
+        backend([[network(1)]], drop_every=1)
+        client = make_clients()[0]
+        client.scan_timer = TimerEx(0.05, client.scan_timeout)
+        start_scan(client)
+        assert client.wait_for_scan(5)
+        assert client.last_scan_completed_by == "timeout"
+        assert client.scan_latency_stats["timeout"].count == 1
+        assert client.scan_latency_stats["notification"].count == 0
+        assert client.data is not None
+
+    def test_notification_before_wait(self, backend, make_clients, network):
+        api = backend([[network(1)]])
+        client = make_clients()[0]
+        start_scan(client)
+        # the results arrive before anything waits on the scan
+        api.notify(client.iface.guid, "scan_list_refresh")
+        assert client.scan_finished
+        start = time.perf_counter()
+        assert client.wait_for_scan(5)
+        assert time.perf_counter() - start < 0.1
+        assert client.last_scan_completed_by == "notification"
+        # the notifications the replayed scan sends later change nothing
+        time.sleep(0.1)
+        assert client.scan_latency_stats["notification"].count == 1
+
+
+class TestWatchEvents:
+    def watch(self, make_clients, monkeypatch, summaries):
+        client = make_clients(["--watchevents"])[0]
+        monkeypatch.setattr(
+            client.watch, "_get_summaries", lambda interface, keep_raw: summaries
+        )
+        return client
+
+    def test_empty_scan_logged(self, backend, make_clients, monkeypatch, caplog):
+        backend([[]])
+        client = self.watch(make_clients, monkeypatch, [])
+        with caplog.at_level("INFO", logger=client.log.name):
+            client.on_event_notification("scan_list_refresh", client.iface.guid)
+        assert "scan: (0 BSSIDs found)" in caplog.text
+
+    def test_failed_read_not_logged(self, backend, make_clients, monkeypatch, caplog):
+        backend([[]])
+        client = self.watch(make_clients, monkeypatch, None)
+        with caplog.at_level("INFO", logger=client.log.name):
+            client.on_event_notification("scan_list_refresh", client.iface.guid)
+        assert "scan_list_refresh" not in caplog.text
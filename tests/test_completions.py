@@ -15,8 +15,9 @@ class TestCompletions:
         """Filters options by prefix."""
         result = completions.get_completions([], "--ch")
         assert "--channel-width" in result
-        # -channel doesn't match --ch prefix, only --channel-width does
-        assert len(result) == 1
+        assert "--changes" in result
+        # -channel doesn't match --ch prefix, only --changes and --channel-width do
+        assert len(result) == 2
 
     def test_get_completions_channel_width_values(self):
         """After --channel-width, returns width values."""
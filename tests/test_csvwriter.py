@@ -0,0 +1,67 @@
+# -*- encoding: utf-8
+
+import csv
+import gzip
+
+from lswifi.csvwriter import CSVWriter, read_columns
+
+
+def row(bssid, rssi="-50"):
+    return {"timestamp": "t1", "bssid": bssid, "rssi": rssi}
+
+
+class TestCSVWriter:
+    def test_heading_written_once(self, tmp_path):
+        path = str(tmp_path / "scans.csv")
+        with CSVWriter(path) as writer:
+            assert writer.write_rows([row("01"), row("02")]) == 2
+            writer.write_rows([row("03")])
+            assert writer.write_rows([]) == 0
+        with CSVWriter(path) as writer:
+            writer.write_rows([row("04")])
+        with open(path, newline="") as file:
+            rows = list(csv.reader(file))
+        assert rows[0] == ["timestamp", "bssid", "rssi"]
+        assert [r[1] for r in rows[1:]] == ["01", "02", "03", "04"]
+
+    def test_columns_from_existing_file(self, tmp_path):
+        """Rows follow the heading already in the file, not their own key order"""
+        path = str(tmp_path / "scans.csv")
+        with open(path, "w", newline="") as file:
+            file.write("rssi,bssid,uptime\r\n")
+        assert read_columns(path) == ["rssi", "bssid", "uptime"]
+        with CSVWriter(path) as writer:
+            writer.write_rows([row("01", "-61")])
+        with open(path, newline="") as file:
+            rows = list(csv.reader(file))
+        assert rows == [["rssi", "bssid", "uptime"], ["-61", "01", ""]]
+
+    def test_empty_file_gets_heading(self, tmp_path):
+        path = str(tmp_path / "scans.csv")
+        open(path, "w").close()
+        assert read_columns(path) is None
+        with CSVWriter(path) as writer:
+            writer.write_rows([row("01")])
+        assert read_columns(path) == ["timestamp", "bssid", "rssi"]
+
+    def test_flush_interval(self, tmp_path):
+        path = str(tmp_path / "scans.csv")
+        writer = CSVWriter(path, flush_interval=0)
+        writer.write_rows([row("01")])
+        with open(path, newline="") as file:
+            assert len(list(csv.reader(file))) == 2
+        writer.close()
+
+    def test_gzip(self, tmp_path):
+        path = str(tmp_path / "scans.csv.gz")
+        with CSVWriter(path) as writer:
+            writer.write_rows([row("01")])
+        with CSVWriter(path) as writer:
+            writer.write_rows([row("02")])
+        with gzip.open(path, "rt", newline="") as file:
+            rows = list(csv.reader(file))
+        assert rows == [
+            ["timestamp", "bssid", "rssi"],
+            ["t1", "01", "-50"],
+            ["t1", "02", "-50"],
+        ]
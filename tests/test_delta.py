@@ -0,0 +1,146 @@
+# -*- encoding: utf-8
+
+from lswifi.app import lswifi
+from lswifi.delta import (
+    APPEARED,
+    CHANGED,
+    BssState,
+    DeltaEngine,
+    describe,
+)
+from lswifi.runtime import ScanRuntime
+
+
+def state(
+    bssid="00:11:22:33:44:55",
+    rssi=-60,
+    channel="36",
+    width="80",
+    ies="a",
+    ssid="lswifi",
+):
+    return BssState(bssid, ssid, rssi, channel, width, ies)
+
+
+class TestDeltaEngine:
+    def test_first_scan_appears(self):
+        engine = DeltaEngine()
+        change = engine.observe("if0", state())
+        assert change.kind == APPEARED
+        assert describe(change) == "new"
+        assert engine.finish("if0") == []
+
+    def test_rssi_hysteresis(self):
+        """Small RSSI movement is ignored and does not move the baseline."""
+        engine = DeltaEngine(rssi_threshold=5)
+        engine.observe("if0", state(rssi=-60))
+        engine.finish("if0")
+        assert engine.observe("if0", state(rssi=-63)) is None
+        engine.finish("if0")
+        # drift adds up against the last reported value
+        change = engine.observe("if0", state(rssi=-65))
+        assert change.kind == CHANGED
+        assert describe(change) == "rssi -5"
+        engine.finish("if0")
+        assert engine.observe("if0", state(rssi=-67)) is None
+
+    def test_channel_width_and_ies(self):
+        engine = DeltaEngine()
+        engine.observe("if0", state())
+        engine.finish("if0")
+        change = engine.observe("if0", state(channel="149", ies="b"))
+        assert change.reasons == ["channel", "ies"]
+        assert describe(change) == "channel ies"
+
+    def test_disappeared(self):
+        engine = DeltaEngine()
+        engine.observe("if0", state("aa"))
+        engine.observe("if0", state("bb"))
+        engine.remember("if0", state("bb"), table=["row"])
+        engine.finish("if0")
+        engine.observe("if0", state("aa"))
+        gone = engine.finish("if0")
+        assert [(s.bssid, outputs) for s, outputs in gone] == [
+            ("bb", {"table": ["row"]})
+        ]
+        # a returning BSSID appears again
+        assert engine.observe("if0", state("bb")).kind == APPEARED
+
+    def test_interfaces_are_independent(self):
+        engine = DeltaEngine()
+        engine.observe("if0", state())
+        engine.finish("if0")
+        assert engine.observe("if1", state()).kind == APPEARED
+        assert engine.finish("if0") == [(state(), {})]
+
+    def test_ssids_sharing_a_bssid(self):
+        engine = DeltaEngine()
+        for scan in range(3):
+            changes = [
+                engine.observe("if0", state(ssid="corp", rssi=-60)),
+                engine.observe("if0", state(ssid="guest", rssi=-70)),
+            ]
+            assert engine.finish("if0") == []
+            if scan:
+                assert changes == [None, None]
+
+    def test_listed_twice_in_one_scan(self):
+        engine = DeltaEngine()
+        for scan in range(3):
+            first = engine.observe("if0", state(rssi=-60))
+            # repeated entries are only compared once
+            assert engine.observe("if0", state(rssi=-75)) is None
+            engine.finish("if0")
+            if scan:
+                assert first is None
+
+    def test_present_but_not_observed(self):
+        engine = DeltaEngine()
+        engine.observe("if0", state("aa"))
+        engine.observe("if0", state("bb"))
+        engine.finish("if0")
+        engine.observe("if0", state("aa"))
+        assert engine.finish("if0", present=[("bb", "lswifi")]) == []
+        assert engine.observe("if0", state("bb")) is None
+
+
+class TestChangesOutput:
+    def test_gone_sorted_and_top(self, backend, make_clients, capsys, network):
+        backend(
+            [
+                [network(1, rssi=-40), network(2, rssi=-50), network(3, rssi=-60)],
+                [network(2, rssi=-50), network(3, rssi=-60), network(4, rssi=-80)],
+                # 04 is still heard, but falls out of the --top 2
+                [network(3, rssi=-60), network(4, rssi=-45), network(5, rssi=-30)],
+            ]
+        )
+        clients = make_clients(["--changes", "-n", "3"])
+        app = lswifi()
+        app.delta = DeltaEngine(rssi_threshold=clients[0].args.changes)
+        tables = []
+
+        def handler(scanned):
+            app.process_scan_results(scanned, False, "", "", clients[0].args)
+            tables.append(
+                [
+                    line.split()[1]
+                    for line in capsys.readouterr().out.splitlines()
+                    if "00:01:02:03:04:" in line
+                ]
+            )
+
+        runtime = ScanRuntime(clients, handler)
+        try:
+            runtime.run(scans=2, interval=0)
+            clients[0].args.top = 2
+            runtime.run(scans=1, interval=0)
+        finally:
+            runtime.close()
+        # the gone row is sorted by RSSI with the others, not appended last
+        assert tables[1] == ["00:01:02:03:04:01", "00:01:02:03:04:04"]
+        # 02 is gone; 03 is only outside the --top selection
+        assert tables[2] == [
+            "00:01:02:03:04:05",
+            "00:01:02:03:04:04",
+            "00:01:02:03:04:02",
+        ]
@@ -0,0 +1,24 @@
+# -*- encoding: utf-8
+
+import pytest
+
+from lswifi.directed import SsidRotation
+
+
+class TestSsidRotation:
+    def test_round_robin(self):
+        rotation = SsidRotation(["corp", "voice", "corp"])
+        assert rotation.ssids == ["corp", "voice"]
+        assert [rotation.next() for _ in range(5)] == [
+            "corp",
+            "voice",
+            "corp",
+            "voice",
+            "corp",
+        ]
+        assert "voice" in rotation
+        assert "guest" not in rotation
+
+    def test_requires_ssid(self):
+        with pytest.raises(ValueError):
+            SsidRotation([])
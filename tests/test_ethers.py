@@ -0,0 +1,113 @@
+# -*- encoding: utf-8
+
+import pytest
+
+from lswifi.ethers import (
+    EthersStore,
+    format_rule,
+    normalize_rule,
+    read_import,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "ethers"
+    path.write_text(
+        "# comment\n"
+        "00:01:02:03:04:05 ap-1\n"
+        "00-01-02-03-04-1* ap-2\n"
+        "00:01:02:03:04:1f ap-3\n"
+        "00:01:02* building-a\n"
+        "not-a-mac broken\n"
+    )
+    return EthersStore(str(path))
+
+
+class TestEthersStore:
+    def test_normalize(self):
+        assert normalize_rule("AA-BB-CC-DD-EE-FF") == "aabbccddeeff"
+        assert normalize_rule("aabb.ccdd.eef*") == "aabbccddeef*"
+        assert format_rule("aabbccddeef*") == "aa:bb:cc:dd:ee:f*"
+        for bad in ["aa:bb", "zz:bb:cc:dd:ee:ff", "*", "aa:bb:cc:dd:ee:ff*"]:
+            with pytest.raises(ValueError):
+                normalize_rule(bad)
+
+    def test_lookup(self, store):
+        assert store.lookup("00:01:02:03:04:05") == "ap-1"
+        assert store.lookup("00:01:02:03:04:05(*)") == "ap-1"
+        # exact entries win over rules
+        assert store.lookup("00:01:02:03:04:1f") == "ap-3"
+        # longest prefix first
+        assert store.lookup("00:01:02:03:04:12") == "ap-2"
+        assert store.lookup("00:01:02:ff:ff:ff") == "building-a"
+        assert store.lookup("00:01:03:00:00:00") is None
+        assert store.lookup("garbage") is None
+        assert len(store) == 4
+
+    def test_longest_prefix_skips_siblings(self, tmp_path):
+        path = tmp_path / "ethers"
+        path.write_text("aa:bb* short\naa:bb:c0* sibling\naa:bb:cc:0* other\n")
+        store = EthersStore(str(path))
+        assert store.lookup("aa:bb:cc:dd:ee:ff") == "short"
+        assert store.lookup("aa:bb:c0:00:00:00") == "sibling"
+        assert store.lookup("aa:bb:cc:01:00:00") == "other"
+
+    def test_loaded_once(self, store):
+        for _ in range(3):
+            store.lookup("00:01:02:03:04:05")
+        assert store.loads == 1
+
+    def test_add_appends(self, store):
+        before = open(store.path).read()
+        store.add("00:01:02:03:04:05", "new name")
+        store.add("aa:bb:cc:dd:ee:f*", "radio")
+        after = open(store.path).read()
+        assert after.startswith(before)
+        assert after.endswith("00:01:02:03:04:05 newname\naa:bb:cc:dd:ee:f* radio\n")
+        # the last line for a BSSID wins
+        assert store.lookup("00:01:02:03:04:05") == "newname"
+        assert store.lookup("aa:bb:cc:dd:ee:f1") == "radio"
+        with pytest.raises(ValueError):
+            store.add("00:01:02:03:04:05", " ")
+
+    def test_import_inventory(self, store, tmp_path):
+        export = tmp_path / "inventory.csv"
+        export.write_text(
+            "\ufeffSite,AP Name,Radio MAC\n"
+            "hq,AP 101,00:01:02:03:04:05\n"
+            "hq,ap-102,00:01:02:03:05:0*\n"
+            "hq,,00:01:02:03:06:00\n"
+            "hq,ap-104,unknown\n"
+        )
+        assert store.import_file(str(export)) == 2
+        assert store.lookup("00:01:02:03:04:05") == "AP101"
+        assert store.lookup("00:01:02:03:05:01") == "ap-102"
+        # the rewrite keeps existing entries and drops unreadable lines
+        assert store.lookup("00:01:02:03:04:1f") == "ap-3"
+        assert "broken" not in open(store.path).read()
+
+    def test_import_without_heading(self, tmp_path):
+        export = tmp_path / "pairs.txt"
+        export.write_text("00:01:02:03:04:05\tap-1\n00:01:02:03:04:06\tap-2\n")
+        assert read_import(str(export)) == {
+            "000102030405": "ap-1",
+            "000102030406": "ap-2",
+        }
+        ethers = tmp_path / "ethers-file"
+        ethers.write_text("00:01:02:03:04:05 ap-1\n")
+        assert read_import(str(ethers)) == {"000102030405": "ap-1"}
+
+    def test_many_entries(self, tmp_path):
+        path = tmp_path / "ethers"
+        path.write_text(
+            "".join(
+                f"00:02:00:00:{i >> 8:02x}:{i & 0xFF:02x} ap-{i}\n"
+                for i in range(20000)
+            )
+            + "".join(f"00:03:00:00:{i:02x}:0* radio-{i}\n" for i in range(256))
+        )
+        store = EthersStore(str(path))
+        assert store.lookup("00:02:00:00:4e:1f") == "ap-19999"
+        assert store.lookup("00:03:00:00:7f:0c") == "radio-127"
+        assert len(store) == 20256
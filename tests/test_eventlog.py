@@ -0,0 +1,151 @@
+# -*- encoding: utf-8
+
+import gzip
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from lswifi.bssinfo import BssSummary
+from lswifi.client import Client
+from lswifi.eventlog import EventLog
+
+
+def read(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+class TestEventLog:
+    def test_record(self, tmp_path):
+        path = str(tmp_path / "events.ndjson")
+        events = EventLog(path, flush_interval=60)
+        events.record(
+            "roaming_end",
+            "00:01:02:03:04:05",
+            bssid="aa:bb:cc:dd:ee:ff",
+            ssid="lswifi",
+            frequency=5180,
+            rssi=-61,
+        )
+        events.record("disconnected", "00:01:02:03:04:05")
+        # buffered until the flush interval, a full buffer or close
+        assert os.path.getsize(path) == 0
+        events.close()
+        first, second = read(path)
+        assert first["event"] == "roaming_end"
+        assert first["interface_mac"] == "00:01:02:03:04:05"
+        assert (first["bssid"], first["ssid"], first["frequency"], first["rssi"]) == (
+            "aa:bb:cc:dd:ee:ff",
+            "lswifi",
+            5180,
+            -61,
+        )
+        assert "T" in first["timestamp"]
+        assert second["monotonic"] >= first["monotonic"]
+        assert second["bssid"] is None and second["rssi"] is None
+        # nothing is taken after close
+        events.record("connected", "00:01:02:03:04:05")
+        assert events.records == 2
+
+    def test_flushed_by_writer_thread(self, tmp_path):
+        path = str(tmp_path / "events.ndjson")
+        events = EventLog(path, flush_interval=0.05)
+        events.record("scan_complete", "00:01:02:03:04:05")
+        deadline = time.monotonic() + 5
+        while not os.path.getsize(path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert read(path)[0]["event"] == "scan_complete"
+        events.close()
+
+    def test_rotate_by_size(self, tmp_path):
+        path = str(tmp_path / "events.ndjson")
+        events = EventLog(path, max_bytes=1000, backups=3, flush_interval=60)
+        for i in range(40):
+            events.record("signal_quality_change", "00:01:02:03:04:05", rssi=-i)
+            events.flush()
+        events.close()
+        names = sorted(os.listdir(tmp_path))
+        assert names == [
+            "events.ndjson",
+            "events.ndjson.1",
+            "events.ndjson.2",
+            "events.ndjson.3",
+        ]
+        assert events.rotations > 3
+        # newest events are in the current file, then .1, .2 and .3
+        rssi = [
+            [event["rssi"] for event in read(str(tmp_path / name))]
+            for name in ["events.ndjson.3", "events.ndjson.2", "events.ndjson.1"]
+        ]
+        assert rssi[0][-1] - 1 == rssi[1][0] and rssi[1][-1] - 1 == rssi[2][0]
+        for name in names:
+            assert os.path.getsize(tmp_path / name) < 1000 + 200
+
+    def test_rotate_compressed_by_age(self, tmp_path):
+        path = str(tmp_path / "events.ndjson")
+        events = EventLog(path, rotate_interval=60, compress=True, flush_interval=60)
+        events.record("connected", "00:01:02:03:04:05")
+        events.flush()
+        assert events.rotations == 0
+        events._opened_at -= 61
+        events.record("disconnected", "00:01:02:03:04:05")
+        events.flush()
+        events.record("connected", "00:01:02:03:04:05")
+        events.close()
+        assert [event["event"] for event in read(path + ".1.gz")] == [
+            "connected",
+            "disconnected",
+        ]
+        assert [event["event"] for event in read(path)] == ["connected"]
+        assert not os.path.exists(path + ".1.gz.tmp")
+
+    def test_age_from_first_record(self, tmp_path):
+        """Restarting does not push back rotation of a file which is already old"""
+        path = str(tmp_path / "events.ndjson")
+        with EventLog(path) as events:
+            events.record("connected", "00:01:02:03:04:05")
+        lines = read(path)
+        lines[0]["timestamp"] = "2024-01-01T00:00:00.000+00:00"
+        with open(path, "w") as file:
+            file.write(json.dumps(lines[0]) + "\n")
+        events = EventLog(path, rotate_interval=3600, flush_interval=60)
+        assert events._opened_at == 1704067200.0
+        events.record("disconnected", "00:01:02:03:04:05")
+        events.close()
+        assert events.rotations == 1
+        assert [event["event"] for event in read(path + ".1")] == [
+            "connected",
+            "disconnected",
+        ]
+
+    def test_appends_to_existing(self, tmp_path):
+        path = str(tmp_path / "events.ndjson")
+        with EventLog(path) as events:
+            events.record("connected", "00:01:02:03:04:05")
+        with EventLog(path) as events:
+            events.record("disconnected", "00:01:02:03:04:05")
+        assert [event["event"] for event in read(path)] == ["connected", "disconnected"]
+
+
+class TestClientEvents:
+    def test_record_event(self, tmp_path):
+        path = str(tmp_path / "events.ndjson")
+        client = Client.__new__(Client)
+        client.is_handle_closed = True
+        client.mac = "00:01:02:03:04:05"
+        client.watch = SimpleNamespace(
+            connected=BssSummary("aa:bb:cc:dd:ee:ff", "lswifi", -55, 5955, 90, 1)
+        )
+        client.events = EventLog(path)
+        client.record_event("roaming_end", "aa:bb:cc:dd:ee:ff")
+        client.record_event("roaming_start", "11:22:33:44:55:66")
+        client.events.close()
+        roamed, started = read(path)
+        assert (roamed["ssid"], roamed["frequency"], roamed["rssi"]) == (
+            "lswifi",
+            5955,
+            -55,
+        )
+        assert started["bssid"] == "11:22:33:44:55:66" and started["ssid"] is None
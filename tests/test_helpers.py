@@ -338,4 +338,15 @@ class TestHelpers(object):
         assert helpers.get_channel_number_from_frequency("7.055") == "221"
         assert helpers.get_channel_number_from_frequency("7.075") == "225"
         assert helpers.get_channel_number_from_frequency("7.095") == "229"
-        assert helpers.get_channel_number_from_frequency("7.115") == "233"
\ No newline at end of file
+        assert helpers.get_channel_number_from_frequency("7.115") == "233"
+
+    def test_ie_content_hash_ignores_volatile_ies(self):
+        ssid = b"\x00\x04test"
+        tim_a = b"\x05\x04\x00\x01\x00\x00"
+        tim_b = b"\x05\x04\x01\x01\x00\x00"
+        assert helpers.ie_content_hash(ssid + tim_a) == helpers.ie_content_hash(
+            ssid + tim_b
+        )
+        assert helpers.ie_content_hash(ssid) != helpers.ie_content_hash(b"\x00\x04tost")
+        # truncated elements still contribute to the hash
+        assert helpers.ie_content_hash(ssid + b"\x30") != helpers.ie_content_hash(ssid)
\ No newline at end of file
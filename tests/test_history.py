@@ -0,0 +1,161 @@
+# -*- encoding: utf-8
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from lswifi import appsetup
+from lswifi.app import lswifi
+from lswifi.elements import WirelessNetworkBss
+from lswifi.history import (
+    ScanHistory,
+    bssid_to_int,
+    int_to_bssid,
+    parse_time,
+    run_query,
+)
+from lswifi.runtime import ScanRuntime
+from tests.test_watch import make_bss_entry
+
+
+def decoded(last_octet, rssi=-50, frequency=5180000):
+    return WirelessNetworkBss(
+        make_bss_entry([0, 1, 2, 3, 4, last_octet], rssi=rssi, frequency=frequency)
+    )
+
+
+@pytest.fixture
+def history(tmp_path):
+    with ScanHistory(str(tmp_path / "history.db")) as history:
+        yield history
+
+
+class TestScanHistory:
+    def test_bssid_int(self):
+        assert bssid_to_int("00-01-02-03-04-05(*)") == 0x000102030405
+        assert int_to_bssid(0x000102030405) == "00:01:02:03:04:05"
+        for value in ("zz", "aa:bb", "00:01:02:03:04:05:06"):
+            with pytest.raises(ValueError):
+                bssid_to_int(value)
+
+    def test_wal(self, history):
+        mode = history.connection.execute("PRAGMA journal_mode").fetchone()
+        assert mode == ("wal",)
+
+    def test_rssi_timeline(self, history):
+        history.record_scan("aa:aa:aa:aa:aa:aa", "wlan", 100.0, [decoded(1, -60)])
+        history.record_scan("aa:aa:aa:aa:aa:aa", "wlan", 110.0, [decoded(1, -55)])
+        history.record_scan("bb:bb:bb:bb:bb:bb", "wlan", 120.0, [decoded(1, -70)])
+        samples = history.rssi_timeline("00:01:02:03:04:01")
+        assert [sample.rssi for sample in samples] == [-60, -55, -70]
+        assert samples[0].interface == "aa:aa:aa:aa:aa:aa"
+        assert samples[0].channel == 36
+        assert samples[0].ssid == "lswifi"
+        windowed = history.rssi_timeline("000102030401", since=105.0, until=115.0)
+        assert [sample.time for sample in windowed] == [110.0]
+
+    def test_window_with_scans_out_of_time_order(self, history):
+        """Scan ids from an older recording appended later do not widen the window"""
+        for timestamp, rssi in ((200.0, -60), (100.0, -70), (250.0, -65)):
+            history.record_scan(
+                "aa:aa:aa:aa:aa:aa", "wlan", timestamp, [decoded(1, rssi)]
+            )
+        windowed = history.rssi_timeline("00:01:02:03:04:01", since=150.0, until=260.0)
+        assert [sample.rssi for sample in windowed] == [-60, -65]
+        (seen,) = history.bssids_on_channel(36, since=150.0, until=260.0)
+        assert (seen.observations, seen.rssi_min, seen.last_seen) == (2, -65, 250.0)
+
+    def test_bssids_on_channel(self, history):
+        history.record_scan(
+            "aa:aa:aa:aa:aa:aa",
+            "wlan",
+            100.0,
+            [decoded(1, -60), decoded(2, -40), decoded(3, frequency=2412000)],
+        )
+        history.record_scan("aa:aa:aa:aa:aa:aa", "wlan", 110.0, [decoded(1, -50)])
+        seen = history.bssids_on_channel(36)
+        assert [bss.bssid for bss in seen] == ["00:01:02:03:04:02", "00:01:02:03:04:01"]
+        assert (seen[1].observations, seen[1].rssi_min, seen[1].rssi_max) == (
+            2,
+            -60,
+            -50,
+        )
+        assert seen[1].last_seen == 110.0
+        assert [bss.bssid for bss in history.bssids_on_channel(1)] == [
+            "00:01:02:03:04:03"
+        ]
+        assert history.bssids_on_channel(149) == []
+
+    def test_normalized(self, history):
+        for index in range(5):
+            history.record_scan(
+                "aa:aa:aa:aa:aa:aa", "wlan", float(index), [decoded(1), decoded(2)]
+            )
+        count = history.connection.execute
+        assert count("SELECT COUNT(*) FROM interfaces").fetchone() == (1,)
+        assert count("SELECT COUNT(*) FROM scans").fetchone() == (5,)
+        assert count("SELECT COUNT(*) FROM observations").fetchone() == (10,)
+        # both BSSs carry the same IEs, so one blob serves every observation
+        assert count("SELECT COUNT(*) FROM ies").fetchone() == (1,)
+
+    def test_reopened(self, tmp_path):
+        path = str(tmp_path / "history.db")
+        with ScanHistory(path) as history:
+            history.record_scan("aa:aa:aa:aa:aa:aa", "wlan", 1.0, [decoded(1)])
+        with ScanHistory(path) as history:
+            history.record_scan("aa:aa:aa:aa:aa:aa", "wlan", 2.0, [decoded(1)])
+            assert len(history.rssi_timeline("00:01:02:03:04:01")) == 2
+        assert sqlite3.connect(path).execute("PRAGMA user_version").fetchone() == (1,)
+
+    def test_parse_time(self):
+        assert parse_time(None) is None
+        assert parse_time("30m", now=10000.0) == 8200.0
+        assert parse_time("7d", now=1000000.0) == 1000000.0 - 7 * 86400
+        assert parse_time("2024-01-01T00:00:00+00:00") == 1704067200.0
+        with pytest.raises(ValueError):
+            parse_time("yesterday")
+
+    def test_history_command(self, tmp_path, capsys):
+        path = str(tmp_path / "history.db")
+        with ScanHistory(path) as history:
+            history.record_scan(
+                "aa:aa:aa:aa:aa:aa", "wlan", 1700000000.0, [decoded(1, -61)]
+            )
+        args = appsetup.setup_parser().parse_args(
+            ["history", path, "channel", "36", "--since", "2023-01-01T00:00:00"]
+        )
+        run_query(args)
+        out = capsys.readouterr().out
+        assert "00:01:02:03:04:01" in out
+        assert "-61" in out
+        run_query(
+            SimpleNamespace(**dict(vars(args), query="rssi", value="aa:aa:aa:aa:aa:aa"))
+        )
+        assert "no observations" in capsys.readouterr().out
+        for value in ("zz", "aa:bb"):
+            with pytest.raises(SystemExit):
+                run_query(
+                    SimpleNamespace(**dict(vars(args), query="rssi", value=value))
+                )
+            assert f"{value} is not a BSSID" in capsys.readouterr().out
+
+    def test_stored_from_scans(self, backend, make_clients, tmp_path, network):
+        path = str(tmp_path / "history.db")
+        backend([[network(1), network(2, rssi=-70)]])
+        clients = make_clients(["--sqlite", path])
+        app = lswifi()
+        app.history = ScanHistory(path)
+        runtime = ScanRuntime(
+            clients,
+            lambda scanned: app.process_scan_results(
+                scanned, False, "", "", clients[0].args
+            ),
+        )
+        try:
+            runtime.run(scans=2, interval=0)
+        finally:
+            runtime.close()
+        samples = app.history.rssi_timeline("00:01:02:03:04:02")
+        app.history.close()
+        assert [sample.rssi for sample in samples] == [-70, -70]
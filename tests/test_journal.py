@@ -0,0 +1,117 @@
+# -*- encoding: utf-8
+
+import pytest
+
+from lswifi import replay
+from lswifi import wlanapi as WLAN_API
+from lswifi.journal import (
+    JournalError,
+    JournalWriter,
+    decode_record,
+    is_journal,
+    read_journal,
+    scans_from_journal,
+)
+
+GUID_A = "{4D36E972-E325-11CE-BFC1-08002BE10318}"
+GUID_B = "{4D36E972-E325-11CE-BFC1-08002BE10319}"
+
+
+def bss_list(*last_octets):
+    return bytes(
+        replay.build_bss_list(
+            [
+                replay.ReplayBss(
+                    [0, 1, 2, 3, 4, octet], b"lswifi", -50, 5180, b"\x00\x06lswifi"
+                )
+                for octet in last_octets
+            ]
+        )
+    )
+
+
+class TestJournal:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "scan.lswj")
+        with JournalWriter(path) as journal:
+            journal.record(GUID_A, bss_list(1, 2), timestamp=1700000000.25)
+            journal.recorder(GUID_B, "timeout")(bss_list(3))
+        # appending to an existing journal keeps the header
+        with JournalWriter(path) as journal:
+            journal.record(GUID_A, bss_list(4))
+        records = list(read_journal(path))
+        assert [record.guid for record in records] == [GUID_A, GUID_B, GUID_A]
+        assert records[0].timestamp == 1700000000.25
+        assert [record.trigger for record in records] == [
+            "scan_list_refresh",
+            "timeout",
+            "scan_list_refresh",
+        ]
+        assert records[1].data == bss_list(3)
+        assert [str(bss.bssid) for bss in decode_record(records[0])] == [
+            "00:01:02:03:04:01",
+            "00:01:02:03:04:02",
+        ]
+        assert [len(scans) for scans in scans_from_journal(path).values()] == [2, 1]
+
+    def test_truncated_tail_ignored(self, tmp_path):
+        path = str(tmp_path / "scan.lswj")
+        with JournalWriter(path) as journal:
+            journal.record(GUID_A, bss_list(1))
+            journal.record(GUID_A, bss_list(2))
+        with open(path, "r+b") as file:
+            file.truncate(file.seek(0, 2) - 10)
+        assert len(list(read_journal(path))) == 1
+
+    def test_append_after_truncated_tail(self, tmp_path):
+        path = str(tmp_path / "scan.lswj")
+        with JournalWriter(path) as journal:
+            journal.record(GUID_A, bss_list(1))
+            journal.record(GUID_A, bss_list(2))
+        with open(path, "r+b") as file:
+            file.truncate(file.seek(0, 2) - 10)
+        with JournalWriter(path) as journal:
+            journal.record(GUID_B, bss_list(3))
+            journal.record(GUID_B, bss_list(4))
+        records = list(read_journal(path))
+        assert [record.data for record in records] == [
+            bss_list(1),
+            bss_list(3),
+            bss_list(4),
+        ]
+
+    def test_not_a_journal(self, tmp_path):
+        path = tmp_path / "scan.pcapng"
+        path.write_bytes(b"\x0a\x0d\x0d\x0a")
+        assert not is_journal(str(path))
+        with pytest.raises(JournalError):
+            JournalWriter(str(path))
+
+    def test_recorded_from_bss_list_read(self, tmp_path):
+        path = str(tmp_path / "scan.lswj")
+        api = replay.ReplayWlanApi(
+            [[replay.ReplayBss("00:01:02:03:04:05", b"x", -60, 2412, b"\x00\x01x")]]
+        )
+        replay.install(api)
+        try:
+            iface = WLAN_API.WLAN.get_wireless_interfaces()[0]
+            with JournalWriter(path) as journal:
+                networks = WLAN_API.WLAN.get_wireless_network_bss_list(
+                    iface, False, recorder=journal.recorder(iface.guid_string)
+                )
+        finally:
+            WLAN_API.use_library(WLAN_API.WLAN_API, WLAN_API.IPHLP_API)
+        (record,) = read_journal(path)
+        assert record.guid == iface.guid_string
+        decoded = decode_record(record)
+        assert [str(bss.bssid) for bss in decoded] == [str(networks[0].bssid)]
+
+    def test_replay_backend(self, tmp_path):
+        path = str(tmp_path / "scan.lswj")
+        with JournalWriter(path) as journal:
+            journal.record(GUID_A, bss_list(1))
+            journal.record(GUID_A, bss_list(2))
+            journal.record(GUID_B, bss_list(3))
+        api = replay.backend_from_file(path)
+        assert api.scan_count == 2
+        assert [interface.guid for interface in api.interfaces] == [GUID_A, GUID_B]
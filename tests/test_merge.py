@@ -0,0 +1,75 @@
+# -*- encoding: utf-8
+
+from types import SimpleNamespace
+
+from lswifi.merge import MergedClient, MergedScan
+from tests.test_watch import make_bss_entry
+
+
+class TestMergedScan:
+    def test_decoded_once_across_interfaces(self):
+        merge = MergedScan()
+        first = merge.decoder("aa:aa:aa:aa:aa:aa")
+        second = merge.decoder("bb:bb:bb:bb:bb:bb")
+        for index in range(3):
+            first(make_bss_entry([0, 1, 2, 3, 4, index], rssi=-70))
+            second(make_bss_entry([0, 1, 2, 3, 4, index], rssi=-60 - index))
+        assert merge.decodes == 3
+        assert merge.observations == 6
+        results = merge.results()
+        assert [bss.rssi.value for bss in results] == [-60, -61, -62]
+        merged = results[2].merged
+        assert merged.mean_rssi == -66
+        assert merged.rssi_by_interface() == {
+            "aa:aa:aa:aa:aa:aa": -70,
+            "bb:bb:bb:bb:bb:bb": -62,
+        }
+
+    def test_refreshed_interface_counted_once(self):
+        merge = MergedScan()
+        bssid = [0, 1, 2, 3, 4, 5]
+        merge.decode("aa:aa:aa:aa:aa:aa", make_bss_entry(bssid, rssi=-80))
+        merge.decode("bb:bb:bb:bb:bb:bb", make_bss_entry(bssid, rssi=-60))
+        # a second scan_list_refresh on the same interface within the cycle
+        bss = merge.decode("aa:aa:aa:aa:aa:aa", make_bss_entry(bssid, rssi=-70))
+        assert bss.merged.interfaces == ["aa:aa:aa:aa:aa:aa", "bb:bb:bb:bb:bb:bb"]
+        assert bss.merged.rssi_by_interface() == {
+            "aa:aa:aa:aa:aa:aa": -70,
+            "bb:bb:bb:bb:bb:bb": -60,
+        }
+        assert bss.merged.mean_rssi == -65
+
+    def test_different_ies_decoded_separately(self):
+        merge = MergedScan()
+        merge.decode("aa:aa:aa:aa:aa:aa", make_bss_entry([0, 1, 2, 3, 4, 5]))
+        merge.decode(
+            "bb:bb:bb:bb:bb:bb", make_bss_entry([0, 1, 2, 3, 4, 5], ssid=b"other")
+        )
+        assert merge.decodes == 2
+
+    def test_connected_on_any_interface(self):
+        merge = MergedScan()
+        entry = make_bss_entry([0, 1, 2, 3, 4, 5])
+        merge.decode("aa:aa:aa:aa:aa:aa", entry)
+        bss = merge.decode("bb:bb:bb:bb:bb:bb", entry, "00:01:02:03:04:05")
+        assert bss.bssid.connected
+
+    def test_reset(self):
+        merge = MergedScan()
+        merge.decode("aa:aa:aa:aa:aa:aa", make_bss_entry([0, 1, 2, 3, 4, 5]))
+        merge.reset()
+        assert merge.results() == []
+
+    def test_client(self):
+        clients = [
+            SimpleNamespace(
+                mac=mac,
+                iface=mac,
+                last_scan_time_epoch=epoch,
+                last_scan_time_iso=str(epoch),
+            )
+            for mac, epoch in [("aa", 2.0), ("bb", 1.0)]
+        ]
+        client = MergedClient(clients, [])
+        assert client.mac == "aa, bb"
+        assert client.last_scan_time_iso == "2.0"
@@ -0,0 +1,127 @@
+# -*- encoding: utf-8
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from lswifi import metrics
+from lswifi.app import lswifi
+from lswifi.runtime import ScanRuntime
+
+
+@pytest.fixture
+def server():
+    server = metrics.MetricsServer("127.0.0.1", 0, registry=metrics.Registry())
+    yield server
+    server.close()
+
+
+def scrape(server, path="/metrics"):
+    url = f"http://127.0.0.1:{server.port}{path}"
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.headers["Content-Type"], response.read().decode()
+
+
+class TestRegistry:
+    def test_counter_and_gauge(self):
+        registry = metrics.Registry()
+        events = registry.counter("events_total", "events", ["interface", "event"])
+        events.inc(interface="00:01", event="connected")
+        events.inc(2, interface="00:01", event="connected")
+        events.inc(interface='a"b\\c', event="x\ny")
+        bss = registry.gauge("bss", "bss heard", ["band"])
+        bss.set(3, band="5GHz")
+        bss.set(1, band="5GHz")
+        assert registry.exposition().splitlines() == [
+            "# HELP events_total events",
+            "# TYPE events_total counter",
+            'events_total{interface="00:01",event="connected"} 3',
+            'events_total{interface="a\\"b\\\\c",event="x\\ny"} 1',
+            "# HELP bss bss heard",
+            "# TYPE bss gauge",
+            'bss{band="5GHz"} 1',
+        ]
+
+    def test_histogram(self):
+        registry = metrics.Registry()
+        latency = registry.histogram(
+            "latency_seconds", "latency", ["interface"], buckets=(0.1, 1.0)
+        )
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value, interface="wlan0")
+        with latency.time(interface="wlan1"):
+            pass
+        assert latency.count(interface="wlan0") == 4
+        lines = registry.exposition().splitlines()
+        assert lines[2:7] == [
+            'latency_seconds_bucket{interface="wlan0",le="0.1"} 2',
+            'latency_seconds_bucket{interface="wlan0",le="1.0"} 3',
+            'latency_seconds_bucket{interface="wlan0",le="+Inf"} 4',
+            'latency_seconds_sum{interface="wlan0"} 3.65',
+            'latency_seconds_count{interface="wlan0"} 4',
+        ]
+        assert 'latency_seconds_count{interface="wlan1"} 1' in lines
+
+    def test_caches_and_collectors(self):
+        registry = metrics.Registry()
+        registry.track_cache("vendor", lambda: (9, 1))
+        registry.track_cache("broken", lambda: 1 / 0)
+        registry.add_collector("broken", lambda: 1 / 0)
+        text = registry.exposition()
+        assert 'lswifi_cache_hits_total{cache="vendor"} 9' in text
+        assert 'lswifi_cache_misses_total{cache="vendor"} 1' in text
+        assert "broken" not in text
+
+
+class TestMetricsServer:
+    def test_serves_metrics(self, server):
+        content_type, _ = scrape(server)
+        assert content_type == metrics.CONTENT_TYPE
+        with pytest.raises(urllib.error.HTTPError) as error:
+            scrape(server, "/other")
+        assert error.value.code == 404
+
+    def test_scan_metrics(self, backend, make_clients, network):
+        backend([[network(1), network(2)]])
+        clients = make_clients(["--metrics", "127.0.0.1:0"])
+        app = lswifi()
+        app.start_metrics("127.0.0.1", 0)
+        runtime = ScanRuntime(
+            clients,
+            lambda scanned: app.process_scan_results(
+                scanned, False, "", "", clients[0].args
+            ),
+        )
+        try:
+            runtime.run(scans=1)
+        finally:
+            runtime.close()
+        try:
+            _, text = scrape(app.metrics_server)
+        finally:
+            app.metrics_server.close()
+        mac = clients[0].mac
+        assert f'lswifi_bss{{interface="{mac}",band="5GHz"}} 2' in text
+        assert f'lswifi_bss{{interface="{mac}",band="2.4GHz"}} 0' in text
+        assert f'lswifi_scan_latency_seconds_count{{interface="{mac}"}}' in text
+        assert (
+            f'lswifi_scans_completed_total{{interface="{mac}",completed_by="notification"}}'
+            in text
+        )
+        assert f'lswifi_scan_decode_seconds_count{{interface="{mac}"}}' in text
+        assert 'lswifi_native_calls_total{function="WlanGetNetworkBssList"}' in text
+        assert 'lswifi_cache_hits_total{cache="handle_pool"}' in text
+
+
+class TestMetricsArgument:
+    def test_address(self):
+        from lswifi.appsetup import metrics_address, setup_parser
+
+        assert metrics_address("9200") == ("127.0.0.1", 9200)
+        assert metrics_address("0.0.0.0:9200") == ("0.0.0.0", 9200)
+        assert metrics_address("[::1]:9200") == ("::1", 9200)
+        assert setup_parser().parse_args(["--metrics"]).metrics == (
+            "127.0.0.1",
+            9101,
+        )
@@ -0,0 +1,190 @@
+# -*- encoding: utf-8
+
+import json
+import time
+from types import SimpleNamespace
+
+from lswifi import replay
+from lswifi.app import lswifi
+from lswifi.mld import MLD, MLDLink, group_mlds
+from lswifi.runtime import ScanRuntime
+
+
+def mac(text):
+    return bytes(int(octet, 16) for octet in text.split(":"))
+
+
+def multi_link(mld_mac, link_id, profiles=()):
+    """Basic Multi-Link element with Link ID Info and a Per-STA Profile per link"""
+    body = bytes([107]) + (0x0010).to_bytes(2, "little")
+    body += bytes([8]) + mac(mld_mac) + bytes([link_id])
+    for sta_link_id, sta_mac in profiles:
+        # link ID, complete profile and STA MAC Address present
+        control = (sta_link_id | 0x30).to_bytes(2, "little")
+        body += bytes([0, 9]) + control + bytes([7]) + mac(sta_mac)
+    return bytes([255, len(body)]) + body
+
+
+def rnr(operating_class, channel, bssid, ap_mld_id, link_id):
+    """Reduced Neighbor Report with one 16 octet TBTT Information field"""
+    tbtt = bytes([0]) + mac(bssid) + bytes(4) + bytes([0x02, 0])
+    tbtt += bytes([ap_mld_id, link_id, 0])
+    body = bytes([0x00, len(tbtt), operating_class, channel]) + tbtt
+    return bytes([201, len(body)]) + body
+
+
+def bss(bssid, frequency, channel, rssi, ssid=b"lswifi", ies=b""):
+    return replay.ReplayBss(
+        bssid=bssid,
+        ssid=ssid,
+        rssi=rssi,
+        frequency=frequency,
+        ies=bytes([0, len(ssid)]) + ssid + bytes([3, 1, channel]) + ies,
+    )
+
+
+def venue():
+    return [
+        # an AP MLD which sends a Multi-Link element, with a 2.4 GHz link
+        # heard in the scan and a 6 GHz link only known from the RNR
+        bss(
+            "00:01:02:03:04:01",
+            5180,
+            36,
+            -50,
+            ies=multi_link("02:00:00:00:00:01", 0, [(1, "00:01:02:03:04:02")])
+            + rnr(131, 37, "00:01:02:03:04:03", 0, 2),
+        ),
+        bss("00:01:02:03:04:02", 2437, 6, -65),
+        # grouped from RNR MLD Parameters alone
+        bss(
+            "00:01:02:03:05:01",
+            5200,
+            40,
+            -70,
+            ssid=b"other",
+            ies=rnr(115, 44, "00:01:02:03:05:02", 0, 1)
+            + rnr(115, 48, "00:01:02:03:06:01", 255, 15),
+        ),
+        bss("00:01:02:03:04:09", 5180, 36, -50),
+    ]
+
+
+class TestGroupMLDs:
+    def run(self, backend, make_clients, argv, handler):
+        backend([venue()])
+        clients = make_clients(argv)
+        runtime = ScanRuntime(clients, lambda scanned: handler(scanned, clients))
+        try:
+            runtime.run(scans=1)
+        finally:
+            runtime.close()
+
+    def test_decoded_venue(self, backend, make_clients):
+        found = []
+        self.run(
+            backend,
+            make_clients,
+            [],
+            lambda scanned, _clients: found.extend(group_mlds(scanned[0].data)),
+        )
+        assert found == [
+            MLD(
+                "02:00:00:00:00:01",
+                "lswifi",
+                [
+                    MLDLink("00:01:02:03:04:01", 0, "5GHz", 36, -50),
+                    MLDLink("00:01:02:03:04:02", 1, "2.4GHz", 6, -65),
+                    MLDLink("00:01:02:03:04:03", 2, "6GHz", 37, None),
+                ],
+            ),
+            MLD(
+                None,
+                "other",
+                [
+                    MLDLink("00:01:02:03:05:02", 1, "5GHz", 44, None),
+                    MLDLink("00:01:02:03:05:01", None, "5GHz", 40, -70),
+                ],
+            ),
+        ]
+
+    def test_table(self, backend, make_clients, capsys):
+        app = lswifi()
+        self.run(
+            backend,
+            make_clients,
+            ["--mld"],
+            lambda scanned, clients: app.process_scan_results(
+                scanned, False, "", "", clients[0].args
+            ),
+        )
+        out = capsys.readouterr().out
+        row = next(line for line in out.splitlines() if "02:00:00:00:00:01" in line)
+        assert "2/3" in row
+        assert "2:6GHz/37 00:01:02:03:04:03" in row
+        assert "00:01:02:03:06:01" not in out
+
+    def test_json(self, backend, make_clients, capsys):
+        app = lswifi()
+        self.run(
+            backend,
+            make_clients,
+            ["--mld", "--json"],
+            lambda scanned, clients: app.print_mld_list(scanned[0], clients[0].args),
+        )
+        mlds = json.loads(capsys.readouterr().out)
+        assert [len(mld["links"]) for mld in mlds] == [3, 2]
+        assert mlds[0]["links"][2] == {
+            "bssid": "00:01:02:03:04:03",
+            "link_id": 2,
+            "band": "6GHz",
+            "channel": 37,
+            "rssi": None,
+        }
+
+
+def value(value):
+    return SimpleNamespace(value=value)
+
+
+def reported(bssid, ap_mld_id, link_id, channel):
+    return SimpleNamespace(
+        RNR_BSSID=value(bssid),
+        RNR_AP_MLD_ID=value(ap_mld_id),
+        RNR_LINK_ID=value(link_id),
+        RNR_CHANNEL=value(f"{channel}@320"),
+        RNR_FREQ=value(f"{(5950 + channel * 5) / 1000:.3f}"),
+    )
+
+
+def test_many_links():
+    # every link reports every other link of its MLD, as in a 6 GHz venue
+    bss_list = []
+    for mld in range(300):
+        bssids = [
+            f"00:02:00:00:{mld >> 8:02x}:{mld & 0xFF:02x}{link}" for link in "abc"
+        ]
+        for link, bssid in enumerate(bssids):
+            bss_list.append(
+                SimpleNamespace(
+                    bssid=value(bssid),
+                    ssid=value(f"ssid-{mld}"),
+                    rssi=value(-60),
+                    channel_number=value(str(1 + 4 * link)),
+                    channel_frequency=value(f"{(5955 + 20 * link) / 1000:.3f}"),
+                    rnrs=[
+                        reported(other, 0, index, 1 + 4 * index)
+                        for index, other in enumerate(bssids)
+                        if other != bssid
+                    ],
+                    mld_mac=None,
+                    mld_links=[],
+                    mld_link_id=link,
+                )
+            )
+    start = time.perf_counter()
+    mlds = group_mlds(bss_list)
+    assert time.perf_counter() - start < 1
+    assert len(mlds) == 300
+    assert all(len(mld.links) == 3 for mld in mlds)
+    assert [link.link_id for link in mlds[0].links] == [0, 1, 2]
@@ -0,0 +1,149 @@
+# -*- encoding: utf-8
+
+import json
+
+import pytest
+
+from lswifi import wlanapi as WLAN_API
+from lswifi.__version__ import __version__
+from lswifi.app import lswifi
+from lswifi.ndjson import NDJSONWriter, read_ndjson, read_scans, to_nested
+from lswifi.runtime import ScanRuntime
+
+
+def scan(timestamp, *bssids):
+    return [
+        {"timestamp": timestamp, "interface_mac": "aa:bb:cc:dd:ee:ff", "bssid": bssid}
+        for bssid in bssids
+    ]
+
+
+class TestNDJSON:
+    def test_per_bss(self, tmp_path):
+        path = str(tmp_path / "scans.ndjson")
+        with NDJSONWriter(path) as writer:
+            assert writer.write_scan(scan("t1", "01", "02")) == 2
+            assert writer.write_scan([]) == 0
+        with NDJSONWriter(path) as writer:
+            writer.write_scan(scan("t2", "01"))
+        lines = list(read_ndjson(path))
+        # the version header is only written to a new file
+        assert lines[0] == {"lswifi": {"version": f"lswifi {__version__}"}}
+        assert [line["bssid"] for line in lines[1:]] == ["01", "02", "01"]
+        assert [len(s) for s in read_scans(path)] == [2, 1]
+
+    def test_per_scan(self, tmp_path):
+        path = str(tmp_path / "scans.ndjson")
+        with NDJSONWriter(path, per="scan") as writer:
+            assert writer.write_scan(scan("t1", "01", "02")) == 1
+            writer.write_scan(scan("t2", "03"))
+        records = list(read_ndjson(path))[1:]
+        assert records[0]["timestamp"] == "t1"
+        assert [len(record["scan"]) for record in records] == [2, 1]
+        assert [len(s) for s in read_scans(path)] == [2, 1]
+
+    def test_bad_per(self, tmp_path):
+        with pytest.raises(ValueError):
+            NDJSONWriter(str(tmp_path / "scans.ndjson"), per="ap")
+
+    def test_incomplete_last_line_ignored(self, tmp_path):
+        path = str(tmp_path / "scans.ndjson")
+        with NDJSONWriter(path) as writer:
+            writer.write_scan(scan("t1", "01"))
+        with open(path, "a") as file:
+            file.write('{"timestamp": "t2", "bss')
+        assert [len(s) for s in read_scans(path)] == [1]
+
+    def test_append_after_incomplete_last_line(self, tmp_path):
+        path = str(tmp_path / "scans.ndjson")
+        with NDJSONWriter(path) as writer:
+            writer.write_scan(scan("t1", "01"))
+        with open(path, "a") as file:
+            file.write('{"timestamp": "t2", "bss')
+        with NDJSONWriter(path) as writer:
+            writer.write_scan(scan("t3", "02"))
+        assert [s[0]["timestamp"] for s in read_scans(path)] == ["t1", "t3"]
+        assert to_nested(path)["scan_data"] == scan("t1", "01") + [scan("t3", "02")]
+
+    def test_unparsable_last_line_ignored(self, tmp_path, caplog):
+        path = str(tmp_path / "scans.ndjson")
+        with NDJSONWriter(path) as writer:
+            writer.write_scan(scan("t1", "01"))
+        with open(path, "a") as file:
+            file.write('{"timestamp": "t2", "bss\n')
+        assert [len(s) for s in read_scans(path)] == [1]
+        assert "ignoring unparsable line 3" in caplog.text
+        with open(path, "a") as file:
+            file.write(json.dumps(scan("t3", "02")[0]) + "\n")
+        with pytest.raises(json.decoder.JSONDecodeError):
+            list(read_ndjson(path))
+
+    def test_to_nested(self, tmp_path):
+        """Matches the layout --json builds up scan by scan"""
+        path = str(tmp_path / "scans.ndjson")
+        with NDJSONWriter(path) as writer:
+            writer.write_scan(scan("t1", "01", "02"))
+            writer.write_scan(scan("t2", "01"))
+            writer.write_scan(scan("t3", "02"))
+        nested = to_nested(path)
+        assert nested["lswifi"]["version"] == f"lswifi {__version__}"
+        assert nested["scan_data"][:2] == scan("t1", "01", "02")
+        assert nested["scan_data"][2:] == [scan("t2", "01"), scan("t3", "02")]
+
+    def test_streamed_from_scans(self, backend, make_clients, tmp_path, network):
+        path = str(tmp_path / "scans.ndjson")
+        backend([[network(1), network(2, rssi=-70)]])
+        clients = make_clients(["--ndjson", path])
+        app = lswifi()
+        app.ndjson = NDJSONWriter(path)
+        runtime = ScanRuntime(
+            clients,
+            lambda scanned: app.process_scan_results(
+                scanned, False, "", "", clients[0].args
+            ),
+        )
+        try:
+            runtime.run(scans=2, interval=0)
+        finally:
+            runtime.close()
+            app.ndjson.close()
+        scans = list(read_scans(path))
+        assert len(scans) == 2
+        assert sorted(record["bssid"] for record in scans[0]) == [
+            "00:01:02:03:04:01",
+            "00:01:02:03:04:02",
+        ]
+        with open(path) as file:
+            assert all(json.loads(line) for line in file)
+
+    def test_connected_marker(
+        self, backend, make_clients, tmp_path, network, monkeypatch, capsys
+    ):
+        """The table keeps the (*) marker; records carry "connected" instead"""
+        path = str(tmp_path / "scans.ndjson")
+        backend([[network(1), network(2, rssi=-70)]])
+        monkeypatch.setattr(
+            WLAN_API.WLAN,
+            "get_connected_bssid",
+            staticmethod(lambda interface: "00:01:02:03:04:02"),
+        )
+        clients = make_clients(["--ndjson", path])
+        app = lswifi()
+        app.ndjson = NDJSONWriter(path)
+        runtime = ScanRuntime(
+            clients,
+            lambda scanned: app.process_scan_results(
+                scanned, False, "", "", clients[0].args
+            ),
+        )
+        try:
+            runtime.run(scans=1)
+        finally:
+            runtime.close()
+            app.ndjson.close()
+        assert "00:01:02:03:04:02(*)" in capsys.readouterr().out
+        (scan,) = read_scans(path)
+        assert {record["bssid"]: record["connected"] for record in scan} == {
+            "00:01:02:03:04:01": False,
+            "00:01:02:03:04:02": True,
+        }
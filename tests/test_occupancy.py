@@ -0,0 +1,150 @@
+# -*- encoding: utf-8
+
+import json
+import random
+import time
+
+import pytest
+
+from lswifi import occupancy
+from lswifi.app import lswifi
+from lswifi.occupancy import ChannelUsage, Coverage, aggregate, covered_channels
+from lswifi.runtime import ScanRuntime
+
+
+def coverage(band, channel, width=20, marking="", rssi=-60, stations=None, cu=None):
+    return Coverage(
+        band,
+        channel,
+        covered_channels(band, channel, width, marking),
+        rssi,
+        stations,
+        cu,
+    )
+
+
+def random_coverages(count, seed=7):
+    rng = random.Random(seed)
+    coverages = []
+    for _ in range(count):
+        band = rng.choice(occupancy.BANDS)
+        if band == "2.4GHz":
+            channel = rng.randint(1, 13)
+            width = rng.choice([20, 40])
+        elif band == "5GHz":
+            channel = rng.choice([36, 40, 44, 48, 52, 100, 116, 132, 149, 153, 165])
+            width = rng.choice([20, 40, 80, 160])
+        else:
+            channel = rng.randrange(1, 233, 4)
+            width = rng.choice([20, 40, 80, 160, 320])
+        coverages.append(
+            coverage(
+                band,
+                channel,
+                width,
+                rng.choice("+-"),
+                rssi=rng.randint(-95, -30),
+                stations=rng.choice([None, rng.randint(0, 40)]),
+                cu=rng.choice([None, rng.randint(0, 100)]),
+            )
+        )
+    return coverages
+
+
+class TestCoveredChannels:
+    def test_bonding(self):
+        assert covered_channels("2.4GHz", 6, 40, "+") == [6, 10]
+        assert covered_channels("2.4GHz", 6, 40, "-") == [2, 6]
+        assert covered_channels("5GHz", 40, 40) == [36, 40]
+        assert covered_channels("5GHz", 60, "80") == [52, 56, 60, 64]
+        assert covered_channels("5GHz", 104, 160) == list(range(100, 129, 4))
+        assert covered_channels("5GHz", 157, 80) == [149, 153, 157, 161]
+        assert covered_channels("5GHz", 165, "80+80") == [165, 169, 173, 177]
+        assert covered_channels("6GHz", 37, 160) == list(range(33, 62, 4))
+        assert covered_channels("6GHz", 5, 320) == list(range(1, 62, 4))
+        assert covered_channels("6GHz", 5, "") == [5]
+
+
+class TestAggregate:
+    def test_channels(self):
+        rows = aggregate(
+            [
+                coverage("5GHz", 36, 80, rssi=-50, stations=3, cu=20),
+                coverage("5GHz", 36, 20, rssi=-50, stations=2, cu=35),
+                coverage("5GHz", 44, 20, rssi=-70),
+                coverage("2.4GHz", 1, rssi=-40),
+            ]
+        )
+        assert rows == [
+            ChannelUsage("2.4GHz", 1, 1, 0, -40, -40.0, None, None),
+            ChannelUsage("5GHz", 36, 2, 0, -50, -47.0, 5, 35),
+            ChannelUsage("5GHz", 40, 0, 1, None, None, None, None),
+            ChannelUsage("5GHz", 44, 1, 1, -70, -70.0, None, None),
+            ChannelUsage("5GHz", 48, 0, 1, None, None, None, None),
+        ]
+        assert occupancy.to_json(rows[:1]) == [
+            {
+                "band": "2.4GHz",
+                "channel": 1,
+                "bss": 1,
+                "overlapping": 0,
+                "rssi_max": -40,
+                "rssi_total": -40.0,
+                "stations": None,
+                "utilization": None,
+            }
+        ]
+        assert aggregate([]) == []
+
+    def test_large_capture(self):
+        coverages = random_coverages(2000)
+        start = time.perf_counter()
+        rows = aggregate(coverages, use_numpy=False)
+        assert time.perf_counter() - start < 0.5
+        assert sum(row.bss for row in rows) == 2000
+        assert sum(row.overlapping for row in rows) == sum(
+            len(c.channels) - 1 for c in coverages
+        )
+
+    def test_numpy_matches_python(self):
+        pytest.importorskip("numpy")
+        coverages = random_coverages(2000, seed=11)
+        assert aggregate(coverages, use_numpy=True) == aggregate(
+            coverages, use_numpy=False
+        )
+
+
+class TestOccupancyOutput:
+    def test_table(self, backend, make_clients, capsys, network):
+        backend([[network(1, rssi=-50), network(2, rssi=-60)]])
+        clients = make_clients(["--occupancy"])
+        app = lswifi()
+        runtime = ScanRuntime(
+            clients,
+            lambda scanned: app.process_scan_results(
+                scanned, False, "", "", clients[0].args
+            ),
+        )
+        try:
+            runtime.run(scans=1)
+        finally:
+            runtime.close()
+        out = capsys.readouterr().out
+        assert "OVERLAP" in out
+        row = next(line for line in out.splitlines() if line.startswith("5GHz"))
+        assert row.split()[:5] == ["5GHz", "36", "2", "0", "-50"]
+        assert "00:01:02:03:04:01" not in out
+
+    def test_json(self, backend, make_clients, capsys, network):
+        backend([[network(1, rssi=-50)]])
+        clients = make_clients(["--occupancy", "--json"])
+        app = lswifi()
+        runtime = ScanRuntime(
+            clients,
+            lambda scanned: app.print_channel_list(scanned[0], clients[0].args),
+        )
+        try:
+            runtime.run(scans=1)
+        finally:
+            runtime.close()
+        assert json.loads(capsys.readouterr().out)[0]["channel"] == 36
@@ -0,0 +1,111 @@
+# -*- encoding: utf-8
+
+import time
+
+import pytest
+
+from lswifi.oui import OUIDatabase, compile_registry, parse_registry
+
+OUI_CSV = """Registry,Assignment,Organization Name,Organization Address
+MA-L,00408C,Axis Communications AB,Emdalavagen 14 Lund  SE 22369
+MA-L,70B3D5,IEEE Registration Authority,445 Hoes Lane Piscataway NJ US 08554
+MA-L,C88ED1,IEEE Registration Authority,445 Hoes Lane Piscataway NJ US 08554
+MA-L,F09FC2,"Ubiquiti, Inc.",685 Third Avenue New York NY US 10017
+"""
+
+MAM_TXT = """OUI/MA-M			Organization
+company_id			Organization
+				Address
+
+C8-8E-D1   (hex)		Shenzhen Example Co.
+E00000-EFFFFF     (base 16)		Shenzhen Example Co.
+				Shenzhen  CN 518000
+"""
+
+OUI36_TXT = """70-B3-D5   (hex)		Tiny Sensors Ltd
+8D4000-8D4FFF     (base 16)		Tiny Sensors Ltd
+				London  GB
+"""
+
+MANUF = """# Wireshark manuf
+00:00:0C	Cisco	Cisco Systems, Inc
+00:1B:C5:00:00:00/36	Converging	Converging Systems Inc.
+"""
+
+
+@pytest.fixture
+def registry(tmp_path):
+    sources = []
+    for name, content in [
+        ("oui.csv", OUI_CSV),
+        ("mam.txt", MAM_TXT),
+        ("oui36.txt", OUI36_TXT),
+        ("manuf", MANUF),
+    ]:
+        path = tmp_path / name
+        path.write_text(content)
+        sources.append(str(path))
+    return sources
+
+
+@pytest.fixture
+def database(registry, tmp_path):
+    path = str(tmp_path / "lswifi" / "oui.bin")
+    assert compile_registry(registry, path) == 8
+    with OUIDatabase(path) as database:
+        yield database
+
+
+class TestOUI:
+    def test_parse_formats(self, registry):
+        assert parse_registry(registry[0])[(24, 0xF09FC2)] == "Ubiquiti, Inc."
+        assert parse_registry(registry[1]) == {(28, 0xC88ED1E): "Shenzhen Example Co."}
+        assert parse_registry(registry[2]) == {(36, 0x70B3D58D4): "Tiny Sensors Ltd"}
+        assert parse_registry(registry[3]) == {
+            (24, 0x00000C): "Cisco Systems, Inc",
+            (36, 0x001BC5000): "Converging Systems Inc.",
+        }
+
+    def test_lookup(self, database):
+        assert len(database) == 8
+        assert database.lookup("f0:9f:c2:01:02:03") == "Ubiquiti, Inc."
+        assert database.lookup("F0-9F-C2-01-02-03(*)") == "Ubiquiti, Inc."
+        assert database.lookup("00:00:0c:00:00:01") == "Cisco Systems, Inc"
+        assert database.lookup("02:00:00:00:00:01") is None
+        assert database.lookup("not a mac") is None
+
+    def test_most_specific_wins(self, database):
+        assert database.lookup("c8:8e:d1:e0:00:01") == "Shenzhen Example Co."
+        assert database.lookup("c8:8e:d1:f0:00:01") == "IEEE Registration Authority"
+        assert database.lookup("70:b3:d5:8d:4a:bc") == "Tiny Sensors Ltd"
+        assert database.lookup("70:b3:d5:8d:5a:bc") == "IEEE Registration Authority"
+        # asking again after the OUI lookup must not hide the longer assignment
+        assert database.lookup("70:b3:d5:8d:4a:bc") == "Tiny Sensors Ltd"
+
+    def test_missing_database(self, tmp_path):
+        database = OUIDatabase(str(tmp_path / "oui.bin"))
+        assert not database.available
+        assert database.lookup("f0:9f:c2:01:02:03") is None
+        assert len(database) == 0
+
+    def test_not_a_database(self, tmp_path):
+        path = tmp_path / "oui.bin"
+        path.write_bytes(b"LSW")
+        assert not OUIDatabase(str(path)).available
+
+    def test_large_registry(self, tmp_path):
+        source = tmp_path / "oui.csv"
+        source.write_text(
+            "Registry,Assignment,Organization Name,Organization Address\n"
+            + "".join(
+                f"MA-L,{i:06X},Vendor {i},Somewhere\n" for i in range(0, 0x80000, 13)
+            )
+        )
+        path = str(tmp_path / "oui.bin")
+        compile_registry([str(source)], path)
+        database = OUIDatabase(path)
+        start = time.perf_counter()
+        for i in range(0, 0x80000, 13 * 97):
+            assert database.lookup(f"{i:06x}000001") == f"Vendor {i}"
+        assert time.perf_counter() - start < 1
+        database.close()
@@ -0,0 +1,114 @@
+# -*- encoding: utf-8
+
+import os
+
+import pytest
+
+from lswifi import replay
+from lswifi import wlanapi as WLAN_API
+from lswifi.app import lswifi
+from lswifi.client import TimerEx
+from lswifi.runtime import ScanRuntime
+
+CAPS = os.path.join(os.path.dirname(__file__), "caps")
+
+
+class TestReplayScans:
+    def test_bss_list_decodes(self, network):
+        buffer = replay.build_bss_list([network(1, rssi=-61), network(2)])
+        bss_list = WLAN_API.WLANBSSList.from_buffer(buffer)
+        assert bss_list.NumberOfItems == 2
+
+    def test_scans_from_pcap(self):
+        scans = replay.scans_from_pcap(os.path.join(CAPS, "pwnagotchi_beacon.pcapng"))
+        assert len(scans) == 1
+        assert len(scans[0]) == 2
+        assert all(bss.frequency for bss in scans[0])
+        windowed = replay.scans_from_pcap(
+            os.path.join(CAPS, "pwnagotchi_beacon.pcapng"), window=1
+        )
+        assert len(windowed) > 1
+
+    def test_requires_scan(self):
+        with pytest.raises(ValueError):
+            replay.ReplayWlanApi([])
+
+
+class TestReplayPipeline:
+    def test_interfaces(self, backend, network):
+        interfaces = [
+            replay.ReplayInterface(
+                f"{{00000000-0000-0000-0000-00000000000{index}}}",
+                f"replay {index}",
+                f"02:00:00:00:00:0{index}",
+            )
+            for index in range(2)
+        ]
+        backend([[network(1)]], interfaces=interfaces)
+        ifaces = WLAN_API.WLAN.get_wireless_interfaces()
+        assert [iface.mac for iface in ifaces.values()] == [
+            "02:00:00:00:00:00",
+            "02:00:00:00:00:01",
+        ]
+        assert ifaces[1].connection_name == "replay 1"
+
+    def test_scan_cycles_through_notifications(self, backend, make_clients, network):
+        api = backend([[network(1)], [network(1), network(2)], [network(3)]])
+        clients = make_clients()
+        seen = []
+        runtime = ScanRuntime(
+            clients,
+            lambda scanned: seen.append(
+                sorted(str(bss.bssid) for bss in scanned[0].data)
+            ),
+        )
+        try:
+            assert runtime.run(scans=3) == 3
+        finally:
+            runtime.close()
+        assert seen == [
+            ["00:01:02:03:04:01"],
+            ["00:01:02:03:04:01", "00:01:02:03:04:02"],
+            ["00:01:02:03:04:03"],
+        ]
+        assert api.scan_requests == 3
+        assert clients[0].scan_latency_stats["notification"].count == 3
+
+    def test_dropped_notification_times_out(self, backend, make_clients, network):
+        backend([[network(1)]], drop_every=2)
+        clients = make_clients()
+        client = clients[0]
+        client.scan_timer = TimerEx(0.1, client.scan_timeout)
+        runtime = ScanRuntime(clients, lambda scanned: None)
+        try:
+            runtime.run(scans=2)
+        finally:
+            runtime.close()
+        assert client.scan_latency_stats["notification"].count == 1
+        assert client.scan_latency_stats["timeout"].count == 1
+        assert client.data is not None
+
+    def test_connected(self, backend, network):
+        backend([[network(1), network(2, rssi=-40)]], connected="00:01:02:03:04:02")
+        iface = WLAN_API.WLAN.get_wireless_interfaces()[0]
+        assert WLAN_API.WLAN.query_connected_bssid(iface) == "00:01:02:03:04:02"
+        rssi, _ = WLAN_API.WLAN.query_interface(iface, "rssi")
+        assert rssi.value == -40
+
+    def test_results_printed(self, backend, make_clients, capsys, network):
+        backend([[network(1, ssid=b"replayed"), network(2)]])
+        clients = make_clients()
+        app = lswifi()
+        runtime = ScanRuntime(
+            clients,
+            lambda scanned: app.process_scan_results(
+                scanned, False, "", "", clients[0].args
+            ),
+        )
+        try:
+            runtime.run(scans=1)
+        finally:
+            runtime.close()
+        out = capsys.readouterr().out
+        assert "replayed" in out
+        assert "00:01:02:03:04:02" in out
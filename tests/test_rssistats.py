@@ -0,0 +1,122 @@
+# -*- encoding: utf-8
+
+import random
+import statistics
+
+from lswifi import wlanapi as WLAN_API
+from lswifi.app import lswifi
+from lswifi.ndjson import NDJSONWriter, read_ndjson
+from lswifi.rssistats import RssiSeries, RssiTracker
+from lswifi.runtime import ScanRuntime
+
+
+class TestRssiSeries:
+    def test_window_statistics(self):
+        rng = random.Random(3)
+        values = [rng.randint(-90, -40) for _ in range(500)]
+        series = RssiSeries(window=50)
+        for index, rssi in enumerate(values):
+            series.add(float(index), rssi)
+        window = values[-50:]
+        stats = series.stats()
+        assert stats.samples == 50
+        assert stats.avg == round(statistics.fmean(window), 1)
+        assert stats.stddev == round(statistics.pstdev(window), 1)
+        assert (stats.min, stats.max) == (min(window), max(window))
+        assert stats.p50 == sorted(window)[24]
+        assert stats.p10 == sorted(window)[4]
+        assert stats.p90 == sorted(window)[44]
+        assert (
+            series.samples()
+            == [(float(index), rssi) for index, rssi in enumerate(values)][-50:]
+        )
+
+    def test_ewma_and_partial_window(self):
+        series = RssiSeries(window=10)
+        assert series.stats().avg is None
+        series.add(1.0, -60)
+        series.add(2.0, -70)
+        stats = series.stats()
+        assert stats.samples == 2
+        assert stats.avg == -65.0
+        assert stats.ewma == -62.0
+        assert series.samples() == [(1.0, -60), (2.0, -70)]
+        # out of range readings are clamped rather than corrupting the histogram
+        series.add(3.0, 10)
+        assert series.stats().max == 0
+
+
+class TestRssiTracker:
+    def test_evicts_bssids_not_heard(self):
+        tracker = RssiTracker(window=5, evict_after=3)
+        tracker.observe_scan("wlan0", 1.0, [("a", -50), ("b", -60)])
+        for scan in range(2, 4):
+            tracker.observe_scan("wlan0", float(scan), [("a", -50)])
+        assert tracker.stats("wlan0", "b").samples == 1
+        tracker.observe_scan("wlan0", 4.0, [("a", -52)])
+        assert tracker.stats("wlan0", "b").samples == 0
+        assert tracker.stats("wlan0", "a").samples == 4
+        assert tracker.evicted == 1
+        assert len(tracker) == 1
+
+    def test_memory_bounded_by_active_bssids(self):
+        tracker = RssiTracker(window=8, evict_after=2)
+        for scan in range(1000):
+            # a different set of BSSIDs every few scans, as when walking a site
+            heard = [(f"{scan // 4}-{index}", -60) for index in range(20)]
+            tracker.observe_scan("wlan0", float(scan), heard)
+        assert len(tracker) == 20
+        assert tracker.stats("wlan0", "249-0").samples == 4
+
+
+class TestRssiColumns:
+    def test_exports(self, backend, make_clients, tmp_path, capsys, network):
+        backend([[network(1, rssi=rssi)] for rssi in (-50, -60, -70)])
+        path = str(tmp_path / "scans.ndjson")
+        clients = make_clients(["--rssi-stats", "--ndjson", path])
+        app = lswifi()
+        app.rssi = RssiTracker(window=clients[0].args.rssi_window)
+        app.ndjson = NDJSONWriter(path)
+        runtime = ScanRuntime(
+            clients,
+            lambda scanned: app.process_scan_results(
+                scanned, False, "", "", clients[0].args
+            ),
+        )
+        try:
+            runtime.run(scans=3, interval=0)
+        finally:
+            runtime.close()
+            app.ndjson.close()
+        records = [record for record in read_ndjson(path) if "bssid" in record]
+        assert [record["rssi_samples"] for record in records] == [1, 2, 3]
+        assert records[-1]["rssi_avg"] == -60.0
+        assert records[-1]["rssi_stddev"] == 8.2
+        assert (records[-1]["rssi_min"], records[-1]["rssi_max"]) == (-70, -50)
+        assert "P10/P90" in capsys.readouterr().out
+
+    def test_connected_bss(self, backend, make_clients, monkeypatch, capsys, network):
+        """The (*) marker on the connected BSS does not hide its statistics"""
+        backend([[network(1, rssi=rssi), network(2, rssi=-80)] for rssi in (-50, -60)])
+        monkeypatch.setattr(
+            WLAN_API.WLAN,
+            "get_connected_bssid",
+            staticmethod(lambda interface: "00:01:02:03:04:01"),
+        )
+        clients = make_clients(["--rssi-stats"])
+        app = lswifi()
+        app.rssi = RssiTracker(window=clients[0].args.rssi_window)
+        runtime = ScanRuntime(
+            clients,
+            lambda scanned: app.process_scan_results(
+                scanned, False, "", "", clients[0].args
+            ),
+        )
+        try:
+            runtime.run(scans=2, interval=0)
+        finally:
+            runtime.close()
+        out = capsys.readouterr().out
+        rows = [line for line in out.splitlines() if "00:01:02:03:04:01(*)" in line]
+        assert len(rows) == 2
+        assert "-55.0" in rows[-1]
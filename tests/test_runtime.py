@@ -0,0 +1,101 @@
+# -*- encoding: utf-8
+
+import asyncio
+import threading
+
+from lswifi.runtime import ScanRuntime
+
+
+class FakeClient:
+    """Completes scans from another thread, like the WLAN notification callback."""
+
+    def __init__(self, mac, delay=0.01, complete=True):
+        self.mac = mac
+        self.delay = delay
+        self.complete = complete
+        self.scan_listeners = []
+        self.scans_requested = 0
+
+    def add_scan_listener(self, listener):
+        self.scan_listeners.append(listener)
+
+    def remove_scan_listener(self, listener):
+        self.scan_listeners.remove(listener)
+
+    async def scan(self):
+        self.scans_requested += 1
+        if self.complete:
+            threading.Timer(self.delay, self._finish).start()
+
+    def _finish(self):
+        for listener in list(self.scan_listeners):
+            listener(self)
+
+
+class TestScanRuntime:
+    def test_single_cycle(self):
+        """One cycle scans every client and emits results once."""
+        clients = {1: FakeClient("b"), 0: FakeClient("a")}
+        results = []
+        with ScanRuntime(clients, results.append) as runtime:
+            assert runtime.run(scans=1) == 1
+        assert len(results) == 1
+        assert list(results[0].keys()) == [0, 1]
+        assert all(c.scans_requested == 1 for c in clients.values())
+
+    def test_loop_reused_across_cycles(self):
+        """The same event loop drives every cycle of the session."""
+        clients = {0: FakeClient("a"), 1: FakeClient("b"), 2: FakeClient("c")}
+        loops = []
+        runtime = ScanRuntime(clients, lambda _: loops.append(runtime.loop))
+        try:
+            assert runtime.run(scans=4, interval=0) == 4
+        finally:
+            runtime.close()
+        assert len(loops) == 4
+        assert len(set(map(id, loops))) == 1
+        assert runtime.loop.is_closed()
+
+    def test_close_removes_listeners(self):
+        client = FakeClient("a")
+        runtime = ScanRuntime({0: client}, lambda _: None)
+        assert len(client.scan_listeners) == 1
+        runtime.close()
+        assert client.scan_listeners == []
+
+    def test_timeout_without_completion(self):
+        """A scan that never signals completion is abandoned after the timeout."""
+        clients = {0: FakeClient("a", complete=False), 1: FakeClient("b")}
+        results = []
+        with ScanRuntime(clients, results.append, timeout=0.05) as runtime:
+            assert runtime.run(scans=1) == 1
+            assert runtime.pending == {}
+        assert len(results) == 1
+
+    def test_late_completion_ignored(self, caplog):
+        """A completion for a timed out cycle does not resolve the next one."""
+        client = FakeClient("a", complete=False)
+        runtime = ScanRuntime({0: client}, lambda _: None, timeout=0.05)
+
+        async def session():
+            await runtime.scan_client(client)
+            runtime.cycles += 1
+            scan = asyncio.ensure_future(runtime.scan_client(client))
+            await asyncio.sleep(0)
+            client._finish()  # the first scan finishing late
+            await asyncio.sleep(0.01)
+            assert not scan.done()
+            client._finish()
+            await scan
+
+        with runtime:
+            runtime.loop.run_until_complete(session())
+            assert runtime.pending == {}
+        assert len([r for r in caplog.records if r.levelname == "WARNING"]) == 1
+
+    def test_duration(self):
+        """Duration mode keeps cycling until the deadline passes."""
+        clients = {0: FakeClient("a", delay=0)}
+        with ScanRuntime(clients, lambda _: None) as runtime:
+            cycles = runtime.run(interval=0.01, duration=0.1)
+        assert cycles >= 2
@@ -0,0 +1,181 @@
+# -*- encoding: utf-8
+
+import argparse
+import os
+import threading
+import time
+
+import pytest
+
+from lswifi import replay
+from lswifi.app import lswifi
+from lswifi.merge import MergedScan
+from lswifi.ndjson import NDJSONWriter, read_ndjson
+from lswifi.service import (
+    LswifiService,
+    ServiceClient,
+    ServiceError,
+    is_running,
+    run_request,
+)
+
+
+@pytest.fixture
+def service(backend, make_clients, tmp_path, network):
+    api = backend([[network(1, rssi=-40)], [network(1, rssi=-41), network(2)]])
+    clients = make_clients([])
+    service = LswifiService(
+        lswifi(), clients, clients[0].args, address=str(tmp_path / "lswifi.sock")
+    )
+    service.start()
+    service.api = api
+    yield service
+    service.close()
+
+
+class TestService:
+    def test_latest_is_warm(self, service):
+        with ServiceClient(service.address) as client:
+            assert client.ping()["interfaces"] == 1
+            (scan,) = client.latest()
+            assert scan["interface_mac"] == "02:00:00:00:00:01"
+            assert [bss["rssi"] for bss in scan["networks"]] == ["-40"]
+            start = time.perf_counter()
+            for _ in range(20):
+                client.latest()
+            assert time.perf_counter() - start < 1
+        client = service.clients[0]
+        # records are built once per scan
+        assert service.latest(client) is service.latest(client)
+
+    def test_scan(self, service):
+        with ServiceClient(service.address) as client:
+            (scan,) = client.scan()
+            assert len(scan["networks"]) == 2
+            assert client.latest(interface="02:00:00:00:00:01") == [scan]
+            with pytest.raises(ServiceError):
+                client.latest(interface="02:00:00:00:00:09")
+            with pytest.raises(ServiceError):
+                client.request("reboot")
+
+    def test_concurrent_clients(self, service):
+        results = []
+
+        def ask():
+            with ServiceClient(service.address) as client:
+                results.append(client.scan()[0]["interface_mac"])
+
+        threads = [threading.Thread(target=ask) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        assert results == ["02:00:00:00:00:01"] * 4
+
+    def test_events(self, service):
+        received = []
+        client = ServiceClient(service.address)
+
+        def subscribe():
+            for event in client.events():
+                received.append(event)
+                break
+
+        thread = threading.Thread(target=subscribe)
+        thread.start()
+        deadline = time.monotonic() + 5
+        while not service._subscribers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        guid = replay.DEFAULT_INTERFACES[0].guid
+        service.api.notify(guid, "network_available")
+        thread.join(5)
+        client.close()
+        assert received[0]["event"] == "network_available"
+        assert received[0]["interface_mac"] == "02:00:00:00:00:01"
+
+    def test_current_ap(self, service, capsys):
+        args = argparse.Namespace(
+            daemon_address=service.address,
+            daemon_request=None,
+            json=None,
+            raw=False,
+            json_indent=None,
+        )
+        start = time.perf_counter()
+        assert run_request(args)
+        assert time.perf_counter() - start < 1
+        assert capsys.readouterr().out.startswith(
+            "INTERFACE: lswifi replay, MAC: 02:00:00:00:00:01, BSSID:"
+        )
+
+    def test_not_running(self, tmp_path):
+        address = str(tmp_path / "lswifi.sock")
+        assert not is_running(address)
+        args = argparse.Namespace(
+            daemon_address=address, daemon_request="latest", json_indent=None
+        )
+        assert not run_request(args)
+
+    def test_current_ap_not_running(self, tmp_path, capsys):
+        args = argparse.Namespace(
+            daemon_address=str(tmp_path / "lswifi.sock"),
+            daemon_request=None,
+            json=None,
+            raw=False,
+            json_indent=None,
+        )
+        # lswifi -ap then asks the interfaces itself
+        assert not run_request(args)
+        assert capsys.readouterr().out == ""
+
+    def test_current_ap_error(self, service, monkeypatch, capsys):
+        def get_interface_info(args, iface):
+            raise RuntimeError("interface went away")
+
+        monkeypatch.setattr("lswifi.client.get_interface_info", get_interface_info)
+        args = argparse.Namespace(
+            daemon_address=service.address,
+            daemon_request=None,
+            json=None,
+            raw=False,
+            json_indent=None,
+        )
+        assert not run_request(args)
+        assert capsys.readouterr().out == ""
+        args.daemon_request = "current-ap"
+        with pytest.raises(SystemExit):
+            run_request(args)
+
+    def test_scans_exported(self, backend, make_clients, tmp_path, capsys, network):
+        """Daemon scans reach the session's exports and the merge starts afresh"""
+        backend([[network(1, rssi=-40)], [network(1, rssi=-41), network(2)]])
+        path = str(tmp_path / "scans.ndjson")
+        clients = make_clients(["--merge", "--ndjson", path])
+        app = lswifi()
+        app.merge = MergedScan()
+        app.ndjson = NDJSONWriter(path)
+        for client in clients.values():
+            client.merge = app.merge
+        service = LswifiService(
+            app, clients, clients[0].args, address=str(tmp_path / "lswifi.sock")
+        )
+        try:
+            service.start()
+            service.scan()
+        finally:
+            service.close()
+            app.close_sinks()
+        records = [record for record in read_ndjson(path) if "bssid" in record]
+        assert [record["bssid"] for record in records] == [
+            "00:01:02:03:04:01",
+            "00:01:02:03:04:01",
+            "00:01:02:03:04:02",
+        ]
+        assert not app.merge._merged
+        # nothing is printed by the service
+        assert capsys.readouterr().out == ""
+
+    def test_close(self, service):
+        service.close()
+        assert not os.path.exists(service.address)
+        assert not is_running(service.address)
@@ -1,8 +1,12 @@
 # -*- encoding: utf-8
 
-import pytest
+import socket
+import threading
+import time
 from unittest.mock import MagicMock
 
+import pytest
+
 from lswifi import slog
 
 
@@ -80,3 +84,155 @@ class TestSlog:
         finally:
             slog.SYSLOG_SERVERS = original_servers
             slog.SYSLOG_SOCKET = original_socket
+
+
+@pytest.fixture
+def udp_listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(5)
+    yield sock
+    sock.close()
+
+
+@pytest.fixture
+def tcp_listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(1)
+    sock.settimeout(5)
+    yield sock
+    sock.close()
+
+
+def read_frames(conn, count):
+    """octet counted syslog frames from a TCP connection"""
+    data = b""
+    frames = []
+    while len(frames) < count:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+        while b" " in data:
+            length, rest = data.split(b" ", 1)
+            if len(rest) < int(length):
+                break
+            frames.append(rest[: int(length)])
+            data = rest[int(length) :]
+    return frames
+
+
+class TestSyslogSender:
+    def test_format_rfc5424(self):
+        line = slog.format_rfc5424(
+            "connected",
+            "INFO",
+            {"interface": "00:01:02:03:04:05", "ssid": 'a "b" ]', "bssid": ""},
+            timestamp=0,
+            hostname="host",
+        ).decode()
+        header, message = line.split("] ", 1)
+        assert header.startswith("<14>1 1970-01-01T00:00:00.000Z host lswifi ")
+        assert header.endswith(
+            '[lswifi@32473 interface="00:01:02:03:04:05" ssid="a \\"b\\" \\]"'
+        )
+        assert message == "connected"
+        assert slog.format_rfc5424("x", "INFO", hostname="host").endswith(b" - - x")
+
+    def test_udp(self, udp_listener):
+        port = udp_listener.getsockname()[1]
+        sender = slog.SyslogSender(["127.0.0.1"], port=port)
+        for i in range(3):
+            assert sender.submit(f"event {i}", "INFO", {"event": "connected"})
+        received = [udp_listener.recv(4096) for _ in range(3)]
+        sender.close()
+        assert [line.rsplit(b"] ", 1)[1] for line in received] == [
+            b"event 0",
+            b"event 1",
+            b"event 2",
+        ]
+        assert sender.stats()["sent"] == 3
+        assert not sender.submit("after close", "INFO")
+
+    def test_tcp_octet_counting(self, tcp_listener):
+        port = tcp_listener.getsockname()[1]
+        sender = slog.SyslogSender(["127.0.0.1"], port=port, protocol="tcp")
+        for i in range(5):
+            sender.submit(f"event {i}", "INFO")
+        conn, _ = tcp_listener.accept()
+        conn.settimeout(5)
+        frames = read_frames(conn, 5)
+        assert [frame.rsplit(b" ", 2)[1:] for frame in frames] == [
+            [b"event", str(i).encode()] for i in range(5)
+        ]
+        sender.close()
+        conn.close()
+
+    def test_tcp_reconnects(self, tcp_listener):
+        port = tcp_listener.getsockname()[1]
+        sender = slog.SyslogSender(
+            ["127.0.0.1"], port=port, protocol="tcp", reconnect_delay=0.05
+        )
+        sender.submit("first", "INFO")
+        conn, _ = tcp_listener.accept()
+        conn.settimeout(5)
+        assert read_frames(conn, 1)[0].endswith(b"first")
+        conn.close()
+        # the first write after the peer closed may still succeed locally
+        deadline = time.monotonic() + 5
+        tcp_listener.settimeout(0.1)
+        conn = None
+        while conn is None and time.monotonic() < deadline:
+            sender.submit("again", "INFO")
+            try:
+                conn, _ = tcp_listener.accept()
+            except socket.timeout:
+                continue
+        assert conn is not None
+        conn.settimeout(5)
+        assert read_frames(conn, 1)[0].endswith(b"again")
+        sender.close()
+        conn.close()
+
+    def test_drops_when_full(self):
+        sender = slog.SyslogSender(["127.0.0.1"], port=9, queue_size=2)
+        # hold the sender thread so nothing more is taken off the queue
+        blocker = threading.Event()
+        original = sender._send_udp
+        sender._send_udp = lambda server, batch: blocker.wait(5)
+        sender.submit("taken by the thread", "INFO")
+        time.sleep(0.1)
+        results = [sender.submit(f"event {i}", "INFO") for i in range(5)]
+        assert results == [True, True, False, False, False]
+        assert sender.stats()["dropped"] == 3
+        sender._send_udp = original
+        blocker.set()
+        sender.close()
+
+    def test_submit_does_not_block(self, tcp_listener):
+        # nobody accepts: the connection and sendall happen on the sender thread
+        port = tcp_listener.getsockname()[1]
+        sender = slog.SyslogSender(["127.0.0.1"], port=port, protocol="tcp")
+        start = time.perf_counter()
+        for i in range(2000):
+            sender.submit("x" * 200, "INFO")
+        assert time.perf_counter() - start < 1
+        sender.close(timeout=0.5)
+
+    def test_send_uses_configured_servers(self, udp_listener):
+        original_servers = slog.SYSLOG_SERVERS
+        slog.SYSLOG_SERVERS = ["127.0.0.1"]
+        try:
+            slog.start(port=udp_listener.getsockname()[1])
+            assert slog.send("roamed", "INFO", interface="00:01:02:03:04:05")
+            line = udp_listener.recv(4096)
+            assert b'interface="00:01:02:03:04:05"' in line
+            assert line.endswith(b"roamed")
+            slog.stop()
+            assert slog.SENDER is None
+            slog.SYSLOG_SERVERS = []
+            assert not slog.send("nobody", "INFO")
+        finally:
+            slog.stop()
+            slog.SYSLOG_SERVERS = original_servers
@@ -0,0 +1,97 @@
+# -*- encoding: utf-8
+
+from lswifi.app import lswifi
+from lswifi.ndjson import NDJSONWriter, read_ndjson
+from lswifi.pcap import PCAP
+from lswifi.runtime import ScanRuntime
+
+
+def scan(app, clients, handler=None):
+    runtime = ScanRuntime(
+        clients,
+        handler
+        or (
+            lambda scanned: app.process_scan_results(
+                scanned, False, "", "", clients[0].args
+            )
+        ),
+    )
+    try:
+        runtime.run(scans=1)
+    finally:
+        runtime.close()
+
+
+class TestTop:
+    def test_strongest_only(self, backend, make_clients, tmp_path, capsys, network):
+        backend([[network(index, rssi=-30 - (index * 7) % 60) for index in range(60)]])
+        path = str(tmp_path / "scans.ndjson")
+        clients = make_clients(["--top", "5", "--ndjson", path])
+        app = lswifi()
+        app.ndjson = NDJSONWriter(path)
+        try:
+            scan(app, clients)
+        finally:
+            app.ndjson.close()
+        records = [record for record in read_ndjson(path) if "bssid" in record]
+        # records are only built for the selected BSS
+        assert sorted(int(record["rssi"]) for record in records) == [
+            -34,
+            -33,
+            -32,
+            -31,
+            -30,
+        ]
+        out = capsys.readouterr().out
+        assert out.count("00:01:02:03:04:") == 5
+
+    def test_filters_before_selection(self, backend, make_clients, network):
+        backend(
+            [
+                [network(1, ssid=b"guest", rssi=-30)]
+                + [network(index, rssi=-50 - index) for index in range(2, 10)]
+            ]
+        )
+        clients = make_clients(["--top", "3", "-exclude", "guest"])
+        app = lswifi()
+        selected = []
+        scan(
+            app,
+            clients,
+            lambda scanned: selected.extend(
+                app.select_top(scanned[0].data, clients[0].args)
+            ),
+        )
+        assert [bss.rssi.value for bss in selected] == [-52, -53, -54]
+
+    def test_uptime(self, backend, make_clients, network):
+        backend([[network(index, rssi=-50) for index in range(1, 5)]])
+        clients = make_clients(["--top", "2", "--uptime"])
+        app = lswifi()
+        selected = []
+
+        def handler(scanned):
+            for offset, bss in enumerate(scanned[0].data):
+                bss.timestamp = 1000 * offset
+            selected.extend(app.select_top(scanned[0].data, clients[0].args))
+
+        scan(app, clients, handler)
+        assert [bss.timestamp for bss in selected] == [3000, 2000]
+
+    def test_export_not_limited(self, backend, make_clients, tmp_path, network):
+        """-export writes every BSS of the scan, not just the --top selection"""
+        backend([[network(index, rssi=-40 - index) for index in range(1, 9)]])
+        path = str(tmp_path / "scans.ndjson")
+        clients = make_clients(
+            ["--top", "2", "--ndjson", path, "-export", "-path", str(tmp_path)]
+        )
+        app = lswifi()
+        app.ndjson = NDJSONWriter(path)
+        try:
+            scan(app, clients)
+        finally:
+            app.ndjson.close()
+        assert len([record for record in read_ndjson(path) if "bssid" in record]) == 2
+        (pcap_path,) = tmp_path.glob("*.pcapng")
+        with PCAP(str(pcap_path), mode="r") as pcap:
+            assert len(list(pcap.get_packets())) == 8
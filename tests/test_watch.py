@@ -0,0 +1,109 @@
+# -*- encoding: utf-8
+
+from ctypes import sizeof
+
+from lswifi import wlanapi as WLAN_API
+from lswifi.bssinfo import (
+    decode_bss_summary,
+    format_frequency,
+    summarize_bss_entries,
+    summarize_bss_entry,
+)
+from lswifi.watch import WatchState
+
+
+def make_bss_entry(bssid, ssid=b"lswifi", rssi=-50, frequency=5180000):
+    """Build a WLAN_BSS_ENTRY followed by its IEs, like WlanGetNetworkBssList."""
+    ies = bytes([0, len(ssid)]) + ssid + bytes([3, 1, 36])
+    buffer = bytearray(sizeof(WLAN_API.WLANBSSEntry) + len(ies))
+    entry = WLAN_API.WLANBSSEntry.from_buffer(buffer)
+    entry.dot11Ssid.SSIDLength = len(ssid)
+    entry.dot11Ssid.SSID = ssid
+    entry.dot11Bssid[:] = bssid
+    entry.dot11BssType = 1
+    entry.Rssi = rssi
+    entry.ChCenterFrequency = frequency
+    entry.IeOffset = sizeof(entry)
+    entry.IeSize = len(ies)
+    buffer[sizeof(entry) :] = ies
+    entry.buffer = buffer
+    return entry
+
+
+class TestBssInfo:
+    def test_summary_fixed_fields(self):
+        entry = make_bss_entry([0, 1, 2, 3, 4, 5], rssi=-61)
+        summary = summarize_bss_entry(entry)
+        assert summary.bssid == "00:01:02:03:04:05"
+        assert summary.ssid == "lswifi"
+        assert summary.rssi == -61
+        assert summary.raw is None
+        assert format_frequency(summary.frequency) == "5.180"
+
+    def test_keep_raw_only_for_requested(self):
+        entries = [make_bss_entry([0, 0, 0, 0, 0, i]) for i in range(3)]
+        summaries = summarize_bss_entries(entries, keep_raw=("00:00:00:00:00:01",))
+        assert [s.raw is not None for s in summaries] == [False, True, False]
+
+    def test_decode_from_copy(self):
+        """The raw copy decodes without the original WLAN memory."""
+        summary = summarize_bss_entry(make_bss_entry([0, 1, 2, 3, 4, 5]), True)
+        bss = decode_bss_summary(summary, summary.bssid)
+        assert str(bss.ssid) == "lswifi"
+        assert bss.bssid.connected
+        assert bss.channel_frequency.value == "5.180"
+        assert decode_bss_summary(summary._replace(raw=None)) is None
+
+
+class TestWatchState:
+    def setup_method(self):
+        self.bssid = "00:01:02:03:04:05"
+        self.queries = 0
+        self.entries = [
+            make_bss_entry([0, 1, 2, 3, 4, 5]),
+            make_bss_entry([0, 1, 2, 3, 4, 6]),
+        ]
+
+    def query_bssid(self, interface):
+        self.queries += 1
+        return self.bssid
+
+    def get_summaries(self, interface, keep_raw=()):
+        return summarize_bss_entries(self.entries, keep_raw)
+
+    def test_bssid_cached_between_events(self):
+        watch = WatchState(None, self.query_bssid, self.get_summaries)
+        for event in ["scan_list_refresh", "signal_quality_change", "scan_complete"]:
+            watch.on_event(event)
+            assert watch.connected_bssid == self.bssid
+        assert self.queries == 1
+
+    def test_roaming_invalidates(self):
+        watch = WatchState(None, self.query_bssid, self.get_summaries)
+        assert watch.connected_bssid == self.bssid
+        self.bssid = "00:01:02:03:04:06"
+        watch.on_event("roaming_end")
+        assert watch.connected_bssid == "00:01:02:03:04:06"
+        assert self.queries == 2
+
+    def test_connected_decoded_on_demand(self):
+        watch = WatchState(None, self.query_bssid, self.get_summaries)
+        summaries = watch.refresh()
+        assert len(summaries) == 2
+        assert watch.connected.bssid == self.bssid
+        assert watch.decodes == 0
+        assert str(watch.connected_bss().bssid) == self.bssid
+        watch.connected_bss()
+        assert watch.decodes == 1
+
+    def test_disconnected(self):
+        self.bssid = ""
+        watch = WatchState(None, self.query_bssid, self.get_summaries)
+        watch.refresh()
+        assert watch.connected is None
+        assert watch.connected_bss() is None
+
+    def test_failed_read(self):
+        watch = WatchState(None, self.query_bssid, lambda interface, keep_raw: None)
+        assert watch.refresh() is None
+        assert watch.summaries == [] and watch.connected is None
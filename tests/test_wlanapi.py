@@ -1,8 +1,13 @@
 # -*- encoding: utf-8
 
+from ctypes import Structure, c_long, sizeof
+from types import SimpleNamespace
+
 import pytest
 
+from lswifi import replay
 from lswifi import wlanapi as WLAN_API
+from lswifi.guid import GUID
 
 
 class TestWlanApiConstants:
@@ -44,3 +49,164 @@ class TestWlanApiLive:
         """Test getting wireless interfaces."""
         interfaces = WLAN_API.WLAN.get_wireless_interfaces()
         assert isinstance(interfaces, dict)
+
+
+def build_bss_list(networks):
+    """WLAN_BSS_LIST memory for (bssid octets, ssid bytes) tuples"""
+    return replay.build_bss_list(
+        [
+            replay.ReplayBss(
+                bssid, ssid, -50 - index, 5180, bytes([0, len(ssid)]) + ssid
+            )
+            for index, (bssid, ssid) in enumerate(networks)
+        ]
+    )
+
+
+class FakeWlanApi:
+    """Stands in for wlanapi.dll; output parameters arrive as byref() objects."""
+
+    def __init__(self, networks=(), interfaces=()):
+        self.handles = 0
+        self.closed = []
+        self.scans = []
+        self.probed = []
+        self.bss_list = build_bss_list(list(networks))
+        self.interfaces = list(interfaces)
+
+    def WlanEnumInterfaces(self, handle, reserved, data):
+        class InterfaceList(Structure):
+            _fields_ = WLAN_API.WLANInterfaceInfoList._fields_[:2] + [
+                ("InterfaceInfo", WLAN_API.WLANInterfaceInfo * len(self.interfaces))
+            ]
+
+        self.interface_list = bytearray(sizeof(InterfaceList))
+        interface_list = InterfaceList.from_buffer(self.interface_list)
+        interface_list.NumberOfItems = len(self.interfaces)
+        for index, guid in enumerate(self.interfaces):
+            interface_list.InterfaceInfo[index].InterfaceGuid = GUID(guid)
+        data._obj.contents = WLAN_API.WLANInterfaceInfoList.from_buffer(
+            self.interface_list
+        )
+        return 0
+
+    def WlanOpenHandle(self, version, reserved, negotiated, handle):
+        self.handles += 1
+        negotiated._obj.value = version
+        handle._obj.value = self.handles
+        return 0
+
+    def WlanCloseHandle(self, handle, reserved):
+        self.closed.append(handle.value)
+        return 0
+
+    def WlanFreeMemory(self, memory):
+        pass
+
+    def WlanScan(self, handle, guid, ssid, raw, reserved):
+        self.scans.append((handle.value, str(guid._obj)))
+        self.probed.append(ssid._obj.SSID if ssid is not None else None)
+        return 0
+
+    def WlanGetNetworkBssList(self, handle, guid, ssid, kind, secure, reserved, data):
+        data._obj.contents = WLAN_API.WLANBSSList.from_buffer(self.bss_list)
+        return 0
+
+    def WlanQueryInterface(self, handle, guid, opcode, reserved, size, data, kind):
+        if WLAN_API.WLAN_INTF_OPCODE_DICT[opcode.value] == "wlan_intf_opcode_rssi":
+            data._obj.contents = c_long(-42)
+        else:
+            data._obj.contents = WLAN_API.WLANConnectionAttributes()
+        return 0
+
+
+@pytest.fixture
+def fake_wlanapi():
+    fake = FakeWlanApi()
+    WLAN_API.use_library(wlanapi=fake)
+    yield fake
+    WLAN_API.use_library(WLAN_API.WLAN_API, WLAN_API.IPHLP_API)
+
+
+@pytest.fixture
+def fake_iphlpapi(fake_wlanapi):
+    fake = replay.ReplayIpHelper(
+        [
+            replay.ReplayInterface(
+                "{%08X-E325-11CE-BFC1-08002BE10318}" % index,
+                f"vEthernet {index}",
+                f"00:01:02:03:04:{index:02x}",
+            )
+            for index in range(40)
+        ]
+    )
+    WLAN_API.use_library(fake_wlanapi, fake)
+    return fake
+
+
+class TestWlanApiFakeLibrary:
+    """Exercise the WLAN wrappers through an injected library."""
+
+    guid = "{4D36E972-E325-11CE-BFC1-08002BE10318}"
+
+    def test_handle_reused_across_queries(self, fake_wlanapi):
+        iface = SimpleNamespace(guid=GUID(self.guid))
+        for _ in range(4):
+            rssi, _ = WLAN_API.WLAN.query_interface(iface, "rssi")
+            assert rssi.value == -42
+        assert fake_wlanapi.handles == 1
+        assert WLAN_API.api_stats()["WlanQueryInterface"].count == 4
+
+    def test_scan(self, fake_wlanapi):
+        WLAN_API.WLAN.scan(GUID(self.guid))
+        WLAN_API.WLAN.scan(GUID(self.guid))
+        assert fake_wlanapi.scans == [(1, self.guid), (1, self.guid)]
+        assert "WlanOpenHandle" in WLAN_API.api_stats()
+
+    def test_directed_scan(self, fake_wlanapi):
+        WLAN_API.WLAN.scan(GUID(self.guid), "corp")
+        WLAN_API.WLAN.scan(GUID(self.guid))
+        assert fake_wlanapi.probed == [b"corp", None]
+
+    def test_bss_list_filtered_before_decode(self, fake_wlanapi):
+        fake_wlanapi.bss_list = build_bss_list(
+            [
+                ([0, 1, 2, 3, 4, i], ssid)
+                for i, ssid in enumerate([b"corp", b"guest"] * 2)
+            ]
+        )
+        iface = SimpleNamespace(guid=GUID(self.guid), state=0)
+        networks = WLAN_API.WLAN.get_wireless_network_bss_list(iface, False)
+        assert len(networks) == 4
+        networks = WLAN_API.WLAN.get_wireless_network_bss_list(
+            iface, False, ssids=["corp"]
+        )
+        assert [str(bss.bssid) for bss in networks] == [
+            "00:01:02:03:04:00",
+            "00:01:02:03:04:02",
+        ]
+        assert {str(bss.ssid) for bss in networks} == {"corp"}
+
+    def test_interfaces_share_one_enumeration(self, fake_wlanapi, fake_iphlpapi):
+        fake_wlanapi.interfaces = [
+            "{00000003-E325-11CE-BFC1-08002BE10318}",
+            "{00000027-E325-11CE-BFC1-08002BE10318}",
+        ]
+        interfaces = WLAN_API.WLAN.get_wireless_interfaces()
+        assert [iface.connection_name for iface in interfaces.values()] == [
+            "vEthernet 3",
+            "vEthernet 39",
+        ]
+        assert interfaces[1].mac == "00:01:02:03:04:27"
+        # size query plus one enumeration for both interfaces
+        assert fake_iphlpapi.calls == 2
+        WLAN_API.WLAN.get_wireless_interfaces()
+        assert fake_iphlpapi.calls == 2
+        WLAN_API.invalidate_adapter_cache()
+        WLAN_API.WLAN.get_wireless_interfaces()
+        assert fake_iphlpapi.calls == 4
+
+    def test_pool_closed_on_rebind(self, fake_wlanapi):
+        WLAN_API.WLAN.scan(GUID(self.guid))
+        WLAN_API.use_library(wlanapi=FakeWlanApi())
+        assert len(fake_wlanapi.closed) == 1